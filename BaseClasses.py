@@ -101,6 +101,8 @@ class MultiWorld():
     random: random.Random
     per_slot_randoms: Utils.DeprecateDict[int, random.Random]
     """Deprecated. Please use `self.random` instead."""
+    progress: Optional[Callable[[str, int, int], None]] = None
+    """Called during generation with the current stage and how much of it is done, may raise to abort generation."""
 
     class AttributeProxy():
         def __init__(self, rule):
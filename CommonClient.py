@@ -25,6 +25,7 @@ from MultiServer import CommandProcessor, mark_raw
 from NetUtils import (Endpoint, decode, NetworkItem, encode, JSONtoTextParser, ClientStatus, Permission, NetworkSlot,
                       RawJSONtoTextParser, add_json_text, add_json_location, add_json_item, JSONTypes, HintStatus, SlotType)
 from Utils import Version, stream_input, async_start
+from datapackage_cache import PackedNameToId
 from worlds import network_data_package, AutoWorldRegister
 import os
 import ssl
@@ -283,11 +284,18 @@ class CommonContext:
 
             return self.lookup_in_game(code, self.ctx.slot_info[slot].game)
 
-        def update_game(self, game: str, name_to_id_lookup_table: typing.Dict[str, int]) -> None:
+        def update_game(self, game: str, name_to_id_lookup_table: typing.Mapping[str, int]) -> None:
             """Overrides existing lookup tables for a particular game."""
-            id_to_name_lookup_table = Utils.KeyedDefaultDict(self._unknown_item)
-            id_to_name_lookup_table.update({code: name for name, code in name_to_id_lookup_table.items()})
-            self._game_store[game] = collections.ChainMap(self._archipelago_lookup, id_to_name_lookup_table)
+            id_to_name_lookup_table: typing.Mapping[int, str]
+            if isinstance(name_to_id_lookup_table, PackedNameToId):
+                # tables from the binary cache are searched on lookup instead of being copied into a dict
+                id_to_name_lookup_table = name_to_id_lookup_table.id_to_name
+                self._game_store[game] = collections.ChainMap(
+                    self._archipelago_lookup, id_to_name_lookup_table, Utils.KeyedDefaultDict(self._unknown_item))
+            else:
+                id_to_name_lookup_table = Utils.KeyedDefaultDict(self._unknown_item)
+                id_to_name_lookup_table.update({code: name for name, code in name_to_id_lookup_table.items()})
+                self._game_store[game] = collections.ChainMap(self._archipelago_lookup, id_to_name_lookup_table)
             if game == "Archipelago":
                 # Keep track of the Archipelago data package separately so if it gets updated in a custom datapackage,
                 # it updates in all chain maps automatically.
@@ -310,6 +318,8 @@ class CommonContext:
     generator_version: Version = Version(0, 0, 0)
     current_energy_link_value: typing.Optional[int] = None  # to display in UI, gets set by server
     max_size: int = 16*1024*1024  # 16 MB of max incoming packet size
+    outbox_delay: float = 0.1
+    """Seconds that LocationChecks and LocationScouts are held back to be combined with later ones, 0 to disable"""
 
     last_death_link: float = time.time()  # last send/received death link on AP layer
 
@@ -408,6 +418,9 @@ class CommonContext:
         self.checked_locations = set()  # server state
         self.server_locations = set()  # all locations the server knows of, missing_location | checked_locations
         self.locations_info = {}
+        self.outbox_checks: set[int] = set()
+        self.outbox_scouts: dict[int, set[int]] = {}  # by create_as_hint
+        self.outbox_task: asyncio.Task[None] | None = None
 
         self.stored_data = {}
         self.stored_data_notification_keys = set()
@@ -464,6 +477,7 @@ class CommonContext:
         self.generator_version = Version(0, 0, 0)
         self.server = None
         self.server_task = None
+        self.clear_outbox()
         self.hint_cost = None
         self.permissions = {
             "release": "disabled",
@@ -476,6 +490,7 @@ class CommonContext:
             self.disconnected_intentionally = True
             if self.cancel_autoreconnect():
                 logger.info("Cancelled auto-reconnect.")
+        await self.flush_outbox()
         if self.server and not self.server.socket.closed:
             await self.server.socket.close()
         if self.server_task is not None:
@@ -484,10 +499,60 @@ class CommonContext:
             self.ui.update_hints()
 
     async def send_msgs(self, msgs: typing.List[typing.Any]) -> None:
-        """ `msgs` JSON serializable """
+        """
+        `msgs` JSON serializable
+
+        LocationChecks and LocationScouts are held back for `outbox_delay` seconds and combined with the ones sent in
+        that time. Any other message sends them first, so the order of messages is kept.
+        """
         if not self.server or not self.server.socket.open or self.server.socket.closed:
             return
-        await self.server.socket.send(encode(msgs))
+        others = []
+        for msg in msgs:
+            if not self.outbox_delay or not isinstance(msg, dict):
+                others.append(msg)
+            elif msg.get("cmd") == "LocationChecks":
+                self.outbox_checks.update(location for location in msg["locations"]
+                                          if location not in self.checked_locations)
+            elif msg.get("cmd") == "LocationScouts":
+                self.outbox_scouts.setdefault(msg.get("create_as_hint", 0), set()).update(msg["locations"])
+            else:
+                others.append(msg)
+        if others:
+            await self.server.socket.send(encode(self.take_outbox() + others))
+        elif (self.outbox_checks or self.outbox_scouts) and not self.outbox_task:
+            self.outbox_task = asyncio.create_task(self.flush_outbox_later(), name="flush outbox")
+
+    def take_outbox(self) -> typing.List[typing.Dict[str, typing.Any]]:
+        """Returns the held back messages and empties the outbox."""
+        msgs: typing.List[typing.Dict[str, typing.Any]] = []
+        if self.outbox_checks:
+            msgs.append({"cmd": "LocationChecks", "locations": sorted(self.outbox_checks)})
+        for create_as_hint, locations in self.outbox_scouts.items():
+            msgs.append({"cmd": "LocationScouts", "locations": sorted(locations), "create_as_hint": create_as_hint})
+        self.outbox_checks.clear()
+        self.outbox_scouts.clear()
+        return msgs
+
+    async def flush_outbox(self) -> None:
+        """Sends the held back messages now, for example before disconnecting."""
+        if self.outbox_task and self.outbox_task is not asyncio.current_task():
+            self.outbox_task.cancel()
+        self.outbox_task = None
+        msgs = self.take_outbox()
+        if msgs and self.server and self.server.socket.open and not self.server.socket.closed:
+            await self.server.socket.send(encode(msgs))
+
+    async def flush_outbox_later(self) -> None:
+        await asyncio.sleep(self.outbox_delay)
+        await self.flush_outbox()
+
+    def clear_outbox(self) -> None:
+        """Drops the held back messages, as the connection they were meant for is gone."""
+        if self.outbox_task:
+            self.outbox_task.cancel()
+            self.outbox_task = None
+        self.take_outbox()
 
     def consume_players_package(self, package: typing.List[tuple]):
         self.player_names = {slot: name for team, slot, name, orig_name in package if self.team == team}
@@ -529,7 +594,8 @@ class CommonContext:
         await self.send_msgs([{"cmd": "Get", "keys": ["_read_race_mode"]}])
 
     async def check_locations(self, locations: typing.Collection[int]) -> set[int]:
-        """Send new location checks to the server. Returns the set of actually new locations that were sent."""
+        """Send new location checks to the server. Returns the set of actually new locations that were sent.
+        They are combined with other checks of the next `outbox_delay` seconds into one message."""
         locations = set(locations) & self.missing_locations
         if locations:
             await self.send_msgs([{"cmd": 'LocationChecks', "locations": tuple(locations)}])
@@ -619,6 +685,7 @@ class CommonContext:
         self.username = None
         self.password = None
         self.cancel_autoreconnect()
+        await self.flush_outbox()
         if self.server and not self.server.socket.closed:
             await self.server.socket.close()
         if self.server_task:
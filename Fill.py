@@ -20,8 +20,10 @@ class FillError(RuntimeError):
         super().__init__(*args)
 
 
-def _log_fill_progress(name: str, placed: int, total_items: int) -> None:
+def _log_fill_progress(multiworld: MultiWorld, name: str, placed: int, total_items: int) -> None:
     logging.info(f"Current fill step ({name}) at {placed}/{total_items} items placed.")
+    if multiworld.progress:
+        multiworld.progress(f"fill ({name})", placed, total_items)
 
 
 def sweep_from_pool(base_state: CollectionState, itempool: typing.Sequence[Item] = tuple(),
@@ -202,12 +204,12 @@ def fill_restrictive(multiworld: MultiWorld, base_state: CollectionState, locati
             placements.append(spot_to_fill)
             placed += 1
             if not placed % 1000:
-                _log_fill_progress(name, placed, total)
+                _log_fill_progress(multiworld, name, placed, total)
             if on_place:
                 on_place(spot_to_fill)
 
     if total > 1000:
-        _log_fill_progress(name, placed, total)
+        _log_fill_progress(multiworld, name, placed, total)
 
     if cleanup_required:
         # validate all placements and remove invalid ones
@@ -327,10 +329,10 @@ def remaining_fill(multiworld: MultiWorld,
         placements.append(spot_to_fill)
         placed += 1
         if not placed % 1000:
-            _log_fill_progress(name, placed, total)
+            _log_fill_progress(multiworld, name, placed, total)
 
     if total > 1000:
-        _log_fill_progress(name, placed, total)
+        _log_fill_progress(multiworld, name, placed, total)
 
     if unplaced_items and locations:
         # There are leftover unplaceable items and locations that won't accept them
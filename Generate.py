@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import argparse
+import concurrent.futures
 import copy
 import logging
 import os
@@ -20,7 +21,7 @@ ModuleUpdate.update()
 import Utils
 import Options
 from BaseClasses import seeddigits, get_seed, PlandoOptions
-from Utils import parse_yamls, version_tuple, __version__, tuplize_version
+from Utils import parse_yamls_cached, version_tuple, __version__, tuplize_version
 
 
 def mystery_argparse(argv: list[str] | None = None):
@@ -54,6 +55,12 @@ def mystery_argparse(argv: list[str] | None = None):
     parser.add_argument("--skip_output", action="store_true",
                         help="Skips generation assertion and output stages and skips multidata and spoiler output. "
                              "Intended for debugging and testing purposes.")
+    parser.add_argument("--roll_processes", type=int, default=defaults.roll_processes,
+                        help="Amount of worker processes to roll player options in. Above 1, each player's options "
+                             "are rolled from their own random stream derived from the seed.")
+    parser.add_argument("--output_processes", type=int, default=defaults.output_processes,
+                        help="Amount of worker processes to generate output in, for worlds that support it. "
+                             "0 generates all output in threads of this process.")
     parser.add_argument("--spoiler_only", action="store_true",
                         help="Skips generation assertion and multidata, outputting only a spoiler log. "
                              "Intended for debugging and testing purposes.")
@@ -177,6 +184,8 @@ def main(args=None) -> tuple[argparse.Namespace, int]:
                         f"Provide a general weights file ({args.weights_file_path}) or individual player files. "
                         f"A mix is also permitted.")
 
+    import worlds
+    worlds.load_worlds(get_referenced_games(weights_cache, meta_weights))
     from worlds.AutoWorld import AutoWorldRegister
     args.outputname = seed_name
     args.sprite = dict.fromkeys(range(1, args.multi+1), None)
@@ -228,6 +237,10 @@ def main(args=None) -> tuple[argparse.Namespace, int]:
     name_counter = Counter()
     args.player_options = {}
 
+    rolled_settings: dict[int, RolledSettings] = {}
+    if getattr(args, "roll_processes", 0) > 1 and not args.sameoptions:
+        rolled_settings = roll_all_settings(weights_cache, player_path_cache, args.plando, args.roll_processes)
+
     player = 1
     while player <= args.multi:
         path = player_path_cache[player]
@@ -241,11 +254,12 @@ def main(args=None) -> tuple[argparse.Namespace, int]:
             try:
                 # Use the cached settings object if it exists, otherwise roll settings within the try-catch
                 # Invariant: settings_cache[path] and weights_cache[path] have the same length
-                settingsObject: argparse.Namespace = (
-                    settings_cache[path][doc_index]
-                    if settings_cache[path]
-                    else roll_settings(yaml, args.plando)
-                )
+                if settings_cache[path]:
+                    settingsObject: argparse.Namespace = settings_cache[path][doc_index]
+                elif player in rolled_settings:
+                    settingsObject = rolled_settings[player].result()
+                else:
+                    settingsObject = roll_settings(yaml, args.plando)
                 
                 for k, v in vars(settingsObject).items():
                     if v is not None:
@@ -272,7 +286,7 @@ def main(args=None) -> tuple[argparse.Namespace, int]:
                 player_errors.append(
                     f"{len(player_errors) + 1}. "
                     f"File {path} document #{doc_index + 1} (name: {args.name.get(player, name)}) is invalid. "
-                    f"Please fix your yaml.\n{Utils.get_all_causes(e)}")
+                    f"Please fix your yaml.\n{e if isinstance(e, RollError) else Utils.get_all_causes(e)}")
 
             # increment for each yaml document in the file
             player += 1
@@ -291,6 +305,97 @@ def main(args=None) -> tuple[argparse.Namespace, int]:
     return args, seed
 
 
+def get_referenced_games(weights_cache: dict[str, tuple[Any, ...]], meta_weights: dict | None) -> set[str]:
+    """Returns all names that might be games used by the given weights, which are their game choices and sections."""
+    games: set[str] = {category for category in meta_weights or () if isinstance(category, str)}
+    for yamls in weights_cache.values():
+        for yaml in yamls:
+            if not isinstance(yaml, dict):
+                continue
+            games.update(key for key in yaml if isinstance(key, str))
+            game = yaml.get("game")
+            if isinstance(game, str):
+                games.add(game)
+            elif isinstance(game, (dict, list)):
+                games.update(choice for choice in game if isinstance(choice, str))
+    return games
+
+
+class RollError(Exception):
+    """Describes all causes of an exception raised while rolling options in a worker process."""
+
+
+class RolledSettings:
+    """Outcome of rolling one player's options in a worker process, including what it logged."""
+    settings: argparse.Namespace | None = None
+    error: str = ""
+    """all causes of the exception raised while rolling, as reported by Utils.get_all_causes"""
+    records: list[tuple[int, str]]
+
+    def __init__(self) -> None:
+        self.records = []
+
+    def result(self) -> argparse.Namespace:
+        """Replays the logs of the worker and returns the rolled options, or raises the error that occurred."""
+        for level, message in self.records:
+            logging.log(level, message)
+        if self.settings is None:
+            raise RollError(self.error)
+        return self.settings
+
+
+class _RecordCollector(logging.Handler):
+    def __init__(self, rolled: RolledSettings) -> None:
+        super().__init__(logging.DEBUG)
+        self.rolled = rolled
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.rolled.records.append((record.levelno, self.format(record)))
+
+
+def roll_settings_seeded(weights: dict, plando_options: PlandoOptions, seed: int) -> RolledSettings:
+    """Rolls options for one player from their own random stream. Used by roll_all_settings in worker processes."""
+    rolled = RolledSettings()
+    root_logger = logging.getLogger()
+    # forked workers inherit the generator's handlers, collect records instead so they are only logged once
+    old_handlers, old_level = root_logger.handlers, root_logger.level
+    root_logger.handlers = [_RecordCollector(rolled)]
+    root_logger.setLevel(logging.DEBUG)
+    random.seed(seed)
+    try:
+        rolled.settings = roll_settings(weights, plando_options)
+    except Exception as e:
+        logging.exception("Exception while rolling options")
+        rolled.error = Utils.get_all_causes(e)
+    finally:
+        root_logger.handlers = old_handlers
+        root_logger.setLevel(old_level)
+    return rolled
+
+
+def roll_all_settings(weights_cache: dict[str, tuple[Any, ...]], player_path_cache: dict[int, str],
+                      plando_options: PlandoOptions, processes: int) -> dict[int, RolledSettings]:
+    """
+    Rolls options for every player in a process pool. Each player gets a random stream seeded from the current state
+    of the global random, so the results do not depend on the amount of processes.
+    """
+    jobs: dict[int, tuple[dict, int]] = {}
+    player = 1
+    while player <= len(player_path_cache):
+        path = player_path_cache[player]
+        if not path:
+            player += 1
+            continue
+        for yaml in weights_cache[path]:
+            jobs[player] = yaml, random.getrandbits(64)
+            player += 1
+
+    with concurrent.futures.ProcessPoolExecutor(processes) as pool:
+        futures = {player: pool.submit(roll_settings_seeded, yaml, plando_options, seed)
+                   for player, (yaml, seed) in jobs.items()}
+    return {player: future.result() for player, future in futures.items()}
+
+
 def read_weights_yamls(path) -> tuple[Any, ...]:
     try:
         if urllib.parse.urlparse(path).scheme in ('https', 'file'):
@@ -303,7 +408,7 @@ def read_weights_yamls(path) -> tuple[Any, ...]:
 
     from yaml.error import MarkedYAMLError
     try:
-        return tuple(parse_yamls(yaml))
+        return parse_yamls_cached(yaml)
     except MarkedYAMLError as ex:
         if ex.problem_mark:
             lines = yaml.splitlines()
@@ -575,6 +680,9 @@ def roll_settings(weights: dict, plando_options: PlandoOptions = PlandoOptions.b
         if ret.game is None:
             raise Exception('"game" not specified')
         raise Exception(f"Invalid game: {ret.game}")
+    if ret.game not in AutoWorldRegister.world_types:
+        from worlds import load_worlds
+        load_worlds((ret.game,))
     if ret.game not in AutoWorldRegister.world_types:
         from worlds import failed_world_loads
         picks = Utils.get_fuzzy_results(ret.game, list(AutoWorldRegister.world_types) + failed_world_loads, limit=1)[0]
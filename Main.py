@@ -1,11 +1,12 @@
 import collections
 from collections.abc import Mapping
 import concurrent.futures
+import contextlib
 import logging
 import os
 import tempfile
 import time
-from typing import Any
+from typing import Any, Callable
 import zipfile
 import zlib
 
@@ -23,7 +24,14 @@ from worlds.generic.Rules import exclusion_rules, locality_rules
 __all__ = ["main"]
 
 
-def main(args, seed=None, baked_server_options: dict[str, object] | None = None):
+def main(args, seed=None, baked_server_options: dict[str, object] | None = None,
+         progress: Callable[[str, int, int], None] | None = None):
+    """
+    Generates a multiworld from args.
+
+    :param progress: called with each stage of the generation and how many of its steps are done out of how many in
+        total, 0 if the stage has no steps. May raise to abort the generation, the exception propagates out of main.
+    """
     if not baked_server_options:
         baked_server_options = get_settings().server_options.as_dict()
     assert isinstance(baked_server_options, dict)
@@ -34,6 +42,11 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
     start = time.perf_counter()
     # initialize the multiworld
     multiworld = MultiWorld(args.multi)
+    multiworld.progress = progress
+
+    def report(stage: str, done: int = 0, total: int = 0) -> None:
+        if progress:
+            progress(stage, done, total)
 
     logger = logging.getLogger()
     multiworld.set_seed(seed, args.race, str(args.outputname) if args.outputname else None)
@@ -109,12 +122,15 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
         multiworld.worlds[1].options.local_items.value = set()
 
     logger.info('Creating MultiWorld.')
+    report("create_regions")
     AutoWorld.call_all(multiworld, "create_regions")
 
     logger.info('Creating Items.')
+    report("create_items")
     AutoWorld.call_all(multiworld, "create_items")
 
     logger.info('Calculating Access Rules.')
+    report("set_rules")
     AutoWorld.call_all(multiworld, "set_rules")
 
     for player in multiworld.player_ids:
@@ -185,15 +201,18 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
         multiworld._all_state = None
 
     logger.info("Running Item Plando.")
+    report("item_plando")
     resolve_early_locations_for_planned(multiworld)
     distribute_planned_blocks(multiworld, [x for player in multiworld.plando_item_blocks
                                            for x in multiworld.plando_item_blocks[player]])
 
     logger.info('Running Pre Main Fill.')
+    report("pre_fill")
 
     AutoWorld.call_all(multiworld, "pre_fill")
 
     logger.info(f'Filling the multiworld with {len(multiworld.itempool)} items.')
+    report("fill", 0, len(multiworld.itempool))
 
     if multiworld.algorithm == 'flood':
         flood_items(multiworld)  # different algo, biased towards early game progress items
@@ -203,6 +222,7 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
     AutoWorld.call_all(multiworld, 'post_fill')
 
     if multiworld.players > 1 and not args.skip_prog_balancing:
+        report("progression_balancing")
         balance_multiworld_progression(multiworld)
     else:
         logger.info("Progression balancing skipped.")
@@ -215,6 +235,7 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
         return multiworld
 
     logger.info(f'Beginning output...')
+    report("output")
     outfilebase = 'AP_' + multiworld.seed_name
 
     if args.spoiler_only:
@@ -230,7 +251,16 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
     with output as temp_dir:
         output_players = [player for player in multiworld.player_ids if AutoWorld.World.generate_output.__code__
                           is not multiworld.worlds[player].generate_output.__code__]
-        with concurrent.futures.ThreadPoolExecutor(len(output_players) + 2) as pool:
+        output_processes: int = getattr(args, "output_processes", 0)
+        process_players = [player for player in multiworld.player_ids if output_processes and
+                           AutoWorld.World.get_output_data.__code__
+                           is not multiworld.worlds[player].get_output_data.__code__]
+        output_players = [player for player in output_players if player not in process_players]
+        # only start worker processes if a world is going to use them
+        process_pool_context = concurrent.futures.ProcessPoolExecutor(min(output_processes, len(process_players))) \
+            if process_players else contextlib.nullcontext()
+        with concurrent.futures.ThreadPoolExecutor(len(output_players) + len(process_players) + 2) as pool, \
+                process_pool_context as process_pool:
             check_accessibility_task = pool.submit(multiworld.fulfills_accessibility)
 
             output_file_futures = [pool.submit(AutoWorld.call_stage, multiworld, "generate_output", temp_dir)]
@@ -238,6 +268,10 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
                 # skip starting a thread for methods that say "pass".
                 output_file_futures.append(
                     pool.submit(AutoWorld.call_single, multiworld, "generate_output", player, temp_dir))
+            for player in process_players:
+                # CPU-bound output of worlds that opted in runs in worker processes, free of the GIL.
+                output_file_futures.append(
+                    pool.submit(AutoWorld.call_output_process, multiworld, player, temp_dir, process_pool))
 
             # collect ER hint info
             er_hint_data: dict[int, dict[int, str]] = {}
@@ -368,9 +402,11 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
                 if i % 10 == 0 or i == len(output_file_futures):
                     logger.info(f'Generating output files ({i}/{len(output_file_futures)}).')
                 future.result()
+                report("output", i, len(output_file_futures))
 
         if args.spoiler > 1:
             logger.info('Calculating playthrough.')
+            report("playthrough")
             multiworld.spoiler.create_playthrough(create_paths=args.spoiler > 2)
 
         if args.spoiler:
@@ -378,6 +414,7 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
 
         zipfilename = output_path(f"AP_{multiworld.seed_name}.zip")
         logger.info(f"Creating final archive at {zipfilename}")
+        report("archive")
         with zipfile.ZipFile(zipfilename, mode="w", compression=zipfile.ZIP_DEFLATED,
                              compresslevel=9) as zf:
             for file in os.scandir(temp_dir):
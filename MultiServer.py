@@ -557,6 +557,26 @@ class Context:
             server_options = decoded_obj.get("server_options", {})
             self._set_options(server_options)
 
+        # import worlds of this room that were deferred by lazy world loading, or loaded after the game data was read
+        import worlds
+        lazy_games = {game_name for game_name in self.games.values() if not self.gamespackage.get(game_name)}
+        if lazy_games:
+            worlds.load_worlds(lazy_games)
+            # these may be shared with other rooms, see WebHostContext.load, so only copies get modified
+            self.gamespackage = dict(self.gamespackage)
+            self.item_name_groups = dict(self.item_name_groups)
+            self.location_name_groups = dict(self.location_name_groups)
+            for game_name in lazy_games:
+                world = worlds.AutoWorldRegister.world_types.get(game_name)
+                if world and game_name in worlds.network_data_package["games"]:
+                    self.item_name_groups[game_name] = world.item_name_groups
+                    self.location_name_groups[game_name] = world.location_name_groups
+                    self.non_hintable_names[game_name] = world.hint_blacklist
+                    self.gamespackage[game_name] = {
+                        key: value for key, value in worlds.network_data_package["games"][game_name].items()
+                        if key not in ("item_name_groups", "location_name_groups")
+                    }
+
         # embedded data package
         for game_name, data in decoded_obj.get("datapackage", {}).items():
             if game_name in game_data_packages:
@@ -882,6 +902,13 @@ class Context:
         if targets:
             self.broadcast(targets, [{"cmd": "SetReply", "key": key, "value": self.client_game_state[team, slot]}])
 
+    def on_new_location_checks(self, team: int, slot: int, locations: typing.Set[int]):
+        pass
+
+    def on_items_received(self, team: int, slot: int, index: int, items: typing.Sequence[NetworkItem]):
+        """items were appended to the remote received items of team, slot, the first of them at index"""
+        pass
+
 
 def update_aliases(ctx: Context, team: int):
     cmd = ctx.dumper([{"cmd": "RoomUpdate",
@@ -1123,10 +1150,13 @@ def get_remaining(ctx: Context, team: int, slot: int) -> typing.List[typing.Tupl
 
 def send_items_to(ctx: Context, team: int, target_slot: int, *items: NetworkItem):
     for target in ctx.slot_set(target_slot):
+        received_items = get_received_items(ctx, team, target, True)
+        index = len(received_items)
         for item in items:
             if item.player != target_slot:
                 get_received_items(ctx, team, target, False).append(item)
-            get_received_items(ctx, team, target, True).append(item)
+            received_items.append(item)
+        ctx.on_items_received(team, target, index, items)
 
 
 def register_location_checks(ctx: Context, team: int, slot: int, locations: typing.Iterable[int],
@@ -1164,6 +1194,7 @@ def register_location_checks(ctx: Context, team: int, slot: int, locations: typi
         del sortable
 
         ctx.location_checks[team, slot] |= new_locations
+        ctx.on_new_location_checks(team, slot, new_locations)
         send_new_items(ctx)
         ctx.broadcast(ctx.clients[team][slot], [{
             "cmd": "RoomUpdate",
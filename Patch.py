@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+import argparse
+import concurrent.futures
 import os
-import sys
-from typing import Tuple, Optional, TypedDict
+from typing import Iterator, List, Tuple, Optional, TypedDict
 
 if __name__ == "__main__":
     import ModuleUpdate
@@ -29,7 +30,27 @@ def create_rom_file(patch_file: str) -> Tuple[RomMeta, str]:
     raise NotImplementedError(f"No Handler for {patch_file} found.")
 
 
+def create_rom_files(patch_files: List[str], processes: Optional[int] = None) \
+        -> Iterator[Tuple[str, Tuple[RomMeta, str]]]:
+    """
+    Applies many patch files in a process pool, yielding (patch_file, create_rom_file result) as each finishes.
+    Each worker process loads and verifies a game's base data only once, for all patches of that game it handles.
+    """
+    if len(patch_files) < 2 or processes == 1:
+        for patch_file in patch_files:
+            yield patch_file, create_rom_file(patch_file)
+        return
+    with concurrent.futures.ProcessPoolExecutor(processes) as pool:
+        futures = {pool.submit(create_rom_file, patch_file): patch_file for patch_file in patch_files}
+        for future in concurrent.futures.as_completed(futures):
+            yield futures[future], future.result()
+
+
 if __name__ == "__main__":
-    for file in sys.argv[1:]:
-        meta_data, result_file = create_rom_file(file)
-        print(f"Patch with meta-data {meta_data} was written to {result_file}")
+    parser = argparse.ArgumentParser(description="Apply Archipelago patch files.")
+    parser.add_argument("patch_files", nargs="+", help="Patch files to apply.")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="Maximum number of patches to apply in parallel, defaults to the cpu count.")
+    args = parser.parse_args()
+    for file, (meta_data, result_file) in create_rom_files(args.patch_files, args.processes):
+        print(f"Patch {file} with meta-data {meta_data} was written to {result_file}")
@@ -9,6 +9,7 @@ import subprocess
 import base64
 import logging
 import asyncio
+import collections
 import enum
 import typing
 
@@ -52,6 +53,21 @@ class SNIClientCommandProcessor(ClientCommandProcessor):
 
         self.output(f"Setting slow mode to {self.ctx.slow_mode}")
 
+    def _cmd_snes_stats(self) -> bool:
+        """Show how many SNES requests recent game watcher ticks needed and how long they took."""
+        ticks = self.ctx.snes_tick_stats
+        if not ticks:
+            self.output("No game watcher ticks recorded yet.")
+            return False
+        count = len(ticks)
+        self.output(f"Last {count} ticks: "
+                    f"{sum(tick.round_trips for tick in ticks) / count:.1f} round trips, "
+                    f"{sum(tick.cache_hits for tick in ticks) / count:.1f} cached reads, "
+                    f"{sum(tick.bytes_read for tick in ticks) / count:.0f} bytes read and "
+                    f"{sum(tick.duration for tick in ticks) / count * 1000:.1f} ms per tick on average, "
+                    f"slowest tick {max(tick.duration for tick in ticks) * 1000:.1f} ms.")
+        return True
+
     @mark_raw
     def _cmd_snes(self, snes_options: str = "") -> bool:
         """Connect to a snes. Optionally include network address of a snes to connect to,
@@ -114,6 +130,44 @@ class SNIClientCommandProcessor(ClientCommandProcessor):
     #     return True
 
 
+class SnesSnapshot:
+    """
+    Memory read during one game watcher tick, so that repeated and overlapping reads of the tick are served from it.
+    Only reads that opt in with cached=True use it, as a tick may wait for memory to change, e.g. while killing the
+    player for deathlink, and only those of the task running the tick. Also counts requests of the tick.
+    """
+    regions: typing.List[typing.Tuple[int, bytes]]
+    round_trips: int = 0
+    cache_hits: int = 0
+    bytes_read: int = 0
+    duration: float = 0
+
+    def __init__(self) -> None:
+        self.task = asyncio.current_task()
+        self.regions = []
+        self.start = time.perf_counter()
+
+    def get(self, address: int, size: int) -> typing.Optional[bytes]:
+        for start, data in self.regions:
+            if start <= address and address + size <= start + len(data):
+                self.cache_hits += 1
+                return data[address - start:address - start + size]
+        return None
+
+    def add(self, address: int, data: bytes) -> None:
+        self.regions.append((address, data))
+        self.bytes_read += len(data)
+
+    def invalidate(self, address: int, size: int) -> None:
+        """Forget regions overlapping a write."""
+        self.regions = [(start, data) for start, data in self.regions
+                        if start + len(data) <= address or address + size <= start]
+
+    def finish(self) -> None:
+        self.regions = []
+        self.duration = time.perf_counter() - self.start
+
+
 class SNIContext(CommonContext):
     command_processor: typing.Type[SNIClientCommandProcessor] = SNIClientCommandProcessor
     game: typing.Optional[str] = None  # set in validate_rom
@@ -129,6 +183,8 @@ class SNIContext(CommonContext):
     snes_recv_queue: "asyncio.Queue[bytes]"
     snes_request_lock: asyncio.Lock
     snes_write_buffer: typing.List[typing.Tuple[int, bytes]]
+    snes_snapshot: typing.Optional[SnesSnapshot]
+    snes_tick_stats: typing.Deque[SnesSnapshot]
     snes_connector_lock: threading.Lock
     death_state: DeathState
     killing_player_task: "typing.Optional[asyncio.Task[None]]"
@@ -155,6 +211,8 @@ class SNIContext(CommonContext):
         self.snes_recv_queue = asyncio.Queue()
         self.snes_request_lock = asyncio.Lock()
         self.snes_write_buffer = []
+        self.snes_snapshot = None
+        self.snes_tick_stats = collections.deque(maxlen=100)
         self.snes_connector_lock = threading.Lock()
         self.death_state = DeathState.alive  # for death link flop behaviour
         self.killing_player_task = None
@@ -515,7 +573,28 @@ async def snes_recv_loop(ctx: SNIContext) -> None:
             ctx.snes_autoreconnect_task = asyncio.create_task(snes_autoreconnect(ctx), name="snes auto-reconnect")
 
 
-async def snes_read(ctx: SNIContext, address: int, size: int) -> typing.Optional[bytes]:
+async def snes_read(ctx: SNIContext, address: int, size: int, cached: bool = False) -> typing.Optional[bytes]:
+    data = await snes_read_multi(ctx, [(address, size)], cached)
+    return data[0] if data else None
+
+
+async def snes_read_multi(ctx: SNIContext, reads: typing.Sequence[typing.Tuple[int, int]], cached: bool = False) \
+        -> typing.Optional[typing.List[bytes]]:
+    """
+    Read several (address, size) regions with a single request, returning their data in the same order.
+    With cached, regions already read with cached during the current game watcher tick are not requested again,
+    only use it for memory that is not expected to change during the tick.
+    Keep the total size below worlds.AutoSNIClient.SNES_READ_CHUNK_SIZE.
+    """
+    snapshot = ctx.snes_snapshot
+    if snapshot and snapshot.task is not asyncio.current_task():
+        snapshot = None
+    results: typing.List[typing.Optional[bytes]] = [snapshot.get(address, size) if snapshot and cached else None
+                                                    for address, size in reads]
+    missing = [(address, size) for (address, size), data in zip(reads, results) if data is None]
+    if not missing:
+        return typing.cast(typing.List[bytes], results)
+
     try:
         await ctx.snes_request_lock.acquire()
 
@@ -530,13 +609,16 @@ async def snes_read(ctx: SNIContext, address: int, size: int) -> typing.Optional
         GetAddress_Request: SNESRequest = {
             "Opcode": "GetAddress",
             "Space": "SNES",
-            "Operands": [hex(address)[2:], hex(size)[2:]]
+            "Operands": [operand for address, size in missing for operand in (hex(address)[2:], hex(size)[2:])]
         }
         try:
             await ctx.snes_socket.send(dumps(GetAddress_Request))
         except ConnectionClosed:
             return None
+        if snapshot:
+            snapshot.round_trips += 1
 
+        size = sum(size for _, size in missing)
         data: bytes = bytes()
         while len(data) < size:
             try:
@@ -545,18 +627,28 @@ async def snes_read(ctx: SNIContext, address: int, size: int) -> typing.Optional
                 break
 
         if len(data) != size:
-            snes_logger.error('Error reading %s, requested %d bytes, received %d' % (hex(address), size, len(data)))
+            snes_logger.error('Error reading %s, requested %d bytes, received %d' %
+                              (", ".join(hex(address) for address, _ in missing), size, len(data)))
             if len(data):
                 snes_logger.error(str(data))
                 snes_logger.warning('Communication Failure with SNI')
             if ctx.snes_socket is not None and not ctx.snes_socket.closed:
                 await ctx.snes_socket.close()
             return None
-
-        return data
     finally:
         ctx.snes_request_lock.release()
 
+    offset = 0
+    missing_data = iter(missing)
+    for index, result in enumerate(results):
+        if result is None:
+            address, size = next(missing_data)
+            results[index] = data[offset:offset + size]
+            offset += size
+            if snapshot and cached:
+                snapshot.add(address, results[index])
+    return typing.cast(typing.List[bytes], results)
+
 
 async def snes_write(ctx: SNIContext, write_list: typing.List[typing.Tuple[int, bytes]]) -> bool:
     try:
@@ -569,6 +661,8 @@ async def snes_write(ctx: SNIContext, write_list: typing.List[typing.Tuple[int,
         PutAddress_Request: SNESRequest = {"Opcode": "PutAddress", "Operands": [], 'Space': 'SNES'}
         try:
             for address, data in write_list:
+                if ctx.snes_snapshot:
+                    ctx.snes_snapshot.invalidate(address, len(data))
                 PutAddress_Request['Operands'] = [hex(address)[2:], hex(len(data))[2:]]
                 if ctx.snes_socket is not None:
                     await ctx.snes_socket.send(dumps(PutAddress_Request))
@@ -659,6 +753,7 @@ async def game_watcher(ctx: SNIContext) -> None:
 
         perf_counter = time.perf_counter()
 
+        ctx.snes_snapshot = snapshot = SnesSnapshot()
         try:
             await ctx.client_handler.game_watcher(ctx)
         except Exception as e:
@@ -666,6 +761,10 @@ async def game_watcher(ctx: SNIContext) -> None:
             text_file_logger = logging.getLogger()
             text_file_logger.exception(e)
             await snes_disconnect(ctx)
+        finally:
+            ctx.snes_snapshot = None
+            snapshot.finish()
+            ctx.snes_tick_stats.append(snapshot)
 
 
 async def run_game(romfile: str) -> None:
@@ -13,6 +13,7 @@ import pickle
 import functools
 import io
 import collections
+import threading
 import importlib
 import logging
 import warnings
@@ -259,6 +260,99 @@ parse_yaml = functools.partial(load, Loader=UniqueKeyLoader)
 parse_yamls = functools.partial(load_all, Loader=UniqueKeyLoader)
 unsafe_parse_yaml = functools.partial(load, Loader=UnsafeLoader)
 
+
+yaml_cache_size = 64 * 1024 * 1024
+"""Bytes of parsed yamls kept on disk, least recently used ones are removed beyond that"""
+
+
+def _prune_yaml_cache(directory: str) -> None:
+    entries = []
+    for entry in os.scandir(directory):
+        if entry.name.endswith(".pickle"):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:  # removed by another process
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+    size = sum(entry_size for _, entry_size, _ in entries)
+    for _, entry_size, entry_path in sorted(entries):
+        if size <= yaml_cache_size:
+            break
+        try:
+            os.remove(entry_path)
+        except OSError:
+            pass
+        size -= entry_size
+
+
+yaml_memory_cache_size = 16 * 1024 * 1024
+"""Bytes of parsed yamls kept in memory, least recently used ones are removed beyond that"""
+_yaml_memory_cache: "collections.OrderedDict[str, bytes]" = collections.OrderedDict()
+_yaml_memory_cache_bytes = 0
+_yaml_memory_cache_lock = threading.Lock()
+
+
+def _remember_parsed_yamls(key: str, data: bytes) -> None:
+    global _yaml_memory_cache_bytes
+    with _yaml_memory_cache_lock:
+        if key in _yaml_memory_cache:
+            return
+        _yaml_memory_cache[key] = data
+        _yaml_memory_cache_bytes += len(data)
+        while _yaml_memory_cache_bytes > yaml_memory_cache_size and _yaml_memory_cache:
+            _, removed = _yaml_memory_cache.popitem(last=False)
+            _yaml_memory_cache_bytes -= len(removed)
+
+
+def _parse_yamls_pickled(text: Union[str, bytes], key: str) -> bytes:
+    path = cache_path("yaml", f"{key}.pickle")
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        restricted_loads(data)  # only accept what restricted_dumps would have written
+        os.utime(path)  # mark as recently used for _prune_yaml_cache
+        return data
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logging.debug(f"Could not load cached yaml {path}: {e}")
+
+    documents = tuple(parse_yamls(text))
+    try:
+        data = restricted_dumps(documents)
+    except pickle.PicklingError:
+        # e.g. timestamps, which the SafeLoader turns into datetime objects; keep those in memory only
+        return pickle.dumps(documents)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        _prune_yaml_cache(os.path.dirname(path))
+    except Exception as e:
+        logging.debug(f"Could not store cached yaml {path}: {e}")
+    return data
+
+
+def parse_yamls_cached(text: Union[str, bytes]) -> typing.Tuple[Any, ...]:
+    """
+    Returns all documents of a yaml text like tuple(parse_yamls(text)), but caches the parsed documents keyed by the
+    text's content hash, in memory bounded by yaml_memory_cache_size and on disk under cache_path("yaml") bounded by
+    yaml_cache_size. Each call returns new objects, so the documents may be modified by the caller.
+    """
+    import hashlib
+    content = text if isinstance(text, bytes) else text.encode("utf-8")
+    key = hashlib.sha256(__version__.encode() + b"\n" + content).hexdigest()
+    with _yaml_memory_cache_lock:
+        data = _yaml_memory_cache.get(key)
+        if data is not None:
+            _yaml_memory_cache.move_to_end(key)
+    if data is None:
+        data = _parse_yamls_pickled(text, key)
+        _remember_parsed_yamls(key, data)
+    return pickle.loads(data)
+
 del load, load_all  # should not be used. don't leak their names
 
 
@@ -353,14 +447,28 @@ def get_file_safe_name(name: str) -> str:
 
 
 def load_data_package_for_checksum(game: str, checksum: typing.Optional[str]) -> Dict[str, Any]:
+    """Returns the cached data package of a game for a checksum, or an empty dict if it isn't cached.
+    The name tables of packages from the binary cache are read-only mappings that are looked up lazily."""
     if checksum and game:
         if checksum != get_file_safe_name(checksum):
             raise ValueError(f"Bad symbols in checksum: {checksum}")
-        path = cache_path("datapackage", get_file_safe_name(game), f"{checksum}.json")
+        from datapackage_cache import load_packed
+        game_folder = cache_path("datapackage", get_file_safe_name(game))
+        try:
+            packed = load_packed(os.path.join(game_folder, f"{checksum}.bin"))
+            if packed is not None:
+                return packed
+        except Exception as e:
+            logging.debug(f"Could not load packed data package: {e}")
+
+        path = os.path.join(game_folder, f"{checksum}.json")
         if os.path.exists(path):
             try:
                 with open(path, "r", encoding="utf-8-sig") as f:
-                    return json.load(f)
+                    data = json.load(f)
+                # convert caches of older versions, so they are only parsed once
+                store_data_package_for_checksum(game, data)
+                return data
             except Exception as e:
                 logging.debug(f"Could not load data package: {e}")
 
@@ -373,18 +481,29 @@ def load_data_package_for_checksum(game: str, checksum: typing.Optional[str]) ->
     return {}
 
 
-def store_data_package_for_checksum(game: str, data: typing.Dict[str, Any]) -> None:
+def store_data_package_for_checksum(game: str, data: typing.Mapping[str, Any]) -> None:
     checksum = data.get("checksum")
     if checksum and game:
         if checksum != get_file_safe_name(checksum):
             raise ValueError(f"Bad symbols in checksum: {checksum}")
+        from datapackage_cache import write_packed
         game_folder = cache_path("datapackage", get_file_safe_name(game))
         os.makedirs(game_folder, exist_ok=True)
-        try:
-            with open(os.path.join(game_folder, f"{checksum}.json"), "w", encoding="utf-8-sig") as f:
-                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
-        except Exception as e:
-            logging.debug(f"Could not store data package: {e}")
+        # the content of a checksum never changes, so existing files are kept. The JSON file is still written for
+        # older versions and other tools sharing the cache, the binary file may be mapped by other clients.
+        path = os.path.join(game_folder, f"{checksum}.json")
+        if not os.path.exists(path):
+            try:
+                with open(path, "w", encoding="utf-8-sig") as f:
+                    json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            except Exception as e:
+                logging.debug(f"Could not store data package: {e}")
+        path = os.path.join(game_folder, f"{checksum}.bin")
+        if not os.path.exists(path):
+            try:
+                write_packed(path, data)
+            except Exception as e:
+                logging.debug(f"Could not store packed data package: {e}")
 
 
 def get_default_adjuster_settings(game_name: str) -> Namespace:
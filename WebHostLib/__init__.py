@@ -40,11 +40,16 @@ app.config["HOSTERS"] = 8  # maximum concurrent room hosters
 app.config["SELFLAUNCH"] = True  # application process is in charge of launching Rooms.
 app.config["SELFLAUNCHCERT"] = None  # can point to a SSL Certificate to encrypt Room websocket connections
 app.config["SELFLAUNCHKEY"] = None  # can point to a SSL Certificate Key to encrypt Room websocket connections
+# seconds between checks for rooms to start that were requested by other processes, such as separate web workers
+app.config["AUTOHOST_POLL_INTERVAL"] = 1
 app.config["SELFGEN"] = True  # application process is in charge of scheduling Generations.
 # at what amount of worlds should scheduling be used, instead of rolling in the web-thread
 app.config["JOB_THRESHOLD"] = 1
 # after what time in seconds should generation be aborted, freeing the queue slot. Can be set to None to disable.
 app.config["JOB_TIME"] = 600
+# estimated cost (players + games) above which a queued generation counts as large.
+# Large generations never take the last free generator, so small ones keep moving.
+app.config["GENERATION_LARGE_COST"] = 30
 # memory limit for generator processes in bytes
 app.config["GENERATOR_MEMORY_LIMIT"] = 4294967296
 
@@ -58,6 +63,22 @@ app.config["PONY"] = {
     'create_db': True
 }
 app.config["MAX_ROLL"] = 20
+# limit for the total size of files extracted from an uploaded zip, to stop zip bombs early
+app.config["MAX_EXTRACTED_SIZE"] = 1024 * 1024 * 1024
+# processes that recompress uploaded multidata, so the web process stays responsive. 0 to do it in the web thread
+app.config["UPLOAD_WORKERS"] = 2
+# how many decoded seeds and room saves trackers keep in memory between requests, per web process
+app.config["TRACKER_CACHED_SEEDS"] = 32
+app.config["TRACKER_CACHED_SAVES"] = 128
+# local database that room hosters publish live tracker updates to, streamed by /api/tracker_feed. None to disable.
+# each open stream holds one of the WAITRESS_THREADS, so this is off by default.
+# enable with e.g. os.path.abspath('tracker_feed.db3')
+app.config["TRACKER_FEED"] = None
+# seconds a live tracker stream stays open before the browser has to reconnect, freeing the web thread in between
+app.config["TRACKER_FEED_STREAM_TIME"] = 60
+# live tracker streams served at once per web process, keep this well below WAITRESS_THREADS.
+# further streams are told to reconnect after TRACKER_FEED_STREAM_TIME
+app.config["TRACKER_FEED_STREAMS"] = 3
 app.config["CACHE_TYPE"] = "SimpleCache"
 app.config["HOST_ADDRESS"] = ""
 app.config["ASSET_RIGHTS"] = False
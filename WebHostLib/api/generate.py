@@ -1,15 +1,15 @@
-import json
+from datetime import datetime
 from uuid import UUID
 
 from flask import request, session, url_for
 from markupsafe import Markup
-from pony.orm import commit
+from pony.orm import commit, select
 
-from Utils import restricted_dumps
 from WebHostLib import app
+from WebHostLib.autolauncher import order_generation_jobs
 from WebHostLib.check import get_yaml_data, roll_options
-from WebHostLib.generate import get_meta
-from WebHostLib.models import Generation, STATE_QUEUED, Seed, STATE_ERROR
+from WebHostLib.generate import get_meta, queue_generation
+from WebHostLib.models import Generation, GenerationJob, STATE_QUEUED, Seed, STATE_ERROR
 from . import api_endpoints
 
 
@@ -55,11 +55,8 @@ def generate_api():
             return {"text": str(results),
                     "detail": results}, 400
         else:
-            gen = Generation(
-                options=restricted_dumps({name: vars(options) for name, options in gen_options.items()}),
-                # convert to json compatible
-                meta=json.dumps(meta), state=STATE_QUEUED,
-                owner=session["_id"])
+            gen = queue_generation({name: vars(options) for name, options in gen_options.items()},
+                                   meta, session["_id"])
             commit()
             return {"text": f"Generation of seed {gen.id} started successfully.",
                     "detail": gen.id,
@@ -82,4 +79,16 @@ def wait_seed_api(seed: UUID):
         return {"text": "Generation not found"}, 404
     elif generation.state == STATE_ERROR:
         return {"text": "Generation failed"}, 500
-    return {"text": "Generation running"}, 202
+    elif generation.state == STATE_QUEUED:
+        return {"text": "Generation queued", "queue_position": get_queue_position(generation)}, 202
+    job = generation.job
+    progress = {"stage": job.stage, "done": job.stage_done, "total": job.stage_total} if job and job.stage else None
+    return {"text": "Generation running", "progress": progress}, 202
+
+
+def get_queue_position(generation: Generation) -> int | None:
+    """Number of queued generations that autogen would start before this one, None if unknown."""
+    if not generation.job:
+        return None
+    queued = select(job for job in GenerationJob if job.generation.state == STATE_QUEUED)
+    return order_generation_jobs(queued, datetime.utcnow()).index(generation.job)
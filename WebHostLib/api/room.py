@@ -20,13 +20,14 @@ def room_info(room_id: UUID) -> Dict[str, Any]:
 
     downloads = []
     for slot in sorted(room.seed.slots):
-        if slot.data and not supports_apdeltapatch(slot.game):
+        patch_data = slot.patch_data
+        if patch_data and not supports_apdeltapatch(slot.game):
             slot_download = {
                 "slot": slot.player_id,
                 "download": url_for("download_slot_file", room_id=room.id, player_id=slot.player_id)
             }
             downloads.append(slot_download)
-        elif slot.data:
+        elif patch_data:
             slot_download = {
                 "slot": slot.player_id,
                 "download": url_for("download_patch", patch_id=slot.id, room_id=room.id)
@@ -1,16 +1,25 @@
+import functools
+import threading
+import time
 from datetime import datetime, timezone
-from typing import Any, TypedDict
+from typing import Any, Iterator, TypedDict
 from uuid import UUID
 
-from flask import abort
+from flask import Response, abort, current_app
 
 from NetUtils import ClientStatus, Hint, NetworkItem, SlotType
 from WebHostLib import cache
 from WebHostLib.api import api_endpoints
+from WebHostLib.feed import TrackerFeed
 from WebHostLib.models import Room
 from WebHostLib.tracker import TrackerData
 
 
+_feed_streams_lock = threading.Lock()
+_feed_streams = 0
+"""Number of tracker feed streams open in this process, limited by TRACKER_FEED_STREAMS"""
+
+
 class PlayerAlias(TypedDict):
     team: int
     player: int
@@ -78,8 +87,10 @@ def tracker_data(tracker: UUID) -> dict[str, Any]:
     if not room:
         abort(404)
 
-    tracker_data = TrackerData(room)
+    return get_tracker_data(TrackerData(room))
 
+
+def get_tracker_data(tracker_data: TrackerData) -> dict[str, Any]:
     all_players: dict[int, list[int]] = tracker_data.get_all_players()
 
     player_aliases: list[PlayerAlias] = []
@@ -167,6 +178,87 @@ def tracker_data(tracker: UUID) -> dict[str, Any]:
     }
 
 
+@api_endpoints.route("/tracker_feed/<suuid:tracker>")
+def tracker_feed(tracker: UUID) -> Response:
+    """
+    Streams live tracking data as Server-Sent Events from <root_path>/api/tracker_feed/<id of current session tracker>.
+
+    The first event is "snapshot", in the format of /api/tracker. It is followed by "update" events, each a list of
+    changes since, published by the room while it is running:
+
+    - {"type": "checks", "team", "player", "locations"}: locations newly checked by the player
+    - {"type": "items", "team", "player", "index", "items"}: items received by the player, the first at index
+    - {"type": "hints", "team", "player", "hints"}: all hints of the slot, replacing the previous ones
+    - {"type": "status", "team", "player", "status"}: new client status of the player
+
+    Changes may repeat what is already in the snapshot. The stream ends after a while, reconnecting fetches a new
+    snapshot. Each open stream holds a web thread, so only TRACKER_FEED_STREAMS are served at once. Beyond that, the
+    stream only tells the browser to reconnect later, with a "retry" field and no events.
+
+    :param tracker: UUID of current session tracker.
+    """
+    global _feed_streams
+    feed_path: str | None = current_app.config["TRACKER_FEED"]
+    if not feed_path:
+        abort(404)
+    room: Room | None = Room.get(tracker=tracker)
+    if not room:
+        abort(404)
+
+    stream_time: float = current_app.config["TRACKER_FEED_STREAM_TIME"]
+    with _feed_streams_lock:
+        busy = _feed_streams >= current_app.config["TRACKER_FEED_STREAMS"]
+        if not busy:
+            _feed_streams += 1
+    if busy:
+        return Response(f"retry: {int(stream_time * 1000)}\n\n", mimetype="text/event-stream",
+                        headers={"Cache-Control": "no-cache"})
+
+    released = False
+
+    def release() -> None:
+        global _feed_streams
+        nonlocal released
+        with _feed_streams_lock:
+            if not released:
+                released = True
+                _feed_streams -= 1
+
+    try:
+        tracker_data = TrackerData(room)
+        dumps = functools.partial(current_app.json.dumps, separators=(",", ":"))
+        snapshot = dumps(get_tracker_data(tracker_data))
+    except BaseException:
+        release()
+        raise
+    position: int = tracker_data._multisave.get("feed_position", 0)
+    room_id: UUID = room.id
+
+    def stream() -> Iterator[str]:
+        nonlocal position
+        end = time.monotonic() + stream_time
+        feed = TrackerFeed(feed_path)
+        try:
+            yield f"event: snapshot\ndata: {snapshot}\n\n"
+            while True:
+                events = feed.read(room_id, position)
+                if events:
+                    position = events[-1][0]
+                    yield f"event: update\ndata: {dumps([event for _, event in events])}\n\n"
+                if time.monotonic() >= end:
+                    break
+                if not events:
+                    time.sleep(1)
+        finally:
+            feed.close()
+            release()
+
+    response = Response(stream(), mimetype="text/event-stream",
+                        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    response.call_on_close(release)  # the stream may be closed before it started
+    return response
+
+
 class PlayerGroups(TypedDict):
     slot: int
     name: str
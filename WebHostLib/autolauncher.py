@@ -3,18 +3,24 @@ from __future__ import annotations
 import json
 import logging
 import multiprocessing
+import time
 import typing
 from datetime import timedelta, datetime
-from threading import Event, Thread
+from threading import Event, Lock, Thread
 from typing import Any
 from uuid import UUID
 
-from pony.orm import db_session, select, commit, PrimaryKey
+from pony.orm import count, db_session, select, commit, rollback, PrimaryKey
+from pony.orm.core import TransactionIntegrityError
 
 from Utils import restricted_loads
 from .locker import Locker, AlreadyRunningException
 
 _stop_event = Event()
+_launch_event = Event()  # wakes up autohost to look at RoomLaunch requests
+
+LOST_GENERATION_MARGIN = 60
+"""Seconds past JOB_TIME after which a generation that did not report back counts as lost"""
 
 
 def stop() -> None:
@@ -23,6 +29,23 @@ def stop() -> None:
     stop_event = _stop_event
     _stop_event = Event()  # new event for new threads
     stop_event.set()
+    _launch_event.set()
+
+
+def request_room_launch(room: Room) -> None:
+    """
+    Queue the room to be started by autohost, if it is not already queued. Has to be called in a db_session,
+    commits it.
+    """
+    commit()  # so a conflicting launch request only rolls back itself
+    if not room.launch:
+        try:
+            RoomLaunch(room=room)
+            commit()
+        except TransactionIntegrityError:
+            rollback()  # a concurrent request queued the room in the meantime
+    # autohost of this process will pick it up immediately, any other autohost on its next poll
+    _launch_event.set()
 
 
 def handle_generation_success(seed_id):
@@ -52,7 +75,17 @@ def _mp_gen_game(
         setproctitle(f"Generator (idle)")
 
 
-def launch_generator(pool: multiprocessing.pool.Pool, generation: Generation, timeout: int|None) -> None:
+def launch_generator(pool: multiprocessing.pool.Pool, generation: Generation, timeout: int|None,
+                     done: typing.Callable[[], Any] = lambda: None) -> None:
+    """Start generation in pool. done is called once it finished, failed or could not be started."""
+    def on_success(seed_id) -> None:
+        done()
+        handle_generation_success(seed_id)
+
+    def on_failure(result: BaseException) -> None:
+        done()
+        handle_generation_failure(result)
+
     try:
         meta = json.loads(generation.meta)
         options = restricted_loads(generation.options)
@@ -66,17 +99,96 @@ def launch_generator(pool: multiprocessing.pool.Pool, generation: Generation, ti
                 "owner": generation.owner,
                 "timeout": timeout,
             },
-            handle_generation_success,
-            handle_generation_failure,
+            on_success,
+            on_failure,
         )
     except Exception as e:
         generation.state = STATE_ERROR
         commit()
         logging.exception(e)
+        done()
     else:
         generation.state = STATE_STARTED
 
 
+def get_generation_job(generation: Generation) -> GenerationJob:
+    """Returns the job of a generation, creating it for generations queued without one."""
+    if not generation.job:
+        GenerationJob(generation=generation, cost=estimate_cost(restricted_loads(generation.options)))
+    return generation.job
+
+
+class RunningGenerations:
+    """
+    Generations handed to the generator pool, with their cost. Finished ones are removed from the pool's result
+    thread, while autogen reads them, so all access is locked.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._running: typing.Dict[UUID, typing.Tuple[int, float]] = {}  # id to cost and start time
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._running)
+
+    def add(self, generation_id: UUID, cost: int, now: float) -> None:
+        with self._lock:
+            self._running[generation_id] = (cost, now)
+
+    def finish(self, generation_id: UUID) -> None:
+        with self._lock:
+            self._running.pop(generation_id, None)
+
+    def count_above(self, cost: int) -> int:
+        """Number of running generations that cost more than cost."""
+        with self._lock:
+            return sum(running_cost > cost for running_cost, _ in self._running.values())
+
+    def expire(self, started_before: float) -> typing.List[UUID]:
+        """
+        Removes and returns the generations started before started_before. These are lost, as the pool never
+        reports back for a task whose worker process died, e.g. by being killed for running out of memory.
+        """
+        with self._lock:
+            lost = [generation_id for generation_id, (_, started) in self._running.items()
+                    if started < started_before]
+            for generation_id in lost:
+                del self._running[generation_id]
+        return lost
+
+
+def fail_lost_generation(generation_id: UUID) -> None:
+    """Marks a generation whose worker process died as failed. Has to be called in a db_session."""
+    generation = Generation.get(id=generation_id)
+    if generation and generation.state == STATE_STARTED:
+        logging.error(f"Generation {generation_id} was lost by its generator process")
+        generation.state = STATE_ERROR
+        meta = json.loads(generation.meta)
+        meta["error"] = "The generator process of this seed stopped unexpectedly, " \
+                        "possibly by running out of memory. Please consider generating locally instead."
+        generation.meta = json.dumps(meta)
+
+
+def reap_lost_generations(running: RunningGenerations, job_time: typing.Optional[int], now: float) -> None:
+    """
+    Fails the running generations that should have timed out after job_time a while ago. Without a job_time,
+    generations may run indefinitely, so none can be told apart from lost ones.
+    """
+    if job_time is None:
+        return
+    lost = running.expire(now - job_time - LOST_GENERATION_MARGIN)
+    if lost:
+        with db_session:
+            for generation_id in lost:
+                fail_lost_generation(generation_id)
+
+
+def order_generation_jobs(jobs: typing.Iterable[GenerationJob], now: datetime) -> typing.List[GenerationJob]:
+    """Cheapest jobs first, each minute of waiting in the queue lowers the cost by one, so large jobs can't starve."""
+    return sorted(jobs, key=lambda job: job.cost - (now - job.queued).total_seconds() / 60)
+
+
 def init_generator(config: dict[str, Any]) -> None:
     from setproctitle import setproctitle
 
@@ -105,14 +217,31 @@ def cleanup():
     with db_session:
         # >>> bool(uuid.UUID(int=0))
         # True
+        RoomLaunch.select(lambda launch: launch.room.owner == UUID(int=0)).delete(bulk=True)
         rooms = Room.select(lambda room: room.owner == UUID(int=0)).delete(bulk=True)
         seeds = Seed.select(lambda seed: seed.owner == UUID(int=0) and not seed.rooms).delete(bulk=True)
+        SlotPatch.select(lambda link: not link.slot.seed).delete(bulk=True)
         slots = Slot.select(lambda slot: not slot.seed).delete(bulk=True)
+        # a patch blob's reference count is the number of slots linking it
+        PatchChunk.select(lambda chunk: not chunk.blob.links).delete(bulk=True)
+        PatchBlob.select(lambda blob: not blob.links).delete(bulk=True)
         # Command gets deleted by ponyorm Cascade Delete, as Room is Required
     if rooms or seeds or slots:
         logging.info(f"{rooms} Rooms, {seeds} Seeds and {slots} Slots have been deleted.")
 
 
+def is_room_active(room: Room) -> bool:
+    return room.last_activity >= datetime.utcnow() - timedelta(seconds=room.timeout + 5)
+
+
+def start_room(hosters: typing.Sequence[MultiworldInstance], room: Room) -> None:
+    """Start the room on the least loaded hoster, unless it is hosted already."""
+    if any(room.id in hoster.room_loads for hoster in hosters):
+        return  # should already be hosted currently.
+    hoster = min(hosters, key=lambda instance: instance.load)
+    hoster.start_room(room.id, count(room.seed.slots))
+
+
 def autohost(config: dict):
     def keep_running():
         stop_event = _stop_event
@@ -125,15 +254,32 @@ def autohost(config: dict):
                     hosters.append(hoster)
                     hoster.start()
 
-                while not stop_event.wait(0.1):
+                with db_session:
+                    # resume rooms that were running before autohost was restarted
+                    rooms = select(
+                        room for room in Room if
+                        room.last_activity >= datetime.utcnow() - timedelta(days=3))
+                    for room in rooms:
+                        # we have to filter twice, as the per-room timeout can't currently be PonyORM transpiled.
+                        if is_room_active(room):
+                            start_room(hosters, room)
+
+                while not stop_event.is_set():
+                    _launch_event.clear()
+                    stopped_rooms = [room_id for hoster in hosters for room_id in hoster.collect_stopped_rooms()]
                     with db_session:
-                        rooms = select(
-                            room for room in Room if
-                            room.last_activity >= datetime.utcnow() - timedelta(days=3))
-                        for room in rooms:
-                            # we have to filter twice, as the per-room timeout can't currently be PonyORM transpiled.
-                            if room.last_activity >= datetime.utcnow() - timedelta(seconds=room.timeout + 5):
-                                hosters[room.id.int % len(hosters)].start_room(room.id)
+                        for room_id in stopped_rooms:
+                            # the room may have been requested again while it was shutting down
+                            room = Room.get(id=room_id)
+                            if room and is_room_active(room):
+                                start_room(hosters, room)
+                        launches = select(launch for launch in RoomLaunch).order_by(RoomLaunch.requested)
+                        for launch in launches.limit(100):
+                            if is_room_active(launch.room):  # not marked as idle since the request
+                                start_room(hosters, launch.room)
+                            launch.delete()
+                    # requests from other processes can't set the event, so they are polled for
+                    _launch_event.wait(config["AUTOHOST_POLL_INTERVAL"])
 
         except AlreadyRunningException:
             logging.info("Autohost reports as already running, not starting another.")
@@ -147,9 +293,22 @@ def autogen(config: dict):
         try:
             with Locker("autogen"):
 
-                with multiprocessing.Pool(config["GENERATORS"], initializer=init_generator,
+                generators = config["GENERATORS"]
+                # one generator is kept free of large jobs, so they can't block small ones
+                large_generators = max(1, generators - 1)
+                large_cost = config["GENERATION_LARGE_COST"]
+                running = RunningGenerations()
+
+                with multiprocessing.Pool(generators, initializer=init_generator,
                                           initargs=(config,), maxtasksperchild=10) as generator_pool:
                     job_time = config["JOB_TIME"]
+
+                    def start(job: GenerationJob) -> None:
+                        sid = job.generation.id
+                        running.add(sid, job.cost, time.monotonic())
+                        launch_generator(generator_pool, job.generation, timeout=job_time,
+                                         done=lambda: running.finish(sid))
+
                     with db_session:
                         to_start = select(generation for generation in Generation if generation.state == STATE_STARTED)
 
@@ -160,19 +319,28 @@ def autogen(config: dict):
                                 if sid:
                                     generation.delete()
                                 else:
-                                    launch_generator(generator_pool, generation, timeout=job_time)
+                                    start(get_generation_job(generation))
 
                             commit()
                         select(generation for generation in Generation if generation.state == STATE_ERROR).delete()
 
                     while not stop_event.wait(0.1):
+                        reap_lost_generations(running, job_time, time.monotonic())
+                        if len(running) >= generators:
+                            continue
                         with db_session:
                             # for update locks the database row(s) during transaction, preventing writes from elsewhere
                             to_start = select(
                                 generation for generation in Generation
                                 if generation.state == STATE_QUEUED).for_update()
-                            for generation in to_start:
-                                launch_generator(generator_pool, generation, timeout=job_time)
+                            jobs = order_generation_jobs((get_generation_job(generation) for generation in to_start),
+                                                         datetime.utcnow())
+                            for job in jobs:
+                                if len(running) >= generators:
+                                    break
+                                if job.cost > large_cost and running.count_above(large_cost) >= large_generators:
+                                    continue
+                                start(job)
         except AlreadyRunningException:
             logging.info("Autogen reports as already running, not starting another.")
 
@@ -181,12 +349,13 @@ def autogen(config: dict):
 
 class MultiworldInstance():
     def __init__(self, config: dict, id: int):
-        self.room_ids = set()
+        self.room_loads: typing.Dict[UUID, int] = {}  # hosted room ids to their estimated load
         self.process: typing.Optional[multiprocessing.Process] = None
         self.ponyconfig = config["PONY"]
         self.cert = config["SELFLAUNCHCERT"]
         self.key = config["SELFLAUNCHKEY"]
         self.host = config["HOST_ADDRESS"]
+        self.tracker_feed = config["TRACKER_FEED"]
         self.rooms_to_start = multiprocessing.Queue()
         self.rooms_shutting_down = multiprocessing.Queue()
         self.name = f"MultiHoster{id}"
@@ -198,18 +367,30 @@ class MultiworldInstance():
         process = multiprocessing.Process(group=None, target=run_server_process,
                                           args=(self.name, self.ponyconfig, get_static_server_data(),
                                                 self.cert, self.key, self.host,
-                                                self.rooms_to_start, self.rooms_shutting_down),
+                                                self.rooms_to_start, self.rooms_shutting_down, self.tracker_feed),
                                           name=self.name)
         process.start()
         self.process = process
 
-    def start_room(self, room_id):
+    @property
+    def load(self) -> int:
+        return sum(self.room_loads.values())
+
+    def collect_stopped_rooms(self) -> typing.List[UUID]:
+        """Returns ids of rooms that finished shutting down since the last call."""
+        stopped_rooms = []
         while not self.rooms_shutting_down.empty():
-            self.room_ids.remove(self.rooms_shutting_down.get(block=True, timeout=None))
-        if room_id in self.room_ids:
+            room_id = self.rooms_shutting_down.get(block=True, timeout=None)
+            self.room_loads.pop(room_id, None)
+            stopped_rooms.append(room_id)
+        return stopped_rooms
+
+    def start_room(self, room_id: UUID, slots: int = 1):
+        if room_id in self.room_loads:
             pass  # should already be hosted currently.
         else:
-            self.room_ids.add(room_id)
+            # each room takes a connection and a save loop, then more players mean more traffic
+            self.room_loads[room_id] = 1 + slots
             self.rooms_to_start.put(room_id)
 
     def stop(self):
@@ -225,6 +406,7 @@ class MultiworldInstance():
         self.process = None
 
 
-from .models import Room, Generation, STATE_QUEUED, STATE_STARTED, STATE_ERROR, db, Seed, Slot
+from .models import Room, RoomLaunch, Generation, GenerationJob, STATE_QUEUED, STATE_STARTED, STATE_ERROR, db, Seed, \
+    Slot, SlotPatch, PatchBlob, PatchChunk
 from .customserver import run_server_process, get_static_server_data
-from .generate import gen_game
+from .generate import gen_game, estimate_cost
@@ -6,13 +6,13 @@ import datetime
 import functools
 import logging
 import multiprocessing
-import pickle
 import random
 import socket
 import threading
 import time
 import typing
 import sys
+from uuid import UUID
 
 import websockets
 from pony.orm import commit, db_session, select
@@ -23,9 +23,12 @@ from MultiServer import (
     Context, server, auto_shutdown, ServerCommandProcessor, ClientMessageProcessor, load_server_cert,
     server_per_message_deflate_factory,
 )
+from NetUtils import NetworkItem
 from Utils import restricted_loads, cache_argsless
+from .feed import TrackerFeed
 from .locker import Locker
 from .models import Command, GameDataPackage, Room, db
+from .multisave import decode_save, encode_save
 
 
 class CustomClientMessageProcessor(ClientMessageProcessor):
@@ -62,6 +65,9 @@ class DBCommandProcessor(ServerCommandProcessor):
 
 class WebHostContext(Context):
     room_id: int
+    feed: typing.Optional[TrackerFeed] = None
+    feed_interval: float = 0.5
+    """seconds to collect tracker events for, before publishing them together"""
 
     def __init__(self, static_server_data: dict, logger: logging.Logger):
         # static server data is used during _load_game_data to load required data,
@@ -74,6 +80,12 @@ class WebHostContext(Context):
         self.main_loop = asyncio.get_running_loop()
         self.video = {}
         self.tags = ["AP", "WebHost"]
+        self.feed_lock = threading.Lock()
+        self.feed_publish_lock = threading.Lock()
+        self.feed_events: typing.List[typing.Dict[str, typing.Any]] = []
+        self.feed_flush_scheduled = False
+        self.feed_saved_position = 0
+        self.db_command_processor = DBCommandProcessor(self)
 
     def __del__(self):
         try:
@@ -89,19 +101,69 @@ class WebHostContext(Context):
             setattr(self, key, value)
         self.non_hintable_names = collections.defaultdict(frozenset, self.non_hintable_names)
 
-    def listen_to_db_commands(self):
-        cmdprocessor = DBCommandProcessor(self)
-
-        while not self.exit_event.is_set():
-            with db_session:
-                commands = select(command for command in Command if command.room.id == self.room_id)
-                if commands:
-                    for command in commands:
-                        self.main_loop.call_soon_threadsafe(cmdprocessor, command.commandtext)
-                        command.delete()
-                    commit()
-            del commands
-            time.sleep(5)
+    def on_new_location_checks(self, team: int, slot: int, locations: typing.Set[int]):
+        super().on_new_location_checks(team, slot, locations)
+        self.add_feed_event({"type": "checks", "team": team, "player": slot, "locations": sorted(locations)})
+
+    def on_items_received(self, team: int, slot: int, index: int, items: typing.Sequence[NetworkItem]):
+        super().on_items_received(team, slot, index, items)
+        self.add_feed_event({"type": "items", "team": team, "player": slot, "index": index, "items": list(items)})
+
+    def on_changed_hints(self, team: int, slot: int):
+        super().on_changed_hints(team, slot)
+        self.add_feed_event({"type": "hints", "team": team, "player": slot, "hints": sorted(self.hints[team, slot])})
+
+    def on_client_status_change(self, team: int, slot: int):
+        super().on_client_status_change(team, slot)
+        self.add_feed_event({"type": "status", "team": team, "player": slot,
+                             "status": self.client_game_state[team, slot]})
+
+    def add_feed_event(self, event: typing.Dict[str, typing.Any]):
+        """Buffer a tracker event, merging it into the previous one where possible, and schedule publishing it."""
+        if not self.feed:
+            return
+        with self.feed_lock:
+            last = self.feed_events[-1] if self.feed_events else None
+            if last and last["type"] == event["type"] and last["team"] == event["team"] \
+                    and last["player"] == event["player"]:
+                if event["type"] == "checks":
+                    last["locations"] = sorted(set(last["locations"]) | set(event["locations"]))
+                    return
+                if event["type"] == "items" and last["index"] + len(last["items"]) == event["index"]:
+                    last["items"] += event["items"]
+                    return
+                if event["type"] in ("hints", "status"):
+                    self.feed_events[-1] = event
+                    return
+            self.feed_events.append(event)
+            if self.feed_flush_scheduled:
+                return
+            self.feed_flush_scheduled = True
+        # publishing writes to the feed database, which may wait on its lock, so it must not block the room's loop
+        self.main_loop.call_soon_threadsafe(self.main_loop.call_later, self.feed_interval,
+                                            self.main_loop.run_in_executor, None, self.flush_feed)
+
+    def flush_feed(self, prune: bool = False) -> int:
+        """Publish buffered tracker events and return the feed position that includes them.
+        With prune, events included in the last save are dropped from the feed, as that save has been committed.
+        Blocks on the feed database, so it runs in the saving thread or the loop's executor, never on the loop itself."""
+        # held while publishing, so flushes of the executor and the saving thread publish events in order
+        with self.feed_publish_lock:
+            with self.feed_lock:
+                events, self.feed_events = self.feed_events, []
+                self.feed_flush_scheduled = False
+            if not self.feed:
+                return 0
+            try:
+                if prune and self.feed_saved_position:
+                    self.feed.prune(self.room_id, self.feed_saved_position)
+                if events:
+                    return self.feed.publish(self.room_id, events)
+                return self.feed.position()
+            except Exception as e:
+                # live trackers are a convenience, they catch up from the next save
+                self.logger.exception(e)
+                return self.feed_saved_position
 
     @db_session
     def load(self, room_id: int):
@@ -156,15 +218,20 @@ class WebHostContext(Context):
             with db_session:
                 savegame_data = Room.get(id=self.room_id).multisave
                 if savegame_data:
-                    self.set_save(restricted_loads(Room.get(id=self.room_id).multisave))
+                    savegame_data = decode_save(savegame_data)
+                    self.set_save(savegame_data)
+                    self.feed_saved_position = savegame_data.get("feed_position", 0)
             self._start_async_saving(atexit_save=False)
-        threading.Thread(target=self.listen_to_db_commands, daemon=True).start()
 
     @db_session
     def _save(self, exit_save: bool = False) -> bool:
         room = Room.get(id=self.room_id)
-        # Does not use Utils.restricted_dumps because we'd rather make a save than not make one
-        room.multisave = pickle.dumps(self.get_save())
+        if self.feed:
+            feed_position = self.flush_feed(prune=True)
+        save = self.get_save()
+        if self.feed:
+            save["feed_position"] = self.feed_saved_position = feed_position
+        room.multisave = encode_save(save)
         # saving only occurs on activity, so we can "abuse" this information to mark this as last_activity
         if not exit_save:  # we don't want to count a shutdown as activity, which would restart the server again
             room.last_activity = datetime.datetime.utcnow()
@@ -176,6 +243,47 @@ class WebHostContext(Context):
         return d
 
 
+class CommandDispatcher(threading.Thread):
+    """Fetches Commands for all rooms of this process in one query and hands them to each room's event loop."""
+    interval: float = 5
+
+    def __init__(self):
+        super().__init__(name="CommandDispatcher", daemon=True)
+        self._lock = threading.Lock()
+        self._contexts: typing.Dict[UUID, WebHostContext] = {}
+
+    def add(self, ctx: WebHostContext):
+        with self._lock:
+            self._contexts[ctx.room_id] = ctx
+
+    def remove(self, ctx: WebHostContext):
+        with self._lock:
+            if self._contexts.get(ctx.room_id) is ctx:
+                del self._contexts[ctx.room_id]
+
+    def run(self):
+        while 1:
+            time.sleep(self.interval)
+            with self._lock:
+                contexts = self._contexts.copy()
+            if contexts:
+                try:
+                    self.dispatch(contexts)
+                except Exception as e:
+                    logging.exception(e)
+
+    @staticmethod
+    @db_session
+    def dispatch(contexts: typing.Dict[UUID, WebHostContext]):
+        room_ids = list(contexts)
+        commands = select(command for command in Command if command.room.id in room_ids).order_by(Command.id)
+        for command in commands:
+            ctx = contexts[command.room.id]
+            ctx.main_loop.call_soon_threadsafe(ctx.db_command_processor, command.commandtext)
+            command.delete()
+        commit()
+
+
 def get_random_port():
     return random.randint(49152, 65535)
 
@@ -231,7 +339,8 @@ def set_up_logging(room_id) -> logging.Logger:
 
 def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
                        cert_file: typing.Optional[str], cert_key_file: typing.Optional[str],
-                       host: str, rooms_to_run: multiprocessing.Queue, rooms_shutting_down: multiprocessing.Queue):
+                       host: str, rooms_to_run: multiprocessing.Queue, rooms_shutting_down: multiprocessing.Queue,
+                       tracker_feed: typing.Optional[str] = None):
     from setproctitle import setproctitle
 
     setproctitle(name)
@@ -271,6 +380,12 @@ def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
                 load_date = today
             return ssl_context
 
+    # publishes live tracker updates of all rooms of this process
+    feed = TrackerFeed(tracker_feed) if tracker_feed else None
+    # forwards commands from the web frontend to all rooms of this process
+    command_dispatcher = CommandDispatcher()
+    command_dispatcher.start()
+
     del ponyconfig
     gc.collect()  # free intermediate objects used during setup
 
@@ -281,8 +396,10 @@ def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
             try:
                 logger = set_up_logging(room_id)
                 ctx = WebHostContext(static_server_data, logger)
+                ctx.feed = feed
                 ctx.load(room_id)
                 ctx.init_save()
+                command_dispatcher.add(ctx)
                 assert ctx.server is None
                 try:
                     ctx.server = websockets.serve(
@@ -340,6 +457,7 @@ def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
                     setattr(asyncio.current_task(), "save", None)
             finally:
                 try:
+                    command_dispatcher.remove(ctx)
                     ctx.save_dirty = False  # make sure the saving thread does not write to DB after final wakeup
                     ctx.exit_event.set()  # make sure the saving thread stops at some point
                     # NOTE: async saving should probably be an async task and could be merged with shutdown_task
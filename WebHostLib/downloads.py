@@ -18,7 +18,7 @@ def download_patch(room_id, patch_id):
     else:
         room = Room.get(id=room_id)
         last_port = room.last_port
-        filelike = BytesIO(patch.data)
+        filelike = BytesIO(patch.patch_data)
         greater_than_version_3 = zipfile.is_zipfile(filelike)
         if greater_than_version_3:
             # Python's zipfile module cannot overwrite/delete files in a zip, so we recreate the whole thing in ram
@@ -62,12 +62,12 @@ def download_slot_file(room_id, player_id: int):
         import io
 
         if slot_data.game == "Factorio":
-            with zipfile.ZipFile(io.BytesIO(slot_data.data)) as zf:
+            with zipfile.ZipFile(io.BytesIO(slot_data.patch_data)) as zf:
                 for name in zf.namelist():
                     if name.endswith("info.json"):
                         fname = name.rsplit("/", 1)[0] + ".zip"
         elif slot_data.game == "Ocarina of Time":
-            stream = io.BytesIO(slot_data.data)
+            stream = io.BytesIO(slot_data.patch_data)
             if zipfile.is_zipfile(stream):
                 with zipfile.ZipFile(stream) as zf:
                     for name in zf.namelist():
@@ -89,7 +89,7 @@ def download_slot_file(room_id, player_id: int):
             fname = f"AP+{app.jinja_env.filters['suuid'](room_id)}_P{slot_data.player_id}_{slot_data.player_name}.apmq"
         else:
             return "Game download not supported."
-        return send_file(io.BytesIO(slot_data.data), as_attachment=True, download_name=fname)
+        return send_file(io.BytesIO(slot_data.patch_data), as_attachment=True, download_name=fname)
 
 
 @app.route("/templates")
@@ -0,0 +1,69 @@
+"""
+Local broker for live tracker updates.
+
+Room hosters publish compact per-room deltas (checks, received items, hints, client status) into a queue,
+which web processes read to stream them to trackers, without waiting for Room.multisave to be written.
+The queue is a SQLite database in WAL mode, as hosters and web processes run on the same machine.
+
+Each room save records the feed position it includes as "feed_position", so a subscriber can take the save as
+snapshot and apply all later events of that room. Events are idempotent: checks are added to a set,
+received items carry their index and hints and status replace the previous value.
+"""
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import typing
+from uuid import UUID
+
+__all__ = ["TrackerFeed"]
+
+
+class TrackerFeed:
+    """Connection to the tracker feed database at path. Can be shared between threads."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute("CREATE TABLE IF NOT EXISTS events "
+                                     "(id INTEGER PRIMARY KEY AUTOINCREMENT, room BLOB NOT NULL, data TEXT NOT NULL)")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS events_room ON events (room, id)")
+
+    def publish(self, room_id: UUID, events: typing.Iterable[typing.Dict[str, typing.Any]]) -> int:
+        """Append events for a room and return the resulting feed position."""
+        rows = [(room_id.bytes, json.dumps(event, separators=(",", ":"))) for event in events]
+        with self._lock, self._connection:
+            self._connection.executemany("INSERT INTO events (room, data) VALUES (?, ?)", rows)
+            return self._position()
+
+    def position(self) -> int:
+        """Id of the newest event ever published, of any room. Later events will have a higher id."""
+        with self._lock:
+            return self._position()
+
+    def _position(self) -> int:
+        row = self._connection.execute("SELECT seq FROM sqlite_sequence WHERE name = 'events'").fetchone()
+        return row[0] if row else 0
+
+    def read(self, room_id: UUID, after: int, limit: int = 1000) \
+            -> typing.List[typing.Tuple[int, typing.Dict[str, typing.Any]]]:
+        """Returns up to limit (id, event) of a room that were published after position after, oldest first."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id, data FROM events WHERE room = ? AND id > ? ORDER BY id LIMIT ?",
+                (room_id.bytes, after, limit)).fetchall()
+        return [(event_id, json.loads(data)) for event_id, data in rows]
+
+    def prune(self, room_id: UUID, upto: int) -> None:
+        """Delete events of a room up to and including position upto."""
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM events WHERE room = ? AND id <= ?", (room_id.bytes, upto))
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
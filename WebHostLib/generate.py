@@ -3,12 +3,13 @@ import json
 import os
 import random
 import tempfile
+import time
 import zipfile
 from collections import Counter
 from pickle import PicklingError
 from typing import Any
 
-from flask import flash, redirect, render_template, request, session, url_for
+from flask import abort, flash, redirect, render_template, request, session, url_for
 from pony.orm import commit, db_session
 
 from BaseClasses import get_seed, seeddigits
@@ -18,7 +19,7 @@ from Utils import __version__, restricted_dumps, DaemonThreadPoolExecutor
 from WebHostLib import app
 from settings import ServerOptions, GeneratorOptions
 from .check import get_yaml_data, roll_options
-from .models import Generation, STATE_ERROR, STATE_QUEUED, Seed, UUID
+from .models import Generation, GenerationJob, STATE_ERROR, STATE_QUEUED, Seed, UUID
 from .upload import upload_zip_to_db
 
 
@@ -77,6 +78,57 @@ def format_exception(e: BaseException) -> str:
     return f"{e.__class__.__name__}: {e}"
 
 
+class GenerationCancelled(Exception):
+    pass
+
+
+def estimate_cost(gen_options: dict[str, dict[str, Any]]) -> int:
+    """Rough relative cost of a generation: each player counts once and each distinct game once more for its setup."""
+    games = {settings.get("game") for settings in gen_options.values()}
+    return len(gen_options) + len(games)
+
+
+def queue_generation(gen_options: dict[str, dict[str, Any]], meta: dict[str, Any], owner: UUID) -> Generation:
+    """Creates a queued Generation for autogen to pick up. Raises PicklingError for options that can't be stored."""
+    gen = Generation(
+        options=restricted_dumps(gen_options),
+        # convert to json compatible
+        meta=json.dumps(meta),
+        state=STATE_QUEUED,
+        owner=owner)
+    GenerationJob(generation=gen, cost=estimate_cost(gen_options))
+    return gen
+
+
+class GenerationProgress:
+    """
+    Stores the progress Main reports for a running generation in its GenerationJob.
+    Once the job is cancelled, the next report raises GenerationCancelled, which aborts the generation.
+    """
+    interval: float = 1  # seconds between DB updates within a stage
+
+    def __init__(self, sid: UUID) -> None:
+        self.sid = sid
+        self.stage = ""
+        self.last_update = 0.
+
+    def __call__(self, stage: str, done: int, total: int) -> None:
+        now = time.monotonic()
+        if stage == self.stage and now - self.last_update < self.interval:
+            return
+        self.stage = stage
+        self.last_update = now
+        with db_session:
+            job = GenerationJob.get(generation=self.sid)
+            if job is None:
+                return
+            if job.cancelled:
+                raise GenerationCancelled("Generation was cancelled.")
+            job.stage = stage
+            job.stage_done = done
+            job.stage_total = total
+
+
 def start_generation(options: dict[str, dict | str], meta: dict[str, Any]):
     results, gen_options = roll_options(options, set(meta["plando_options"]))
 
@@ -88,12 +140,8 @@ def start_generation(options: dict[str, dict | str], meta: dict[str, Any]):
         return redirect(url_for(request.endpoint, **(request.view_args or {})))
     elif len(gen_options) >= app.config["JOB_THRESHOLD"]:
         try:
-            gen = Generation(
-                options=restricted_dumps({name: vars(options) for name, options in gen_options.items()}),
-                # convert to json compatible
-                meta=json.dumps(meta),
-                state=STATE_QUEUED,
-                owner=session["_id"])
+            gen = queue_generation({name: vars(options) for name, options in gen_options.items()},
+                                   meta, session["_id"])
         except PicklingError as e:
             from .autolauncher import handle_generation_failure
             handle_generation_failure(e)
@@ -169,10 +217,12 @@ def gen_game(gen_options: dict, meta: dict[str, Any] | None = None, owner=None,
             args.name[player] = handle_name(args.name[player], player, name_counter)
         if len(set(args.name.values())) != len(args.name):
             raise Exception(f"Names have to be unique. Names: {Counter(args.name.values())}")
-        ERmain(args, seed, baked_server_options=meta["server_options"])
+        ERmain(args, seed, baked_server_options=meta["server_options"], progress=progress)
 
         return upload_to_db(target.name, sid, owner, race)
 
+    progress = GenerationProgress(sid) if sid else None
+
     thread_pool = DaemonThreadPoolExecutor(max_workers=1)
     thread = thread_pool.submit(task)
 
@@ -207,7 +257,7 @@ def gen_game(gen_options: dict, meta: dict[str, Any] | None = None, owner=None,
     finally:
         # free resources claimed by thread pool, if possible
         # NOTE: Timeout depends on the process being killed at some point
-        #       since we can't actually cancel a running gen at the moment.
+        #       since a running gen can only be cancelled when it reports progress.
         thread_pool.shutdown(wait=False, cancel_futures=True)
 
 
@@ -225,7 +275,24 @@ def wait_seed(seed: UUID):
         meta = json.loads(generation.meta)
         details = json.dumps(meta, indent=4).strip()
         return render_template("seedError.html", seed_error=meta["error"], details=details)
-    return render_template("waitSeed.html", seed_id=seed_id)
+    return render_template("waitSeed.html", seed_id=seed_id, generation=generation)
+
+
+@app.route('/cancel/<suuid:seed>', methods=['POST'])
+def cancel_generation(seed: UUID):
+    generation = Generation.get(id=seed)
+    if not generation:
+        return abort(404)
+    if generation.owner != session["_id"]:
+        return abort(403)
+    if generation.state == STATE_QUEUED:
+        generation.state = STATE_ERROR
+        meta = json.loads(generation.meta)
+        meta["error"] = format_exception(GenerationCancelled("Generation was cancelled before it started."))
+        generation.meta = json.dumps(meta)
+    elif generation.job:
+        generation.job.cancelled = True  # picked up by the next progress report of the running generation
+    return redirect(url_for("wait_seed", seed=seed))
 
 
 def upload_to_db(folder, sid, owner, race):
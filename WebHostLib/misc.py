@@ -11,6 +11,7 @@ from werkzeug.utils import secure_filename
 
 from worlds.AutoWorld import AutoWorldRegister, World
 from . import app, cache
+from .autolauncher import request_room_launch
 from .markdown import render_markdown
 from .models import Seed, Room, Command, UUID, uuid4
 from Utils import title_sorted
@@ -174,6 +175,7 @@ def new_room(seed: UUID):
     if not seed:
         abort(404)
     room = Room(seed=seed, owner=session["_id"], tracker=uuid4())
+    request_room_launch(room)
     commit()
     return redirect(url_for("host_room", room=room.id))
 
@@ -241,7 +243,8 @@ def host_room(room: UUID):
     if now - room.last_activity > datetime.timedelta(minutes=1):
         # we only set last_activity if needed, otherwise parallel access on /room will cause an internal server error
         # due to "pony.orm.core.OptimisticCheckError: Object Room was updated outside of current transaction"
-        room.last_activity = now  # will trigger a spinup, if it's not already running
+        room.last_activity = now
+        request_room_launch(room)  # will trigger a spinup, if it's not already running
 
     browser_tokens = "Mozilla", "Chrome", "Safari"
     automated = ("update" in request.args
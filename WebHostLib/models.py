@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 from uuid import UUID, uuid4
 from pony.orm import Database, PrimaryKey, Required, Set, Optional, buffer, LongStr
 
@@ -13,9 +13,42 @@ class Slot(db.Entity):
     id = PrimaryKey(int, auto=True)
     player_id = Required(int)
     player_name = Required(str)
-    data = Optional(bytes, lazy=True)
+    data = Optional(bytes, lazy=True)  # patch file of slots uploaded before PatchBlob existed
     seed = Optional('Seed')
     game = Required(str)
+    patch_link = Optional('SlotPatch', cascade_delete=True)
+
+    @property
+    def patch_data(self) -> bytes | None:
+        """The slot's patch file, if it has one."""
+        if self.patch_link:
+            return self.patch_link.blob.data
+        return self.data
+
+
+class PatchBlob(db.Entity):
+    # patch files by content, shared between all slots with the same file. Referenced by SlotPatch.
+    checksum = PrimaryKey(str)  # sha256 of data
+    links = Set('SlotPatch')
+    chunks = Set('PatchChunk', cascade_delete=True)
+
+    @property
+    def data(self) -> bytes:
+        """The patch file, joined from its chunks."""
+        return b"".join(chunk.data for chunk in self.chunks.order_by(lambda chunk: chunk.position))
+
+
+class PatchChunk(db.Entity):
+    # consecutive pieces of a PatchBlob's file, so uploads can store it without holding all of it in memory
+    blob = Required(PatchBlob)
+    position = Required(int)
+    data = Required(bytes, lazy=True)
+    PrimaryKey(blob, position)
+
+
+class SlotPatch(db.Entity):
+    slot = PrimaryKey(Slot)
+    blob = Required(PatchBlob, index=True)
 
 
 class Room(db.Entity):
@@ -31,6 +64,14 @@ class Room(db.Entity):
     tracker = Optional(UUID, index=True)
     # Port special value -1 means the server errored out. Another attempt can be made with a page refresh
     last_port = Optional(int, default=lambda: 0)
+    launch = Optional('RoomLaunch', cascade_delete=True)
+    counted = Required(bool, default=False)  # slots were added to GamesPlayed by WebHostLib.stats
+
+
+class RoomLaunch(db.Entity):
+    # queue of Rooms that want to run, flagged by the frontend and consumed by autohost, oldest request first
+    room = PrimaryKey(Room)
+    requested = Required(datetime, default=lambda: datetime.utcnow(), index=True)
 
 
 class Seed(db.Entity):
@@ -56,8 +97,34 @@ class Generation(db.Entity):
     options = Required(buffer, lazy=True)
     meta = Required(LongStr, default=lambda: "{\"race\": false}")
     state = Required(int, default=0, index=True)
+    job = Optional('GenerationJob', cascade_delete=True)
+
+
+class GenerationJob(db.Entity):
+    # scheduling and progress of a queued Generation
+    generation = PrimaryKey(Generation)
+    cost = Required(int)  # estimated from players and games, cheaper jobs are started first
+    queued = Required(datetime, default=lambda: datetime.utcnow())
+    stage = Optional(str)  # stage of Main.main the running generation is in
+    stage_done = Required(int, default=0)  # steps of the stage done, such as items placed or output files written
+    stage_total = Required(int, default=0)  # steps of the stage in total, 0 if it is not counted
+    cancelled = Required(bool, default=False)
 
 
 class GameDataPackage(db.Entity):
     checksum = PrimaryKey(str)
     data = Required(bytes)
+
+
+class GamesPlayed(db.Entity):
+    # slots of rooms created per day and game, aggregated by WebHostLib.stats
+    day = Required(date, index=True)
+    game = Required(str)
+    count = Required(int, default=0)
+    PrimaryKey(day, game)
+
+
+class Aggregation(db.Entity):
+    # when an aggregate table was last brought up to date
+    name = PrimaryKey(str)
+    until = Required(datetime)
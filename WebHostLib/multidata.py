@@ -0,0 +1,82 @@
+"""Multidata processing that can run in a worker process, without loading the worlds or the web app's routes."""
+import concurrent.futures
+import hashlib
+import pickle
+import typing
+import zlib
+
+import schema
+
+from NetUtils import SlotType, encode
+
+_pool: typing.Optional[concurrent.futures.ProcessPoolExecutor] = None
+
+games_package_schema = schema.Schema({
+    "item_name_groups": {str: [str]},
+    "item_name_to_id": {str: int},
+    "location_name_groups": {str: [str]},
+    "location_name_to_id": {str: int},
+    schema.Optional("checksum"): str,
+    schema.Optional("version"): int,
+})
+
+
+class PreparedMultidata(typing.NamedTuple):
+    multidata: bytes
+    """compressed multidata, with its custom data packages replaced by their checksum"""
+    datapackages: typing.Dict[str, typing.Dict[str, typing.Any]]
+    """validated custom data packages by game, including their checksum"""
+    slots: typing.List[typing.Tuple[int, str, str]]
+    """id, name and game of each slot that is not a group"""
+
+
+def get_pool(workers: int) -> typing.Optional[concurrent.futures.ProcessPoolExecutor]:
+    """Shared pool for heavy multidata work of uploads, None if workers is 0 and it should run in-process."""
+    global _pool
+    if workers and not _pool:
+        _pool = concurrent.futures.ProcessPoolExecutor(workers)
+    return _pool
+
+
+def compress_multidata(format_version: bytes, multidata: typing.Dict[str, typing.Any]) -> bytes:
+    return format_version + zlib.compress(pickle.dumps(multidata), 9)
+
+
+def _data_package_checksum(data: typing.Dict[str, typing.Any]) -> str:
+    # same as worlds.AutoWorld.data_package_checksum, which can't be imported here without loading all worlds
+    return hashlib.sha1(encode(data).encode()).hexdigest()
+
+
+def prepare_multidata(compressed_multidata: bytes) -> PreparedMultidata:
+    """
+    Decompresses and validates multidata, extracting its custom data packages and slots.
+    The multidata is only compressed again if a data package was replaced by its checksum.
+    """
+    from MultiServer import Context
+
+    multidata = Context.decompress(compressed_multidata)
+
+    datapackages: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+    for game, game_data in multidata.get("datapackage", {}).items():
+        if game_data.get("checksum"):
+            original_checksum = game_data.pop("checksum")
+            game_data = games_package_schema.validate(game_data)
+            game_data = {key: value for key, value in sorted(game_data.items())}
+            game_data["checksum"] = _data_package_checksum(game_data)
+            if original_checksum != game_data["checksum"]:
+                raise Exception(f"Original checksum {original_checksum} != "
+                                f"calculated checksum {game_data['checksum']} "
+                                f"for game {game}.")
+            datapackages[game] = game_data
+
+    # Ignore Player Groups (e.g. item links)
+    slots = [(slot, slot_info.name, slot_info.game) for slot, slot_info in multidata.get("slot_info", {}).items()
+             if slot_info.type != SlotType.group]
+
+    if datapackages:
+        # strip datapackage from multidata, leaving only the checksums
+        multidata["datapackage"].update({game: {"version": game_data.get("version", 0),
+                                                "checksum": game_data["checksum"]}
+                                         for game, game_data in datapackages.items()})
+        compressed_multidata = compress_multidata(compressed_multidata[0:1], multidata)
+    return PreparedMultidata(compressed_multidata, datapackages, slots)
@@ -0,0 +1,160 @@
+"""
+Compact encoding of Room.multisave.
+
+Location checks and received items make up most of a save and are stored as packed 32- or 64-bit integer arrays per
+slot, behind a small index, so a reader only decodes the slots it looks at. Everything else is a pickle, as before.
+
+Layout: MAGIC, entry count (uint32), entries of (kind, team, slot, flag, typecode, offset, length), then the data the
+entries point to. Offsets are relative to the end of the index. All integers are little endian.
+"""
+from __future__ import annotations
+
+import pickle
+import struct
+import sys
+import typing
+from array import array
+
+from NetUtils import NetworkItem
+from Utils import restricted_loads
+
+__all__ = ["encode_save", "decode_save", "load_save", "CompactSave"]
+
+MAGIC = b"APSAVE\x01"
+_count = struct.Struct("<I")
+_entry = struct.Struct("<BiiBcQQ")
+
+KIND_REST = 0
+KIND_LOCATION_CHECKS = 1
+KIND_RECEIVED_ITEMS = 2
+
+_slot_keys = {KIND_LOCATION_CHECKS: "location_checks", KIND_RECEIVED_ITEMS: "received_items"}
+
+
+def _pack(values: typing.Iterable[int]) -> typing.Tuple[bytes, bytes]:
+    """Returns the array typecode and the packed values, using 32 bit if all of them fit."""
+    packed = array("q", values)
+    if all(-2 ** 31 <= value < 2 ** 31 for value in packed):
+        packed = array("i", packed)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.typecode.encode(), packed.tobytes()
+
+
+def _unpack(typecode: bytes, data: typing.Union[bytes, memoryview]) -> array:
+    unpacked = array(typecode.decode())
+    unpacked.frombytes(data)
+    if sys.byteorder == "big":
+        unpacked.byteswap()
+    return unpacked
+
+
+def encode_save(save: typing.Dict[str, typing.Any]) -> bytes:
+    """Encode a save from Context.get_save. Does not use restricted_dumps, as we'd rather make a save than not."""
+    rest = {key: value for key, value in save.items() if key not in _slot_keys.values()}
+    blobs: typing.List[typing.Tuple[int, int, int, int, typing.Tuple[bytes, bytes]]] = [
+        (KIND_REST, 0, 0, 0, (b"B", pickle.dumps(rest)))]
+    for (team, slot), checks in save.get("location_checks", {}).items():
+        blobs.append((KIND_LOCATION_CHECKS, team, slot, 0, _pack(sorted(checks))))
+    for (team, slot, remote), items in save.get("received_items", {}).items():
+        blobs.append((KIND_RECEIVED_ITEMS, team, slot, remote,
+                      _pack(value for item in items for value in (item.item, item.location, item.player, item.flags))))
+
+    index = [_count.pack(len(blobs))]
+    offset = 0
+    for kind, team, slot, flag, (typecode, blob) in blobs:
+        index.append(_entry.pack(kind, team, slot, flag, typecode, offset, len(blob)))
+        offset += len(blob)
+    return b"".join([MAGIC, *index, *(blob[-1][1] for blob in blobs)])
+
+
+class CompactSave(typing.Mapping[str, typing.Any]):
+    """
+    Read-only view of an encoded save, that behaves like the decoded dict.
+    Location checks and received items of a slot are only decoded when they are looked up.
+    """
+    _rest: typing.Optional[typing.Dict[str, typing.Any]] = None
+
+    def __init__(self, data: bytes) -> None:
+        if not data.startswith(MAGIC):
+            raise ValueError("Not a compact multisave.")
+        self._data = memoryview(data)
+        count, = _count.unpack_from(data, len(MAGIC))
+        index_start = len(MAGIC) + _count.size
+        self._data_start = index_start + count * _entry.size
+        self._entries: typing.Dict[int, typing.Dict[typing.Any, typing.Tuple[bytes, int, int]]] = {
+            kind: {} for kind in (KIND_REST, *_slot_keys)}
+        for kind, team, slot, flag, typecode, offset, length in \
+                _entry.iter_unpack(data[index_start:self._data_start]):
+            key = (team, slot) if kind != KIND_RECEIVED_ITEMS else (team, slot, bool(flag))
+            self._entries[kind][key] = typecode, offset, length
+        self._slots = {key: _SlotView(self, kind) for kind, key in _slot_keys.items()}
+
+    def _read(self, kind: int, key: typing.Any) -> typing.Tuple[bytes, memoryview]:
+        typecode, offset, length = self._entries[kind][key]
+        start = self._data_start + offset
+        return typecode, self._data[start:start + length]
+
+    @property
+    def rest(self) -> typing.Dict[str, typing.Any]:
+        """Everything but location checks and received items, decoded on first access."""
+        if self._rest is None:
+            self._rest = restricted_loads(self._read(KIND_REST, (0, 0))[1])
+        return self._rest
+
+    def __getitem__(self, key: str) -> typing.Any:
+        if key in self._slots:
+            return self._slots[key]
+        return self.rest[key]
+
+    def __iter__(self) -> typing.Iterator[str]:
+        yield from self._slots
+        yield from self.rest
+
+    def __len__(self) -> int:
+        return len(self._slots) + len(self.rest)
+
+
+class _SlotView(typing.Mapping[typing.Any, typing.Any]):
+    """Location checks or received items of a CompactSave by slot key, decoding and caching each slot on access."""
+
+    def __init__(self, save: CompactSave, kind: int) -> None:
+        self._save = save
+        self._kind = kind
+        self._decoded: typing.Dict[typing.Any, typing.Any] = {}
+
+    def __getitem__(self, key: typing.Any) -> typing.Any:
+        if key not in self._decoded:
+            values = _unpack(*self._save._read(self._kind, key))
+            if self._kind == KIND_LOCATION_CHECKS:
+                self._decoded[key] = set(values)
+            else:
+                self._decoded[key] = [NetworkItem(*values[i:i + 4]) for i in range(0, len(values), 4)]
+        return self._decoded[key]
+
+    def __iter__(self) -> typing.Iterator[typing.Any]:
+        return iter(self._save._entries[self._kind])
+
+    def __len__(self) -> int:
+        return len(self._save._entries[self._kind])
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._save._entries[self._kind]
+
+
+def load_save(data: bytes) -> typing.Mapping[str, typing.Any]:
+    """Lazily readable save of either encoding, for readers that only look at some slots."""
+    if data.startswith(MAGIC):
+        return CompactSave(data)
+    return restricted_loads(data)
+
+
+def decode_save(data: bytes) -> typing.Dict[str, typing.Any]:
+    """Fully decoded save of either encoding, as accepted by Context.set_save."""
+    if not data.startswith(MAGIC):
+        return restricted_loads(data)
+    compact = CompactSave(data)
+    save = dict(compact.rest)
+    for key in _slot_keys.values():
+        save[key] = dict(compact[key].items())
+    return save
@@ -1,32 +1,130 @@
 import collections.abc
+import functools
+import hashlib
 import json
+import logging
 import os
+import shutil
+import tempfile
+import time
 from textwrap import dedent
-from typing import Dict, Union
+from typing import Dict, Tuple, Union
 from docutils.core import publish_parts
 
 import yaml
-from flask import redirect, render_template, request, Response, abort
+from flask import redirect, render_template, request, Response, abort, send_from_directory
+from werkzeug.utils import secure_filename
 
 import Options
-from Utils import local_path
+from Utils import local_path, __version__
 from worlds.AutoWorld import AutoWorldRegister
-from . import app, cache
+from . import app
 from .generate import get_meta
 from .misc import get_world_theme
 
+# pre-rendered pages of each world, file name to template and whether it is the complex (weighted) ui
+option_pages: Dict[str, Tuple[str, bool]] = {
+    "player-options.html": ("playerOptions/playerOptions.html", False),
+    "weighted-options.html": ("weightedOptions/weightedOptions.html", True),
+}
+
 
 def create() -> None:
     target_folder = local_path("WebHostLib", "static", "generated")
     yaml_folder = os.path.join(target_folder, "configs")
 
     Options.generate_yaml_templates(yaml_folder)
+    create_option_pages()
 
 
-def render_options_page(template: str, world_name: str, is_complex: bool = False) -> Union[Response, str]:
-    world = AutoWorldRegister.world_types[world_name]
-    if world.hidden or world.web.options_page is False:
+def get_option_pages_root() -> str:
+    return os.path.join(app.static_folder, "generated", "options")
+
+
+@functools.cache
+def get_templates_hash() -> str:
+    """Hash of all templates, so pages rendered from changed templates are not served."""
+    templates_hash = hashlib.sha256()
+    template_folder = os.path.join(app.root_path, app.template_folder)
+    for root, dirs, files in os.walk(template_folder):
+        dirs.sort()
+        for file_name in sorted(files):
+            path = os.path.join(root, file_name)
+            templates_hash.update(os.path.relpath(path, template_folder).encode())
+            with open(path, "rb") as f:
+                templates_hash.update(f.read())
+    return templates_hash.hexdigest()[:16]
+
+
+def get_option_pages_folder(game: str) -> str:
+    """Folder of the pre-rendered option pages of a world. Names include the versions and the templates hash, so
+    upgrades don't serve stale pages, even if create was not run."""
+    world = AutoWorldRegister.world_types[game]
+    return os.path.join(get_option_pages_root(), secure_filename(game),
+                        f"{__version__}-{world.world_version.as_simple_string()}-{get_templates_hash()}")
+
+
+def prune_option_pages() -> None:
+    """Delete pre-rendered option pages of other versions and of worlds that no longer exist."""
+    current = {os.path.relpath(get_option_pages_folder(game), get_option_pages_root())
+               for game in AutoWorldRegister.world_types}
+    root = get_option_pages_root()
+    for game_folder in os.listdir(root) if os.path.isdir(root) else ():
+        for folder in os.listdir(os.path.join(root, game_folder)):
+            if os.path.join(game_folder, folder) not in current:
+                shutil.rmtree(os.path.join(root, game_folder, folder), ignore_errors=True)
+        if not os.listdir(os.path.join(root, game_folder)):
+            os.rmdir(os.path.join(root, game_folder))
+
+
+def create_option_pages() -> None:
+    """Render the option pages of all worlds ahead of the first request, unless they were rendered before."""
+    prune_option_pages()
+    start = time.perf_counter()
+    # the pages don't depend on the request, url_for only needs some context
+    with app.test_request_context():
+        for game, world in AutoWorldRegister.world_types.items():
+            if world.hidden or world.web.options_page is False:
+                continue
+            try:
+                for file_name in option_pages:
+                    get_option_page(game, file_name)
+                get_option_page(game, "option-presets.json")
+            except Exception as e:
+                # the page gets rendered, and fails, again on request
+                logging.exception(f"Could not render option pages of {game}: {e}")
+    logging.info(f"Rendered option pages in {time.perf_counter() - start:.2f} seconds.")
+
+
+def get_option_page(game: str, file_name: str) -> str:
+    """Returns the folder that contains the pre-rendered file_name of game, rendering it if it does not exist yet."""
+    folder = get_option_pages_folder(game)
+    if not os.path.exists(os.path.join(folder, file_name)):
+        if file_name in option_pages:
+            template, is_complex = option_pages[file_name]
+            data = render_options_page(template, game, is_complex)
+        else:
+            data = render_option_presets(game)
+        os.makedirs(folder, exist_ok=True)
+        # write next to the target and move it in place, so concurrent requests never see a partial file
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=folder, delete=False) as f:
+            f.write(data)
+        os.replace(f.name, os.path.join(folder, file_name))
+    return folder
+
+
+def send_option_page(game: str, file_name: str) -> Response:
+    """Send a pre-rendered page, answering repeated requests with 304 Not Modified by its ETag."""
+    world = AutoWorldRegister.world_types.get(game)
+    if not world:
+        return abort(404)
+    if file_name in option_pages and (world.hidden or world.web.options_page is False):
         return redirect("games")
+    return send_from_directory(get_option_page(game, file_name), file_name, conditional=True, etag=True)
+
+
+def render_options_page(template: str, world_name: str, is_complex: bool = False) -> str:
+    world = AutoWorldRegister.world_types[world_name]
     visibility_flag = Options.Visibility.complex_ui if is_complex else Options.Visibility.simple_ui
 
     start_collapsed = {"Game Options": False}
@@ -84,8 +182,11 @@ def test_ordered(obj):
 
 
 @app.route("/games/<string:game>/option-presets", methods=["GET"])
-@cache.cached()
 def option_presets(game: str) -> Response:
+    return send_option_page(game, "option-presets.json")
+
+
+def render_option_presets(game: str) -> str:
     world = AutoWorldRegister.world_types[game]
 
     presets = {}
@@ -123,10 +224,7 @@ def option_presets(game: str) -> Response:
                 return list(obj)
             return json.JSONEncoder.default(self, obj)
 
-    json_data = json.dumps(presets, cls=SetEncoder)
-    response = Response(json_data)
-    response.headers["Content-Type"] = "application/json"
-    return response
+    return json.dumps(presets, cls=SetEncoder)
 
 
 @app.route("/weighted-options")
@@ -135,12 +233,8 @@ def weighted_options_old():
 
 
 @app.route("/games/<string:game>/weighted-options")
-@cache.cached()
 def weighted_options(game: str):
-    try:
-        return render_options_page("weightedOptions/weightedOptions.html", game, is_complex=True)
-    except KeyError:
-        return abort(404)
+    return send_option_page(game, "weighted-options.html")
 
 
 @app.route("/games/<string:game>/generate-weighted-yaml", methods=["POST"])
@@ -195,12 +289,8 @@ def generate_weighted_yaml(game: str):
 
 # Player options pages
 @app.route("/games/<string:game>/player-options")
-@cache.cached()
 def player_options(game: str):
-    try:
-        return render_options_page("playerOptions/playerOptions.html", game, is_complex=False)
-    except KeyError:
-        return abort(404)
+    return send_option_page(game, "player-options.html")
 
 
 # YAML generator for player-options
@@ -4,6 +4,54 @@ window.addEventListener('load', () => {
     });
 
     document.getElementById('file-input').addEventListener('change', () => {
-        document.getElementById('host-game-form').submit();
+        const form = document.getElementById('host-game-form');
+        if (!window.FormData || !window.XMLHttpRequest) {
+            form.submit();
+            return;
+        }
+        uploadWithProgress(form);
     });
 });
+
+const uploadWithProgress = (form) => {
+    const button = document.getElementById('host-game-button');
+    const progress = document.getElementById('host-game-progress');
+    const progressBar = document.getElementById('host-game-progress-bar');
+    const progressText = document.getElementById('host-game-progress-text');
+
+    button.disabled = true;
+    progress.hidden = false;
+    progressText.innerText = 'Uploading...';
+
+    const request = new XMLHttpRequest();
+    request.upload.addEventListener('progress', (event) => {
+        if (event.lengthComputable) {
+            progressBar.value = Math.round(event.loaded / event.total * 100);
+            progressText.innerText = `Uploading... ${progressBar.value}%`;
+        }
+    });
+    request.upload.addEventListener('load', () => {
+        // the upload is complete, the server is now validating and storing the files
+        progressBar.removeAttribute('value');
+        progressText.innerText = 'Processing... This may take a while for large multiworlds.';
+    });
+    request.addEventListener('load', () => {
+        if (request.responseURL && request.responseURL !== window.location.href) {
+            // redirected to the uploaded seed
+            window.location.href = request.responseURL;
+            return;
+        }
+        // the page was rendered again with error messages
+        document.open();
+        document.write(request.responseText);
+        document.close();
+    });
+    request.addEventListener('error', () => {
+        button.disabled = false;
+        progressBar.value = 0;
+        progressText.innerText = 'Upload failed. Please try again.';
+        form.reset();
+    });
+    request.open('POST', form.action || window.location.href);
+    request.send(new FormData(form));
+};
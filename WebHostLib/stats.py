@@ -1,3 +1,4 @@
+import logging
 from collections import Counter, defaultdict
 from colorsys import hsv_to_rgb
 from datetime import datetime, timedelta, date
@@ -9,27 +10,70 @@ from bokeh.models import HoverTool
 from bokeh.plotting import figure, ColumnDataSource
 from bokeh.resources import INLINE
 from flask import render_template
-from pony.orm import select
+from pony.orm import commit, rollback, select
 
 from . import app, cache
-from .models import Room
+from .models import Aggregation, GamesPlayed, Room, Slot
 
 PLOT_WIDTH = 600
+STATS_DAYS = 30
+# how often new rooms get added to GamesPlayed, which also invalidates the rendered stats page
+AGGREGATE_INTERVAL = timedelta(minutes=15)
+
+
+def update_games_played() -> datetime:
+    """
+    Adds the slots of rooms that were not counted yet to the daily GamesPlayed aggregate,
+    if the last update is older than AGGREGATE_INTERVAL. Rooms are flagged once they are counted,
+    so rooms that were committed after an update, even if created before it, are counted by the next one.
+
+    :return: the time of the last update of GamesPlayed
+    """
+    state = Aggregation.get(name="games_played")
+    now = datetime.utcnow()
+    if state and now - state.until < AGGREGATE_INTERVAL:
+        return state.until
+
+    cutoff = datetime.combine(date.today() - timedelta(days=STATS_DAYS), datetime.min.time())
+    new_slots = select((room, slot.game) for room in Room for slot in Slot
+                       if slot.seed == room.seed and not room.counted and room.creation_time >= cutoff)
+    new_games: Counter[tuple[date, str]] = Counter()
+    for room, game in new_slots.without_distinct():
+        room.counted = True
+        new_games[room.creation_time.date(), game] += 1
+    for (day, game), count in new_games.items():
+        games_played = GamesPlayed.get(day=day, game=game)
+        if games_played:
+            games_played.count += count
+        else:
+            GamesPlayed(day=day, game=game, count=count)
+    if state:
+        state.until = now
+    else:
+        Aggregation(name="games_played", until=now)
+    try:
+        commit()
+    except Exception as e:
+        # most likely another worker updated the aggregate at the same time
+        logging.debug(f"Could not update GamesPlayed: {e}")
+        rollback()
+        state = Aggregation.get(name="games_played")
+        return state.until if state else now
+    return now
 
 
 def get_db_data(known_games: set[str]) -> tuple[Counter[str], defaultdict[date, dict[str, int]]]:
     games_played: defaultdict[date, dict[str, int]] = defaultdict(Counter)
     total_games: Counter[str] = Counter()
-    cutoff = date.today() - timedelta(days=30)
-    room: Room
-    for room in select(room for room in Room if room.creation_time >= cutoff):
-        for slot in room.seed.slots:
-            if slot.game in known_games:
-                current_game = slot.game
-            else:
-                current_game = "Other"
-            total_games[current_game] += 1
-            games_played[room.creation_time.date()][current_game] += 1
+    cutoff = date.today() - timedelta(days=STATS_DAYS)
+    for day, game, count in select(
+            (row.day, row.game, row.count) for row in GamesPlayed if row.day >= cutoff):
+        if game in known_games:
+            current_game = game
+        else:
+            current_game = "Other"
+        total_games[current_game] += count
+        games_played[day][current_game] += count
     return total_games, games_played
 
 
@@ -73,8 +117,13 @@ def create_game_played_figure(all_games_data: dict[date, dict[str, int]], game:
 
 
 @app.route('/stats')
-@cache.memoize(timeout=60 * 60)  # regen once per hour should be plenty
 def stats():
+    return render_stats(update_games_played())
+
+
+@cache.memoize(timeout=24 * 60 * 60)
+def render_stats(aggregated_at: datetime) -> str:
+    """Renders the stats page, only once per update of the aggregated data."""
     from worlds import network_data_package
     known_games = set(network_data_package["games"])
     plot = figure(title="Games Played Per Day", x_axis_type='datetime', x_axis_label="Date",
@@ -1,7 +1,9 @@
 import datetime
 import collections
+import hashlib
+import threading
 from dataclasses import dataclass
-from typing import Any, Callable, Dict, List, Optional, Set, Tuple, NamedTuple, Counter
+from typing import Any, Callable, Dict, List, Mapping, Optional, Set, Tuple, NamedTuple, Counter
 from uuid import UUID
 from email.utils import parsedate_to_datetime
 
@@ -13,6 +15,7 @@ from NetUtils import ClientStatus, Hint, NetworkItem, NetworkSlot, SlotType
 from Utils import restricted_loads, KeyedDefaultDict
 from . import app, cache
 from .models import GameDataPackage, Room
+from .multisave import load_save
 
 # Multisave is currently updated, at most, every minute.
 TRACKER_CACHE_TIMEOUT_IN_SECONDS = 60
@@ -24,6 +27,97 @@ TeamPlayer = Tuple[int, int]
 ItemMetadata = Tuple[int, int, int]
 
 
+class _LRUCache:
+    """A small thread-safe mapping that keeps the most recently used entries, up to a maximum amount."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._data: collections.OrderedDict[Any, Any] = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Any:
+        with self._lock:
+            value = self._data.get(key, None)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Any, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class _DecodedSeed(NamedTuple):
+    """The immutable data of a seed that trackers need, shared between all rooms and requests of that seed."""
+    multidata: Dict[str, Any]
+    item_id_to_name: Dict[str, Dict[int, str]]
+    location_id_to_name: Dict[str, Dict[int, str]]
+    item_name_to_id: Dict[str, Dict[str, int]]
+    location_name_to_id: Dict[str, Dict[str, int]]
+
+
+# Decoded multidata per seed id and decoded multisave per room id, which are kept across requests.
+# Everything stored here is shared between threads and has to be treated as read-only.
+_decoded_seeds = _LRUCache(app.config["TRACKER_CACHED_SEEDS"])
+_decoded_saves = _LRUCache(app.config["TRACKER_CACHED_SAVES"])
+
+
+def _decode_seed(room: Room) -> _DecodedSeed:
+    decoded_seed: Optional[_DecodedSeed] = _decoded_seeds.get(room.seed.id)
+    if decoded_seed:
+        return decoded_seed
+
+    multidata = Context.decompress(room.seed.multidata)
+    item_name_to_id: Dict[str, Dict[str, int]] = {}
+    location_name_to_id: Dict[str, Dict[str, int]] = {}
+
+    # Generate inverse lookup tables from data package, useful for trackers.
+    item_id_to_name: Dict[str, Dict[int, str]] = KeyedDefaultDict(lambda game_name: {
+        game_name: KeyedDefaultDict(lambda code: f"Unknown Game {game_name} - Item (ID: {code})")
+    })
+    location_id_to_name: Dict[str, Dict[int, str]] = KeyedDefaultDict(lambda game_name: {
+        game_name: KeyedDefaultDict(lambda code: f"Unknown Game {game_name} - Location (ID: {code})")
+    })
+    for game, game_package in multidata["datapackage"].items():
+        game_package = restricted_loads(GameDataPackage.get(checksum=game_package["checksum"]).data)
+        item_id_to_name[game] = KeyedDefaultDict(lambda code: f"Unknown Item (ID: {code})", {
+            id: name for name, id in game_package["item_name_to_id"].items()})
+        location_id_to_name[game] = KeyedDefaultDict(lambda code: f"Unknown Location (ID: {code})", {
+            id: name for name, id in game_package["location_name_to_id"].items()})
+
+        # Normal lookup tables as well.
+        item_name_to_id[game] = game_package["item_name_to_id"]
+        location_name_to_id[game] = game_package["location_name_to_id"]
+
+    decoded_seed = _DecodedSeed(multidata, item_id_to_name, location_id_to_name, item_name_to_id,
+                                location_name_to_id)
+    _decoded_seeds.set(room.seed.id, decoded_seed)
+    return decoded_seed
+
+
+def _decode_save(room: Room) -> Mapping[str, Any]:
+    multisave: Optional[bytes] = room.multisave
+    if not multisave:
+        return {}
+    # The hoster rewrites the whole multisave on each save, so its digest identifies the save generation.
+    generation = hashlib.blake2b(multisave, digest_size=16).digest()
+    cached: Optional[Tuple[bytes, Mapping[str, Any]]] = _decoded_saves.get(room.id)
+    if cached and cached[0] == generation:
+        return cached[1]
+
+    # compact saves only decode the slots that get looked at
+    decoded_save = load_save(multisave)
+    _decoded_saves.set(room.id, (generation, decoded_save))
+    return decoded_save
+
+
 def _cache_results(func: Callable) -> Callable:
     """Stores the results of any computationally expensive methods after the initial call in TrackerData.
     If called again, returns the cached result instead, as results will not change for the lifetime of TrackerData.
@@ -46,39 +140,26 @@ class TrackerData:
 
     Provides helper methods to lazily load necessary data that each tracker require and caches any results so any
     subsequent helper method calls do not need to recompute results during the lifetime of this instance.
+    The decoded room data it is built from is shared between instances and must not be modified.
     """
     room: Room
     _multidata: Dict[str, Any]
-    _multisave: Dict[str, Any]
+    _multisave: Mapping[str, Any]
     _tracker_cache: Dict[str, Any]
 
     def __init__(self, room: Room):
-        """Initialize a new RoomMultidata object for the current room."""
+        """Initialize a new RoomMultidata object for the current room.
+        Decoded multidata and multisave are shared with other requests for the same seed or save."""
         self.room = room
-        self._multidata = Context.decompress(room.seed.multidata)
-        self._multisave = restricted_loads(room.multisave) if room.multisave else {}
+        decoded_seed = _decode_seed(room)
+        self._multidata = decoded_seed.multidata
+        self._multisave = _decode_save(room)
         self._tracker_cache = {}
 
-        self.item_name_to_id: Dict[str, Dict[str, int]] = {}
-        self.location_name_to_id: Dict[str, Dict[str, int]] = {}
-
-        # Generate inverse lookup tables from data package, useful for trackers.
-        self.item_id_to_name: Dict[str, Dict[int, str]] = KeyedDefaultDict(lambda game_name: {
-            game_name: KeyedDefaultDict(lambda code: f"Unknown Game {game_name} - Item (ID: {code})")
-        })
-        self.location_id_to_name: Dict[str, Dict[int, str]] = KeyedDefaultDict(lambda game_name: {
-            game_name: KeyedDefaultDict(lambda code: f"Unknown Game {game_name} - Location (ID: {code})")
-        })
-        for game, game_package in self._multidata["datapackage"].items():
-            game_package = restricted_loads(GameDataPackage.get(checksum=game_package["checksum"]).data)
-            self.item_id_to_name[game] = KeyedDefaultDict(lambda code: f"Unknown Item (ID: {code})", {
-                id: name for name, id in game_package["item_name_to_id"].items()})
-            self.location_id_to_name[game] = KeyedDefaultDict(lambda code: f"Unknown Location (ID: {code})", {
-                id: name for name, id in game_package["location_name_to_id"].items()})
-
-            # Normal lookup tables as well.
-            self.item_name_to_id[game] = game_package["item_name_to_id"]
-            self.location_name_to_id[game] = game_package["location_name_to_id"]
+        self.item_name_to_id: Dict[str, Dict[str, int]] = decoded_seed.item_name_to_id
+        self.location_name_to_id: Dict[str, Dict[str, int]] = decoded_seed.location_name_to_id
+        self.item_id_to_name: Dict[str, Dict[int, str]] = decoded_seed.item_id_to_name
+        self.location_id_to_name: Dict[str, Dict[int, str]] = decoded_seed.location_id_to_name
 
     def get_seed_name(self) -> str:
         """Retrieves the seed name."""
@@ -1,37 +1,29 @@
+import concurrent.futures
+import hashlib
 import json
 import pickle
+import tempfile
 import typing
 import uuid
 import zipfile
-import zlib
 
-from io import BytesIO
 from flask import request, flash, redirect, url_for, session, render_template, abort
 from markupsafe import Markup
 from pony.orm import commit, flush, select, rollback
 from pony.orm.core import TransactionIntegrityError
-import schema
 
-import MultiServer
-from NetUtils import GamesPackage, SlotType
 from Utils import VersionException, __version__
 from worlds.Files import AutoPatchRegister
-from worlds.AutoWorld import data_package_checksum
 from . import app
-from .models import Seed, Room, Slot, GameDataPackage
+from .models import Seed, Room, Slot, GameDataPackage, PatchBlob, PatchChunk, SlotPatch, db
+from .multidata import PreparedMultidata, get_pool, prepare_multidata
 
 banned_extensions = (".sfc", ".z64", ".n64", ".nes", ".smc", ".sms", ".gb", ".gbc", ".gba")
 allowed_options_extensions = (".yaml", ".json", ".yml", ".txt", ".zip")
 allowed_generation_extensions = (".archipelago", ".zip")
 
-games_package_schema = schema.Schema({
-    "item_name_groups": {str: [str]},
-    "item_name_to_id": {str: int},
-    "location_name_groups": {str: [str]},
-    "location_name_to_id": {str: int},
-    schema.Optional("checksum"): str,
-    schema.Optional("version"): int,
-})
+PATCH_CHUNK_SIZE = 1024 * 1024
+"""size of the pieces patch files are read and stored in"""
 
 
 def allowed_options(filename: str) -> bool:
@@ -46,55 +38,88 @@ def banned_file(filename: str) -> bool:
     return filename.endswith(banned_extensions)
 
 
-def process_multidata(compressed_multidata, files={}):
-    game_data: GamesPackage
+def iter_zip_member(zfile: zipfile.ZipFile, info: zipfile.ZipInfo, budget: typing.List[int]) \
+        -> typing.Iterator[bytes]:
+    """
+    Reads a file from the zip in chunks, taking its size from budget[0], so a zip bomb is stopped before it fills
+    the memory instead of after. The zip's CRC is validated by the time the end of the file is reached.
+    """
+    with zfile.open(info, "r") as member:
+        while chunk := member.read(PATCH_CHUNK_SIZE):
+            budget[0] -= len(chunk)
+            if budget[0] < 0:
+                raise ValueError("Uploaded files are too large once extracted.")
+            yield chunk
+
+
+def read_zip_member(zfile: zipfile.ZipFile, info: zipfile.ZipInfo, budget: typing.List[int]) -> bytes:
+    """Reads a whole file from the zip, see iter_zip_member."""
+    return b"".join(iter_zip_member(zfile, info, budget))
+
+
+def spool_patch(chunks: typing.Iterable[bytes]) -> typing.Tuple[typing.IO[bytes], str]:
+    """Writes a patch file to a temporary file, returning it and the checksum of the patch file."""
+    spool = tempfile.TemporaryFile()
+    checksum = hashlib.sha256()
+    for chunk in chunks:
+        checksum.update(chunk)
+        spool.write(chunk)
+    spool.seek(0)
+    return spool, checksum.hexdigest()
+
+
+def store_patch_blob(spool: typing.IO[bytes], checksum: str) -> None:
+    """
+    Makes sure a PatchBlob exists for the patch file in spool, committing it if it is new.
+    The file is inserted chunk by chunk, without creating entities that would keep it in memory until the db_session
+    ends.
+    """
+    if PatchBlob.exists(checksum=checksum):
+        return
+    try:
+        PatchBlob(checksum=checksum)
+        flush()
+        position = 0
+        while chunk := spool.read(PATCH_CHUNK_SIZE):
+            db.insert(PatchChunk, blob=checksum, position=position, data=chunk)
+            position += 1
+        commit()  # commit patch blob
+    except TransactionIntegrityError:
+        rollback()  # stored by a concurrent upload
+
+
+def process_multidata(compressed_multidata, files={},
+                      executor: typing.Optional[concurrent.futures.Executor] = None):
+    """
+    Validates multidata, stores its custom data packages and creates its slots, linking the stored patch files in
+    files, by slot, to them. Decompressing, validating and, if embedded data packages get replaced by their checksum,
+    recompressing the multidata happens in executor if one is given, as that's the slowest part for large multiworlds.
+    """
+    if executor:
+        prepared: PreparedMultidata = executor.submit(prepare_multidata, compressed_multidata).result()
+    else:
+        prepared = prepare_multidata(compressed_multidata)
 
-    decompressed_multidata = MultiServer.Context.decompress(compressed_multidata)
+    for game_data in prepared.datapackages.values():
+        if not GameDataPackage.exists(checksum=game_data["checksum"]):
+            GameDataPackage(checksum=game_data["checksum"], data=pickle.dumps(game_data))
+            try:
+                commit()  # commit game data package
+            except TransactionIntegrityError:
+                rollback()  # stored by a concurrent upload
 
     slots: typing.Set[Slot] = set()
-    if "datapackage" in decompressed_multidata:
-        # strip datapackage from multidata, leaving only the checksums
-        game_data_packages: typing.List[GameDataPackage] = []
-        for game, game_data in decompressed_multidata["datapackage"].items():
-            if game_data.get("checksum"):
-                original_checksum = game_data.pop("checksum")
-                game_data = games_package_schema.validate(game_data)
-                game_data = {key: value for key, value in sorted(game_data.items())}
-                game_data["checksum"] = data_package_checksum(game_data)
-                if original_checksum != game_data["checksum"]:
-                    raise Exception(f"Original checksum {original_checksum} != "
-                                    f"calculated checksum {game_data['checksum']} "
-                                    f"for game {game}.")
-
-                game_data_package = GameDataPackage(checksum=game_data["checksum"],
-                                                    data=pickle.dumps(game_data))
-                decompressed_multidata["datapackage"][game] = {
-                    "version": game_data.get("version", 0),
-                    "checksum": game_data["checksum"],
-                }
-                try:
-                    commit()  # commit game data package
-                    game_data_packages.append(game_data_package)
-                except TransactionIntegrityError:
-                    del game_data_package
-                    rollback()
-
-    if "slot_info" in decompressed_multidata:
-        for slot, slot_info in decompressed_multidata["slot_info"].items():
-            # Ignore Player Groups (e.g. item links)
-            if slot_info.type == SlotType.group:
-                continue
-            slots.add(Slot(data=files.get(slot, None),
-                           player_name=slot_info.name,
-                           player_id=slot,
-                           game=slot_info.game))
-        flush()  # commit slots
-
-    compressed_multidata = compressed_multidata[0:1] + zlib.compress(pickle.dumps(decompressed_multidata), 9)
-    return slots, compressed_multidata
-
-
-def upload_zip_to_db(zfile: zipfile.ZipFile, owner=None, meta={"race": False}, sid=None):
+    for slot, name, game in prepared.slots:
+        new_slot = Slot(player_name=name, player_id=slot, game=game)
+        if slot in files:
+            SlotPatch(slot=new_slot, blob=PatchBlob[files[slot]])
+        slots.add(new_slot)
+    flush()  # commit slots
+    return slots, prepared.multidata
+
+
+def upload_zip_to_db(zfile: zipfile.ZipFile, owner=None, meta={"race": False}, sid=None,
+                     executor: typing.Optional[concurrent.futures.Executor] = None):
     if not owner:
         owner = session["_id"]
     infolist = zfile.infolist()
@@ -104,8 +129,9 @@ def upload_zip_to_db(zfile: zipfile.ZipFile, owner=None, meta={"race": False}, s
         return
 
     spoiler = ""
-    files = {}
+    files: typing.Dict[int, str] = {}  # checksum of the stored patch file of each slot
     multidata = None
+    budget = [app.config["MAX_EXTRACTED_SIZE"]]
 
     # Load files.
     for file in infolist:
@@ -116,19 +142,24 @@ def upload_zip_to_db(zfile: zipfile.ZipFile, owner=None, meta={"race": False}, s
 
         # AP Container
         elif handler:
-            data = zfile.open(file, "r").read()
-            with zipfile.ZipFile(BytesIO(data)) as container:
-                player = json.loads(container.open("archipelago.json").read())["player"]
-            files[player] = data
+            spool, checksum = spool_patch(iter_zip_member(zfile, file, budget))
+            with spool:
+                with zipfile.ZipFile(spool) as container:
+                    player = json.loads(container.open("archipelago.json").read())["player"]
+                spool.seek(0)
+                store_patch_blob(spool, checksum)
+            files[player] = checksum
 
         # Spoiler
         elif file.filename.endswith(".txt"):
-            spoiler = zfile.open(file, "r").read().decode("utf-8-sig")
+            spoiler = read_zip_member(zfile, file, budget).decode("utf-8-sig")
 
         # Multi-data
         elif file.filename.endswith(".archipelago"):
             try:
-                multidata = zfile.open(file).read()
+                multidata = read_zip_member(zfile, file, budget)
+            except ValueError:
+                raise
             except:
                 flash("Could not load multidata. File may be corrupted or incompatible.")
                 multidata = None
@@ -141,8 +172,10 @@ def upload_zip_to_db(zfile: zipfile.ZipFile, owner=None, meta={"race": False}, s
             except ValueError:
                 flash("Error: Unexpected file found in .zip: " + file.filename)
                 return
-            data = zfile.open(file, "r").read()
-            files[int(slot_id[1:])] = data
+            spool, checksum = spool_patch(iter_zip_member(zfile, file, budget))
+            with spool:
+                store_patch_blob(spool, checksum)
+            files[int(slot_id[1:])] = checksum
 
         # All other files using the standard MultiWorld.get_out_file_name_base method
         else:
@@ -151,12 +184,14 @@ def upload_zip_to_db(zfile: zipfile.ZipFile, owner=None, meta={"race": False}, s
             except ValueError:
                 flash("Error: Unexpected file found in .zip: " + file.filename)
                 return
-            data = zfile.open(file, "r").read()
-            files[int(slot_id[1:])] = data
+            spool, checksum = spool_patch(iter_zip_member(zfile, file, budget))
+            with spool:
+                store_patch_blob(spool, checksum)
+            files[int(slot_id[1:])] = checksum
 
     # Load multi data.
     if multidata:
-        slots, multidata = process_multidata(multidata, files)
+        slots, multidata = process_multidata(multidata, files, executor)
 
         seed = Seed(multidata=multidata, spoiler=spoiler, slots=slots, owner=owner, meta=json.dumps(meta),
                     id=sid if sid else uuid.uuid4())
@@ -183,7 +218,7 @@ def uploads():
                 if zipfile.is_zipfile(uploaded_file):
                     with zipfile.ZipFile(uploaded_file, "r") as zfile:
                         try:
-                            res = upload_zip_to_db(zfile)
+                            res = upload_zip_to_db(zfile, executor=get_pool(app.config["UPLOAD_WORKERS"]))
                         except VersionException:
                             flash(f"Could not load multidata. Wrong Version detected.")
                         except Exception as e:
@@ -198,7 +233,8 @@ def uploads():
                     # noinspection PyBroadException
                     try:
                         multidata = uploaded_file.read()
-                        slots, multidata = process_multidata(multidata)
+                        slots, multidata = process_multidata(multidata,
+                                                             executor=get_pool(app.config["UPLOAD_WORKERS"]))
                     except Exception as e:
                         flash(f"Could not load multidata. File may be corrupted or incompatible. ({e})")
                     else:
@@ -20,7 +20,10 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 ]]
 
-local SCRIPT_VERSION = 1
+local SCRIPT_VERSION = 3
+
+-- Maximum number of messages handled per frame while not locked
+local MAX_MESSAGES_PER_FRAME = 16
 
 -- Set to log incoming requests
 -- Will cause lag due to large console output
@@ -34,8 +37,27 @@ will have a corresponding response in the same order.
 Every individual request and response is a JSON object with at minimum one
 field `type`. The value of `type` determines what other fields may exist.
 
+A message can also be an object with an `id` and the list of `requests`. The
+response is then an object with the same `id` and the list of `responses`,
+which lets a client send several messages before the first is answered and
+match the responses by id.
+
+`{"id": 7, "requests": [{"type": "PING"}]}` -> `{"id": 7, "responses": [{"type": "PONG"}]}`
+
 To get the script version, instead of JSON, send "VERSION" to get the script
-version directly (e.g. "2").
+version directly (e.g. "3").
+
+Besides responses, the script pushes updates of watched memory (see `WATCH`)
+on its own. Every watch interval it sends the ranges that changed since they
+were last sent, either as a single line JSON object (responses are always
+lists)
+
+`{"type": "WATCH_UPDATE", "updates": [{"id": 1, "value": "dGVzdA=="}]}`
+
+or, if binary updates were enabled with `SET_WATCH_OPTIONS`, as a frame of
+the byte 0xFF, the payload length as 4 byte big endian integer and the
+payload, which is a sequence of updates, each the watch id as 2 byte and the
+data length as 4 byte big endian integers, followed by the data.
 
 #### Ex. 1
 
@@ -178,6 +200,36 @@ Response:
     - `domain` (`string`): The name of the memory domain the address
     corresponds to
 
+- `WATCH`  
+    Starts watching a range of memory. Its data is pushed once right away and
+    again whenever it changed. Watching an id again replaces its range.
+
+    Expected Response Type: `WATCH_RESPONSE`
+
+    Additional Fields:
+    - `id` (`int`): An id chosen by the client to identify updates, 0-65535
+    - `address` (`int`): The address of the memory to watch
+    - `size` (`int`): The number of bytes to watch
+    - `domain` (`string`): The name of the memory domain the address
+    corresponds to
+
+- `UNWATCH`  
+    Stops watching ranges.
+
+    Expected Response Type: `UNWATCH_RESPONSE`
+
+    Additional Fields:
+    - `ids` (`[int]`): The ids of the watches to stop, all of them if omitted
+
+- `SET_WATCH_OPTIONS`  
+    Configures how updates of watched memory are pushed.
+
+    Expected Response Type: `SET_WATCH_OPTIONS_RESPONSE`
+
+    Additional Fields:
+    - `interval` (`int`): Number of frames between checks for changes
+    - `binary` (`boolean`): Whether to push binary frames instead of JSON
+
 - `DISPLAY_MESSAGE`  
     Adds a message to the message queue which will be displayed using
     `gui.addmessage` according to the message interval.
@@ -254,6 +306,15 @@ Response:
 - `WRITE_RESPONSE`  
     Acknowledges `WRITE`.
 
+- `WATCH_RESPONSE`  
+    Acknowledges `WATCH`.
+
+- `UNWATCH_RESPONSE`  
+    Acknowledges `UNWATCH`.
+
+- `SET_WATCH_OPTIONS_RESPONSE`  
+    Acknowledges `SET_WATCH_OPTIONS`.
+
 - `DISPLAY_MESSAGE_RESPONSE`  
     Acknowledges `DISPLAY_MESSAGE`.
 
@@ -288,6 +349,7 @@ end
 local base64 = require("base64")
 local socket = require("socket")
 local json = require("json")
+local unpack = table.unpack or unpack
 
 local SOCKET_PORT_FIRST = 43055
 local SOCKET_PORT_RANGE_SIZE = 5
@@ -311,6 +373,12 @@ local locked = false
 
 local rom_hash = nil
 
+-- watched memory by id, each {address, size, domain, last}, where last is the data that was last pushed
+local watches = {}
+local watch_interval = 1
+local watch_binary = false
+local watch_timer = 0
+
 function queue_push (self, value)
     self[self.right] = value
     self.right = self.right + 1
@@ -451,6 +519,40 @@ request_handlers = {
         return res
     end,
 
+    ["WATCH"] = function (req)
+        local res = {}
+
+        res["type"] = "WATCH_RESPONSE"
+        watches[req["id"]] = {address = req["address"], size = req["size"], domain = req["domain"], last = nil}
+
+        return res
+    end,
+
+    ["UNWATCH"] = function (req)
+        local res = {}
+
+        res["type"] = "UNWATCH_RESPONSE"
+        if req["ids"] == nil then
+            watches = {}
+        else
+            for _, id in ipairs(req["ids"]) do
+                watches[id] = nil
+            end
+        end
+
+        return res
+    end,
+
+    ["SET_WATCH_OPTIONS"] = function (req)
+        local res = {}
+
+        res["type"] = "SET_WATCH_OPTIONS_RESPONSE"
+        watch_interval = req["interval"]
+        watch_binary = req["binary"]
+
+        return res
+    end,
+
     ["DISPLAY_MESSAGE"] = function (req)
         local res = {}
 
@@ -487,7 +589,33 @@ function process_request (req)
     end
 end
 
+function process_requests (data)
+    local res = {}
+    local failed_guard_response = nil
+    for i, req in ipairs(data) do
+        if failed_guard_response ~= nil then
+            res[i] = failed_guard_response
+        else
+            -- An error is more likely to cause an NLua exception than to return an error here
+            local status, response = pcall(process_request, req)
+            if status then
+                res[i] = response
+
+                -- If the GUARD validation failed, skip the remaining commands
+                if response["type"] == "GUARD_RESPONSE" and not response["value"] then
+                    failed_guard_response = response
+                end
+            else
+                if type(response) ~= "string" then response = "Unknown error" end
+                res[i] = {type = "ERROR", err = response}
+            end
+        end
+    end
+    return res
+end
+
 -- Receive data from AP client and send message back
+-- Returns true if a message was received
 function send_receive ()
     local message, err = client_socket:receive()
 
@@ -519,30 +647,65 @@ function send_receive ()
     if message == "VERSION" then
         client_socket:send(tostring(SCRIPT_VERSION).."\n")
     else
-        local res = {}
         local data = json.decode(message)
-        local failed_guard_response = nil
-        for i, req in ipairs(data) do
-            if failed_guard_response ~= nil then
-                res[i] = failed_guard_response
-            else
-                -- An error is more likely to cause an NLua exception than to return an error here
-                local status, response = pcall(process_request, req)
-                if status then
-                    res[i] = response
-
-                    -- If the GUARD validation failed, skip the remaining commands
-                    if response["type"] == "GUARD_RESPONSE" and not response["value"] then
-                        failed_guard_response = response
-                    end
-                else
-                    if type(response) ~= "string" then response = "Unknown error" end
-                    res[i] = {type = "ERROR", err = response}
-                end
-            end
+        if data["requests"] ~= nil then
+            local res = {id = data["id"], responses = process_requests(data["requests"])}
+            client_socket:send(json.encode(res).."\n")
+        else
+            client_socket:send(json.encode(process_requests(data)).."\n")
         end
+    end
 
-        client_socket:send(json.encode(res).."\n")
+    return true
+end
+
+function bytes_to_string (bytes)
+    -- unpack has a limited number of results, so convert large reads in chunks
+    local chunks = {}
+    for i = 1, #bytes, 4096 do
+        chunks[#chunks + 1] = string.char(unpack(bytes, i, math.min(i + 4095, #bytes)))
+    end
+    return table.concat(chunks)
+end
+
+function int_to_bytes (value, size)
+    local bytes = {}
+    for i = size, 1, -1 do
+        bytes[i] = value % 256
+        value = math.floor(value / 256)
+    end
+    return string.char(unpack(bytes))
+end
+
+-- Push the watched ranges that changed since they were last pushed
+function push_watch_updates ()
+    local updates = {}
+    for id, watch in pairs(watches) do
+        local bytes = memory.read_bytes_as_array(watch.address, watch.size, watch.domain)
+        local data = bytes_to_string(bytes)
+        if data ~= watch.last then
+            watch.last = data
+            updates[#updates + 1] = {id = id, bytes = bytes, data = data}
+        end
+    end
+
+    if #updates == 0 then
+        return
+    end
+
+    if watch_binary then
+        local payload = {}
+        for _, update in ipairs(updates) do
+            payload[#payload + 1] = int_to_bytes(update.id, 2)..int_to_bytes(#update.data, 4)..update.data
+        end
+        payload = table.concat(payload)
+        client_socket:send(string.char(255)..int_to_bytes(#payload, 4)..payload)
+    else
+        local message = {type = "WATCH_UPDATE", updates = {}}
+        for i, update in ipairs(updates) do
+            message.updates[i] = {id = update.id, value = base64.encode(update.bytes)}
+        end
+        client_socket:send(json.encode(message).."\n")
     end
 end
 
@@ -603,15 +766,30 @@ function main ()
                     print("Client connected")
                     current_state = STATE_CONNECTED
                     client_socket = client
+                    watches = {}
+                    watch_interval = 1
+                    watch_binary = false
                     server:close()
                     server = nil
                     client_socket:settimeout(0)
                 end
             end
         else
+            -- Clients may send several messages without waiting for responses, so handle what has arrived
+            local received = 0
+            local handled
             repeat
-                send_receive()
-            until not locked
+                handled = send_receive()
+                if handled then
+                    received = received + 1
+                end
+            until not locked and (not handled or received >= MAX_MESSAGES_PER_FRAME)
+
+            watch_timer = watch_timer - 1
+            if current_state == STATE_CONNECTED and watch_timer <= 0 then
+                watch_timer = watch_interval
+                push_watch_updates()
+            end
 
             if timeout_timer <= 0 then
                 print("Client timed out")
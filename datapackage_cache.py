@@ -0,0 +1,178 @@
+"""
+Binary cache of game data packages for clients.
+
+A package is stored as one file per checksum, which is memory-mapped when loaded, so opening it costs the same for any
+package size, several clients on the same machine share the pages, and only the names that are looked up are decoded.
+
+Layout: header (MAGIC, byte order, length of the JSON part), a JSON object with everything but the name tables and the
+position and size of each table, then the tables. A table is its ids in ascending order (int64), the offsets of the
+names of those ids in the string table (uint32, one more than ids), the positions sorted by name (uint32), and the
+UTF-8 encoded names. Integers are stored in the byte order of the machine that wrote the file, so it can be cast
+without copying, and files of a different byte order are rejected.
+"""
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import sys
+import typing
+import weakref
+from array import array
+from bisect import bisect_left
+
+__all__ = ["PackedDataPackage", "PackedNameToId", "PackedIdToName", "write_packed", "load_packed"]
+
+MAGIC = b"APDPKG\x01"
+_header = struct.Struct("<7sBI")
+_tables = ("item_name_to_id", "location_name_to_id")
+_native_order = 1 if sys.byteorder == "big" else 0
+
+_loaded: weakref.WeakValueDictionary[str, PackedDataPackage] = weakref.WeakValueDictionary()
+
+
+def _align(position: int) -> int:
+    return position + -position % 8
+
+
+def _pack_table(name_to_id: typing.Mapping[str, int]) -> typing.Tuple[int, bytes]:
+    entries = sorted((code, name.encode("utf-8")) for name, code in name_to_id.items())
+    ids = array("q", (code for code, _ in entries))
+    offsets = array("I", [0])
+    for _, name in entries:
+        offsets.append(offsets[-1] + len(name))
+    by_name = array("I", sorted(range(len(entries)), key=lambda position: entries[position][1]))
+    data = b"".join([ids.tobytes(), offsets.tobytes(), by_name.tobytes(), *(name for _, name in entries)])
+    return len(entries), data
+
+
+def write_packed(path: str, package: typing.Mapping[str, typing.Any]) -> None:
+    """Writes a game's data package to path, atomically, so readers never map a partial file."""
+    info: typing.Dict[str, typing.Any] = {key: value for key, value in package.items() if key not in _tables}
+    blobs: typing.List[bytes] = []
+    tables: typing.Dict[str, typing.List[int]] = {}
+    position = 0
+    for key in _tables:
+        count, data = _pack_table(package.get(key, {}))
+        tables[key] = [position, count, len(data)]
+        padding = -len(data) % 8
+        blobs.append(data + bytes(padding))
+        position += len(data) + padding
+    info["__tables__"] = tables
+
+    encoded_info = json.dumps(info, separators=(",", ":")).encode("utf-8")
+    header = _header.pack(MAGIC, _native_order, len(encoded_info)) + encoded_info
+    header += bytes(_align(len(header)) - len(header))
+
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(header)
+        f.writelines(blobs)
+    os.replace(temp_path, path)
+
+
+class PackedDataPackage:
+    """A memory-mapped package file. Keeps the mapping open for as long as any of its tables are in use."""
+    info: typing.Dict[str, typing.Any]
+    """Everything in the package besides the name tables, like the checksum"""
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, byte_order, info_length = _header.unpack_from(self._map)
+        if magic != MAGIC or byte_order != _native_order:
+            self._map.close()
+            raise ValueError(f"Not a packed data package of this machine: {path}")
+        info_end = _header.size + info_length
+        self.info = json.loads(self._map[_header.size:info_end])
+        self._tables = self.info.pop("__tables__")
+        self._data_start = _align(info_end)
+
+    def name_to_id(self, key: str) -> PackedNameToId:
+        position, count, length = self._tables[key]
+        start = self._data_start + position
+        return PackedNameToId(self, memoryview(self._map)[start:start + length], count)
+
+    def as_dict(self) -> typing.Dict[str, typing.Any]:
+        """The package as returned by Utils.load_data_package_for_checksum, with lazy name tables."""
+        return {**self.info, **{key: self.name_to_id(key) for key in _tables}}
+
+
+class PackedNameToId(typing.Mapping[str, int]):
+    """Read-only name to id mapping of a packed table. Names are looked up by binary search and never all decoded."""
+
+    def __init__(self, package: PackedDataPackage, data: memoryview, count: int) -> None:
+        self._package = package  # keeps the mapping alive
+        offsets_start = count * 8
+        by_name_start = offsets_start + (count + 1) * 4
+        strings_start = by_name_start + count * 4
+        self._ids = data[:offsets_start].cast("q")
+        self._offsets = data[offsets_start:by_name_start].cast("I")
+        self._by_name = data[by_name_start:strings_start].cast("I")
+        self._strings = data[strings_start:]
+        self.id_to_name = PackedIdToName(self)
+
+    def _name(self, position: int) -> bytes:
+        return bytes(self._strings[self._offsets[position]:self._offsets[position + 1]])
+
+    def _find(self, name: str) -> int:
+        """Returns the position of the entry with that name, or -1."""
+        encoded = name.encode("utf-8")
+        index = bisect_left(self._by_name, encoded, key=self._name)
+        if index < len(self._by_name) and self._name(self._by_name[index]) == encoded:
+            return self._by_name[index]
+        return -1
+
+    def __getitem__(self, name: str) -> int:
+        position = self._find(name) if isinstance(name, str) else -1
+        if position < 0:
+            raise KeyError(name)
+        return self._ids[position]
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and self._find(name) >= 0
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return (self._name(position).decode("utf-8") for position in range(len(self._ids)))
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+class PackedIdToName(typing.Mapping[int, str]):
+    """Read-only id to name mapping of a packed table, by binary search of the sorted ids."""
+
+    def __init__(self, table: PackedNameToId) -> None:
+        self._table = table
+
+    def _find(self, code: int) -> int:
+        ids = self._table._ids
+        index = bisect_left(ids, code)
+        return index if index < len(ids) and ids[index] == code else -1
+
+    def __getitem__(self, code: int) -> str:
+        position = self._find(code) if isinstance(code, int) else -1
+        if position < 0:
+            raise KeyError(code)
+        return self._table._name(position).decode("utf-8")
+
+    def __contains__(self, code: object) -> bool:
+        return isinstance(code, int) and self._find(code) >= 0
+
+    def __iter__(self) -> typing.Iterator[int]:
+        return iter(self._table._ids)
+
+    def __len__(self) -> int:
+        return len(self._table._ids)
+
+
+def load_packed(path: str) -> typing.Optional[typing.Dict[str, typing.Any]]:
+    """Loads a packed data package, or returns None if there is none at path.
+    Files that are already mapped by this process are reused."""
+    package = _loaded.get(path)
+    if package is None:
+        if not os.path.exists(path):
+            return None
+        package = _loaded[path] = PackedDataPackage(path)
+    return package.as_dict()
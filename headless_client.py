@@ -0,0 +1,294 @@
+"""
+Slim client core for bots, trackers and load tests.
+
+Unlike CommonClient it has no UI, console or command processing and doesn't import any worlds, so a process can hold
+hundreds of connections. Names of items and locations come from the data package cache or the server, and packages are
+shared by all clients of a process.
+
+    client = HeadlessClient("localhost:38281", "Player1")
+    client.on("PrintJSON", lambda client, args: print(args["data"]))
+    await client.connect()
+    await client.run()
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import typing
+
+import websockets
+
+import Utils
+from NetUtils import ClientStatus, NetworkItem, NetworkPlayer, NetworkSlot, decode, encode
+
+__all__ = ["HeadlessClient", "ConnectionRefused"]
+
+logger = logging.getLogger("HeadlessClient")
+
+Handler = typing.Callable[["HeadlessClient", typing.Dict[str, typing.Any]], typing.Optional[typing.Awaitable[None]]]
+
+_packages: typing.Dict[typing.Tuple[str, str], typing.Dict[str, typing.Any]] = {}
+"""Data packages by game and checksum, shared by the clients of this process"""
+
+
+class ConnectionRefused(Exception):
+    """Raised by HeadlessClient.connect when the server refused the slot, with the server's errors"""
+
+    def __init__(self, errors: typing.List[str]) -> None:
+        super().__init__(", ".join(errors))
+        self.errors = errors
+
+
+class HeadlessClient:
+    """A connection to an Archipelago server that keeps the server state of its slot and dispatches packets."""
+    address: str
+    name: str
+    password: typing.Optional[str]
+    game: str
+    tags: typing.List[str]
+    items_handling: int
+    want_slot_data: bool
+    want_data_package: bool
+    """Whether to load or download the data packages of the room, needed for item_name and location_name"""
+
+    # server state
+    team: typing.Optional[int]
+    slot: typing.Optional[int]
+    slot_data: typing.Dict[str, typing.Any]
+    slot_info: typing.Dict[int, NetworkSlot]
+    player_names: typing.Dict[int, str]
+    items_received: typing.List[NetworkItem]
+    missing_locations: typing.Set[int]
+    checked_locations: typing.Set[int]
+    locations_info: typing.Dict[int, NetworkItem]
+    hint_points: int
+    stored_data: typing.Dict[str, typing.Any]
+    """Data storage values that were retrieved, kept up to date for keys subscribed to with set_notify"""
+    room_info: typing.Dict[str, typing.Any]
+    data_package_checksums: typing.Dict[str, str]
+
+    def __init__(self, address: str, name: str, password: typing.Optional[str] = None, game: str = "",
+                 tags: typing.Iterable[str] = ("Tracker",), items_handling: int = 0b111,
+                 want_slot_data: bool = False, want_data_package: bool = True) -> None:
+        self.address = address if "://" in address else f"ws://{address}"
+        self.name = name
+        self.password = password
+        self.game = game
+        self.tags = list(tags)
+        self.items_handling = items_handling
+        self.want_slot_data = want_slot_data
+        self.want_data_package = want_data_package
+
+        self.team = None
+        self.slot = None
+        self.slot_data = {}
+        self.slot_info = {}
+        self.player_names = {}
+        self.items_received = []
+        self.missing_locations = set()
+        self.checked_locations = set()
+        self.locations_info = {}
+        self.hint_points = 0
+        self.stored_data = {}
+        self.room_info = {}
+        self.data_package_checksums = {}
+
+        self.socket: typing.Optional[websockets.WebSocketClientProtocol] = None
+        self._handlers: typing.Dict[str, typing.List[Handler]] = {}
+        self._connected: typing.Optional[asyncio.Future[typing.Dict[str, typing.Any]]] = None
+        self._requests: typing.Dict[int, asyncio.Future[typing.Dict[str, typing.Any]]] = {}
+        self._request_ids = itertools.count()
+        self._reader: typing.Optional[asyncio.Task[None]] = None
+
+    def on(self, cmd: str, handler: Handler) -> None:
+        """Calls handler(client, args) for every packet of cmd, after the client's state was updated.
+        Handlers may be coroutine functions. Use "*" for all packets."""
+        self._handlers.setdefault(cmd, []).append(handler)
+
+    async def connect(self, timeout: float = 30) -> typing.Dict[str, typing.Any]:
+        """Opens the connection and logs in. Returns the arguments of the Connected packet."""
+        if self.address.startswith("wss://"):
+            import ssl
+            import certifi
+            ssl_context: typing.Optional[ssl.SSLContext] = ssl.create_default_context(cafile=certifi.where())
+        else:
+            ssl_context = None
+        self.socket = await websockets.connect(self.address, ping_timeout=None, ping_interval=None,
+                                               ssl=ssl_context, max_size=16 * 1024 * 1024)
+        self._connected = asyncio.get_running_loop().create_future()
+        self._reader = asyncio.create_task(self._receive(self.socket), name=f"HeadlessClient {self.name}")
+        try:
+            return await asyncio.wait_for(asyncio.shield(self._connected), timeout)
+        except BaseException:
+            await self.close()
+            raise
+
+    async def run(self) -> None:
+        """Waits until the connection is closed."""
+        if self._reader:
+            await asyncio.shield(self._reader)
+
+    async def close(self) -> None:
+        if self.socket:
+            await self.socket.close()
+        if self._reader and self._reader is not asyncio.current_task():
+            await asyncio.gather(self._reader, return_exceptions=True)
+
+    async def send_msgs(self, msgs: typing.List[typing.Any]) -> None:
+        if self.socket:
+            await self.socket.send(encode(msgs))
+
+    async def check_locations(self, locations: typing.Iterable[int]) -> None:
+        await self.send_msgs([{"cmd": "LocationChecks", "locations": list(locations)}])
+
+    async def status_update(self, status: ClientStatus) -> None:
+        await self.send_msgs([{"cmd": "StatusUpdate", "status": status}])
+
+    async def say(self, text: str) -> None:
+        await self.send_msgs([{"cmd": "Say", "text": text}])
+
+    async def get(self, keys: typing.Iterable[str]) -> typing.Dict[str, typing.Any]:
+        """Retrieves data storage values. The result is also kept in stored_data."""
+        request_id = next(self._request_ids)
+        future = self._requests[request_id] = asyncio.get_running_loop().create_future()
+        try:
+            await self.send_msgs([{"cmd": "Get", "keys": list(keys), "headless_request": request_id}])
+            return (await future)["keys"]
+        finally:
+            self._requests.pop(request_id, None)
+
+    async def set_notify(self, keys: typing.Iterable[str]) -> None:
+        """Subscribes to changes of data storage keys, which then keep stored_data up to date."""
+        await self.send_msgs([{"cmd": "SetNotify", "keys": list(keys)}])
+
+    def _package(self, game: str) -> typing.Dict[str, typing.Any]:
+        return _packages.get((game, self.data_package_checksums.get(game, "")), {})
+
+    def item_name(self, item: int, game: typing.Optional[str] = None) -> str:
+        """Name of an item of game, or of the own game. Needs want_data_package."""
+        return self._lookup("item_name_to_id", item, game)
+
+    def location_name(self, location: int, game: typing.Optional[str] = None) -> str:
+        """Name of a location of game, or of the own game. Needs want_data_package."""
+        return self._lookup("location_name_to_id", location, game)
+
+    def _lookup(self, table: str, code: int, game: typing.Optional[str]) -> str:
+        if game is None:
+            game = self.slot_info[self.slot].game if self.slot in self.slot_info else self.game
+        for package in (self._package(game), self._package("Archipelago")):
+            id_to_name = package.get(f"_{table}_reversed")
+            if id_to_name is None:
+                name_to_id = package.get(table)
+                if name_to_id is None:
+                    continue
+                # packed packages bring their own reverse lookup, downloaded ones are reversed once for all clients
+                id_to_name = getattr(name_to_id, "id_to_name", None)
+                if id_to_name is None:
+                    id_to_name = {code: name for name, code in name_to_id.items()}
+                package[f"_{table}_reversed"] = id_to_name
+            if code in id_to_name:
+                return id_to_name[code]
+        return f"Unknown {table.split('_', 1)[0]} (ID: {code})"
+
+    async def _receive(self, socket: websockets.WebSocketClientProtocol) -> None:
+        try:
+            async for data in socket:
+                for args in decode(data):
+                    await self._process(args)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            if self.socket is socket:
+                self.socket = None
+            error = ConnectionError(f"Connection to {self.address} closed")
+            for future in (self._connected, *self._requests.values()):
+                if future and not future.done():
+                    future.set_exception(error)
+
+    async def _process(self, args: typing.Dict[str, typing.Any]) -> None:
+        cmd = args["cmd"]
+        if cmd == "RoomInfo":
+            self.room_info = args
+            self.data_package_checksums = args.get("datapackage_checksums", {})
+            if self.want_data_package:
+                await self._prepare_data_package({*args["games"], "Archipelago"})
+            await self.send_msgs([{
+                "cmd": "Connect", "password": self.password, "name": self.name, "version": Utils.version_tuple,
+                "tags": self.tags, "items_handling": self.items_handling, "uuid": Utils.get_unique_identifier(),
+                "game": self.game, "slot_data": self.want_slot_data,
+            }])
+        elif cmd == "Connected":
+            self.team = args["team"]
+            self.slot = args["slot"]
+            self.slot_data = args.get("slot_data", {})
+            self.slot_info = {int(slot): info for slot, info in args["slot_info"].items()}
+            self._update_players(args["players"])
+            self.missing_locations = set(args["missing_locations"])
+            self.checked_locations = set(args["checked_locations"])
+            self.hint_points = args.get("hint_points", 0)
+            if self._connected and not self._connected.done():
+                self._connected.set_result(args)
+        elif cmd == "ConnectionRefused":
+            if self._connected and not self._connected.done():
+                self._connected.set_exception(ConnectionRefused(args.get("errors", [])))
+        elif cmd == "DataPackage":
+            for game, package in args["data"]["games"].items():
+                _packages[game, package.get("checksum", "")] = package
+                Utils.store_data_package_for_checksum(game, package)
+        elif cmd == "ReceivedItems":
+            if args["index"] == 0:
+                self.items_received = []
+            if args["index"] == len(self.items_received):
+                self.items_received.extend(NetworkItem(*item) for item in args["items"])
+            else:
+                await self.send_msgs([{"cmd": "Sync"}])
+        elif cmd == "LocationInfo":
+            for item in args["locations"]:
+                item = NetworkItem(*item)
+                self.locations_info[item.location] = item
+        elif cmd == "RoomUpdate":
+            if "players" in args:
+                self._update_players(args["players"])
+            if "hint_points" in args:
+                self.hint_points = args["hint_points"]
+            if "checked_locations" in args:
+                checked = set(args["checked_locations"])
+                self.checked_locations |= checked
+                self.missing_locations -= checked
+        elif cmd == "Retrieved":
+            self.stored_data.update(args["keys"])
+            future = self._requests.get(args.get("headless_request", -1))
+            if future and not future.done():
+                future.set_result(args)
+        elif cmd == "SetReply":
+            self.stored_data[args["key"]] = args["value"]
+        elif cmd == "InvalidPacket":
+            logger.warning(f"{self.name}: Invalid Packet of {args.get('type')}: {args.get('text')}")
+
+        for handler in (*self._handlers.get(cmd, ()), *self._handlers.get("*", ())):
+            try:
+                result = handler(self, args)
+                if result is not None:
+                    await result
+            except Exception:
+                logger.exception(f"{self.name}: Handler for {cmd} failed")
+
+    def _update_players(self, players: typing.Iterable[NetworkPlayer]) -> None:
+        self.player_names = {player.slot: player.alias for player in players if player.team == self.team}
+        self.player_names[0] = "Archipelago"
+
+    async def _prepare_data_package(self, games: typing.Set[str]) -> None:
+        needed = []
+        for game in games:
+            checksum = self.data_package_checksums.get(game)
+            if not checksum:
+                continue
+            if (game, checksum) not in _packages:
+                cached = Utils.load_data_package_for_checksum(game, checksum)
+                if cached.get("checksum") != checksum:
+                    needed.append(game)
+                    continue
+                _packages[game, checksum] = cached
+        if needed:
+            await self.send_msgs([{"cmd": "GetDataPackage", "games": needed}])
@@ -5,6 +5,7 @@ import typing
 import re
 import io
 import pkgutil
+from bisect import bisect_left, insort
 from collections import deque
 assert "kivy" not in sys.modules, "kvui should be imported before kivy for frozen compatibility"
 
@@ -1152,20 +1153,28 @@ class UILog(MDRecycleView):
     def __init__(self, *loggers_to_handle, **kwargs):
         super(UILog, self).__init__(**kwargs)
         self.data = []
+        # messages can arrive by the thousands, so they are collected and added to the view once per frame
+        self.pending: typing.Deque[typing.Dict[str, str]] = deque()
+        self.flush_trigger = Clock.create_trigger(self.flush_pending)
         for logger in loggers_to_handle:
             logger.addHandler(LogtoUI(self.on_log))
 
     def on_log(self, record: str) -> None:
-        self.data.append({"text": escape_markup(record)})
-        self.clean_old()
+        self.pending.append({"text": escape_markup(record)})
+        self.flush_trigger()
 
     def on_message_markup(self, text):
-        self.data.append({"text": text})
-        self.clean_old()
-
-    def clean_old(self):
-        if len(self.data) > self.messages:
-            self.data.pop(0)
+        self.pending.append({"text": text})
+        self.flush_trigger()
+
+    def flush_pending(self, dt: float = 0) -> None:
+        """Adds the messages that arrived since the last frame with a single update of the view,
+        keeping only the newest ones. All of them are still in the log file."""
+        new_messages = []
+        while self.pending:  # popleft is safe against appends from other threads
+            new_messages.append(self.pending.popleft())
+        if new_messages:
+            self.data = (self.data + new_messages[-self.messages:])[-self.messages:]
 
     def fix_heights(self):
         """Workaround fix for divergent texture and layout heights"""
@@ -1233,48 +1242,79 @@ class HintLog(MDRecycleView):
         super(HintLog, self).__init__()
         self.data = [self.header]
         self.parser = parser
+        # rendered rows by (finding player, location) and their order as (sort value, key), kept between refreshes,
+        # so that a change of hints only renders and sorts in the rows that changed
+        self.rows: dict[tuple[int, int], dict[str, typing.Any]] = {}
+        self.order: list[tuple[typing.Any, tuple[int, int]]] = []
+        self.order_sorter: typing.Callable[[dict], typing.Any] | None = None
+        self.rendered_names: dict[int, str] = {}
 
     def refresh_hints(self, hints):
         if not hints:  # Fix the scrolling looking visually wrong in some edge cases
             self.scroll_y = 1.0
-        data = []
         ctx = MDApp.get_running_app().ctx
+        if ctx.player_names != self.rendered_names:
+            # rows show player names, render them again
+            self.rows.clear()
+            self.order.clear()
+            self.rendered_names = dict(ctx.player_names)
+        if self.order_sorter is not self.hint_sorter:
+            self.order_sorter = self.hint_sorter
+            self.order = sorted((self.order_sorter(row), key) for key, row in self.rows.items())
+
+        current: dict[tuple[int, int], dict[str, typing.Any]] = {}
         for hint in hints:
             if not hint.get("status"): # Allows connecting to old servers
                 hint["status"] = HintStatus.HINT_FOUND if hint["found"] else HintStatus.HINT_UNSPECIFIED
-            hint_status_node = self.parser.handle_node({"type": "color",
-                                                        "color": status_colors.get(hint["status"], "red"),
-                                                        "text": status_names.get(hint["status"], "Unknown")})
-            if hint["status"] != HintStatus.HINT_FOUND and ctx.slot_concerns_self(hint["receiving_player"]):
-                hint_status_node = f"[u]{hint_status_node}[/u]"
-            data.append({
-                "receiving": {"text": self.parser.handle_node({"type": "player_id", "text": hint["receiving_player"]})},
-                "item": {"text": self.parser.handle_node({
-                    "type": "item_id",
-                    "text": hint["item"],
-                    "flags": hint["item_flags"],
-                    "player": hint["receiving_player"],
-                })},
-                "finding": {"text": self.parser.handle_node({"type": "player_id", "text": hint["finding_player"]})},
-                "location": {"text": self.parser.handle_node({
-                    "type": "location_id",
-                    "text": hint["location"],
-                    "player": hint["finding_player"],
-                })},
-                "entrance": {"text": self.parser.handle_node({"type": "color" if hint["entrance"] else "text",
-                                                              "color": "blue", "text": hint["entrance"]
-                                                              if hint["entrance"] else "Vanilla"})},
-                "status": {
-                    "text": hint_status_node,
-                    "hint": hint,
-                },
-            })
-
-        data.sort(key=self.hint_sorter, reverse=self.reversed)
-        for i in range(0, len(data), 2):
-            data[i]["striped"] = True
-        data.insert(0, self.header)
-        self.data = data
+            current[hint["finding_player"], hint["location"]] = hint
+
+        for key in self.rows.keys() - current.keys():
+            self.remove_row(key)
+        for key, hint in current.items():
+            row = self.rows.get(key)
+            if row is None or row["status"]["hint"] != hint:
+                if row is not None:
+                    self.remove_row(key)
+                row = self.rows[key] = self.render_hint(hint, ctx)
+                insort(self.order, (self.order_sorter(row), key))
+
+        rows = [self.rows[key] for _, key in (reversed(self.order) if self.reversed else self.order)]
+        for i, row in enumerate(rows):
+            row["striped"] = i % 2 == 0
+        self.data = [self.header, *rows]
+
+    def remove_row(self, key: tuple[int, int]) -> None:
+        row = self.rows.pop(key)
+        del self.order[bisect_left(self.order, (self.order_sorter(row), key))]
+
+    def render_hint(self, hint: dict[str, typing.Any], ctx) -> dict[str, typing.Any]:
+        hint_status_node = self.parser.handle_node({"type": "color",
+                                                    "color": status_colors.get(hint["status"], "red"),
+                                                    "text": status_names.get(hint["status"], "Unknown")})
+        if hint["status"] != HintStatus.HINT_FOUND and ctx.slot_concerns_self(hint["receiving_player"]):
+            hint_status_node = f"[u]{hint_status_node}[/u]"
+        return {
+            "receiving": {"text": self.parser.handle_node({"type": "player_id", "text": hint["receiving_player"]})},
+            "item": {"text": self.parser.handle_node({
+                "type": "item_id",
+                "text": hint["item"],
+                "flags": hint["item_flags"],
+                "player": hint["receiving_player"],
+            })},
+            "finding": {"text": self.parser.handle_node({"type": "player_id", "text": hint["finding_player"]})},
+            "location": {"text": self.parser.handle_node({
+                "type": "location_id",
+                "text": hint["location"],
+                "player": hint["finding_player"],
+            })},
+            "entrance": {"text": self.parser.handle_node({"type": "color" if hint["entrance"] else "text",
+                                                          "color": "blue", "text": hint["entrance"]
+                                                          if hint["entrance"] else "Vanilla"})},
+            "status": {
+                "text": hint_status_node,
+                "hint": hint,
+            },
+        }
 
     @staticmethod
     def hint_sorter(element: dict) -> str:
@@ -687,6 +687,18 @@ class GeneratorOptions(Group):
         start_inventory -> Move remaining items to start_inventory, generate additional filler items to fill locations.
         """
 
+    class RollProcesses(int):
+        """
+        Amount of worker processes to roll player options in.
+        0 or 1 -> Roll all options in the generating process
+        """
+
+    class OutputProcesses(int):
+        """
+        Amount of worker processes to generate output in, for worlds that support it.
+        0 -> Generate all output in threads of the generating process
+        """
+
     enemizer_path: EnemizerPath = EnemizerPath("EnemizerCLI/EnemizerCLI.Core")  # + ".exe" is implied on Windows
     player_files_path: PlayerFilesPath = PlayerFilesPath("Players")
     players: Players = Players(0)
@@ -696,6 +708,8 @@ class GeneratorOptions(Group):
     race: Race = Race(0)
     plando_options: PlandoOptions = PlandoOptions("bosses, connections, texts")
     panic_method: PanicMethod = PanicMethod("swap")
+    roll_processes: RollProcesses = RollProcesses(0)
+    output_processes: OutputProcesses = OutputProcesses(0)
     loglevel: str = "info"
     logtime: bool = False
 
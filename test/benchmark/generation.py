@@ -0,0 +1,247 @@
+"""
+Benchmark of full generations, at the scale of large async multiworlds.
+
+Generates reproducible multiworlds of several sizes from a fixed mix of games with default options, each in a fresh
+process, and reports the time of each step of Main.main as well as the peak memory of the process. Results can be
+stored as a baseline, which later runs are compared against to find regressions.
+
+Run with `python test/benchmark/generation.py --players 50 200 500 --baseline generation_baseline.json`,
+add `--save_baseline` to store the results of the run as the new baseline.
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+import typing
+
+# games that generate without any files, with a range of world sizes and generation costs
+GAME_MIX: typing.Tuple[str, ...] = (
+    "APQuest",
+    "ChecksFinder",
+    "Hollow Knight",
+    "Risk of Rain 2",
+    "Stardew Valley",
+    "Super Mario 64",
+    "The Witness",
+    "Timespinner",
+)
+
+# log messages of Main.main and Fill.balance_multiworld_progression that begin a phase, and the phase they begin
+PHASE_MARKERS: typing.Tuple[typing.Tuple[str, typing.Optional[str]], ...] = (
+    ("Archipelago Version", "generate_early"),
+    ("Creating MultiWorld.", "create_regions"),
+    ("Creating Items.", "create_items"),
+    ("Calculating Access Rules.", "set_rules"),
+    ("Running Item Plando.", "item_plando"),
+    ("Running Pre Main Fill.", "pre_fill"),
+    ("Filling the multiworld", "fill"),
+    ("Balancing multiworld progression", "progression_balancing"),
+    ("Skipping multiworld progression balancing.", "progression_balancing"),
+    ("Progression balancing skipped.", "progression_balancing"),
+    ("Beginning output", "output"),
+    ("Calculating playthrough.", "spoiler"),
+    ("Creating final archive", "archive"),
+    ("Done.", None),
+)
+
+
+class PhaseRecorder(logging.Handler):
+    """Times the phases of a generation from the log messages that begin them."""
+
+    def __init__(self) -> None:
+        super().__init__(logging.INFO)
+        self.phases: typing.Dict[str, float] = {}
+        self.current: typing.Optional[str] = None
+        self.started = 0.0
+
+    def begin(self, phase: typing.Optional[str]) -> None:
+        now = time.perf_counter()
+        if self.current:
+            self.phases[self.current] = self.phases.get(self.current, 0) + now - self.started
+        self.current = phase
+        self.started = now
+
+    def emit(self, record: logging.LogRecord) -> None:
+        message = record.getMessage()
+        for prefix, phase in PHASE_MARKERS:
+            if message.startswith(prefix):
+                self.begin(phase)
+                break
+
+
+def _peak_memory() -> typing.Optional[int]:
+    """Peak resident memory of this process, in bytes."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        try:
+            import psutil
+            return psutil.Process().memory_info().peak_wset
+        except (ImportError, AttributeError):
+            return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _generate(games: typing.List[str], seed: int, spoiler: int) -> typing.Dict[str, typing.Any]:
+    """Runs one generation in this process and returns its timings. Meant to be run in a fresh process."""
+    import os
+    import warnings
+    from tempfile import TemporaryDirectory
+
+    from time_it import TimeIt
+
+    warnings.simplefilter("ignore")
+    timings: typing.Dict[str, float] = {}
+    with TemporaryDirectory() as players_dir, TemporaryDirectory() as output_dir:
+        for n, game in enumerate(games, 1):
+            with open(os.path.join(players_dir, f"{n}.yaml"), "w", encoding="utf-8") as f:
+                f.write(json.dumps({"name": f"Player{n}", "game": game, game: {}}))
+
+        with TimeIt("load_worlds") as timer:
+            import Generate
+            import Main
+            import worlds  # noqa: F401
+        timings["load_worlds"] = timer.dif
+
+        args = Generate.mystery_argparse(["--seed", str(seed), "--spoiler", str(spoiler),
+                                          "--player_files_path", players_dir, "--outputpath", output_dir])
+        with TimeIt("roll_options") as timer:
+            erargs, seed = Generate.main(args)
+        timings["roll_options"] = timer.dif
+
+        recorder = PhaseRecorder()
+        logging.getLogger().addHandler(recorder)
+        try:
+            with TimeIt("generation") as timer:
+                Main.main(erargs, seed)
+            recorder.begin(None)
+        finally:
+            logging.getLogger().removeHandler(recorder)
+        timings.update(recorder.phases)
+
+    return {
+        "players": len(games),
+        "phases": timings,
+        "total": timings["load_worlds"] + timings["roll_options"] + timer.dif,
+        "peak_memory": _peak_memory(),
+    }
+
+
+def _compare(result: typing.Dict[str, typing.Any], baseline: typing.Dict[str, typing.Any], tolerance: float,
+             min_seconds: float) -> typing.List[str]:
+    """Returns descriptions of the measurements of result that are worse than in baseline by more than tolerance.
+    Phases that took less than min_seconds in the baseline are only noise and are ignored."""
+    measurements = {**result["phases"], "total": result["total"]}
+    baseline_measurements = {**baseline["phases"], "total": baseline["total"]}
+    regressions = []
+    for name, seconds in measurements.items():
+        before = baseline_measurements.get(name)
+        if before is not None and before >= min_seconds and seconds > before * (1 + tolerance):
+            regressions.append(f"{name} took {seconds:.2f}s instead of {before:.2f}s")
+    if result["peak_memory"] and baseline.get("peak_memory") and \
+            result["peak_memory"] > baseline["peak_memory"] * (1 + tolerance):
+        regressions.append(f"peak memory is {result['peak_memory'] / 2 ** 20:.0f} MiB "
+                           f"instead of {baseline['peak_memory'] / 2 ** 20:.0f} MiB")
+    return regressions
+
+
+def _print_results(results: typing.List[typing.Dict[str, typing.Any]],
+                   baseline: typing.Optional[typing.Dict[str, typing.Any]]) -> None:
+    phases: typing.List[str] = []
+    for result in results:
+        phases.extend(phase for phase in result["phases"] if phase not in phases)
+
+    def cell(result: typing.Dict[str, typing.Any], value: typing.Optional[float], key: str) -> str:
+        text = "-" if value is None else f"{value:.2f}"
+        before = baseline.get(str(result["players"])) if baseline else None
+        if value is not None and before:
+            before_value = before["phases"].get(key) if key != "total" else before["total"]
+            if before_value:
+                text += f" ({value / before_value - 1:+.0%})"
+        return text
+
+    header = ["phase [s]"] + [f"{result['players']} players" for result in results]
+    rows = [[phase] + [cell(result, result["phases"].get(phase), phase) for result in results] for phase in phases]
+    rows.append(["total"] + [cell(result, result["total"], "total") for result in results])
+    rows.append(["peak memory [MiB]"] + ["-" if result["peak_memory"] is None else
+                                          f"{result['peak_memory'] / 2 ** 20:.0f}" for result in results])
+    widths = [max(len(row[column]) for row in [header] + rows) for column in range(len(header))]
+    for row in [header] + rows:
+        print("  ".join(text.ljust(width) if column == 0 else text.rjust(width)
+                        for column, (text, width) in enumerate(zip(row, widths))))
+
+
+def run_generation_benchmark() -> None:
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import get_context
+
+    from Utils import __version__
+
+    parser = argparse.ArgumentParser(description="Times the phases of generating large multiworlds.")
+    parser.add_argument("--players", type=int, nargs="+", default=[50, 200, 500],
+                        help="Sizes of the multiworlds to generate.")
+    parser.add_argument("--games", nargs="+", default=list(GAME_MIX),
+                        help="Games assigned to the slots in turn.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--spoiler", type=int, default=2, help="Spoiler level, 2 includes the playthrough.")
+    parser.add_argument("--baseline", help="JSON file of a previous run to compare against.")
+    parser.add_argument("--save_baseline", action="store_true", help="Store the results of this run as baseline.")
+    parser.add_argument("--tolerance", type=float, default=.1,
+                        help="Fraction a measurement may exceed the baseline by before it counts as regression.")
+    parser.add_argument("--min_seconds", type=float, default=1,
+                        help="Phases shorter than this in the baseline are not compared.")
+    parser.add_argument("--report", help="Write the results of this run as JSON.")
+    args = parser.parse_args()
+    if args.save_baseline and not args.baseline:
+        parser.error("--save_baseline requires --baseline")
+
+    config = {"games": args.games, "seed": args.seed, "spoiler": args.spoiler}
+    baseline: typing.Optional[typing.Dict[str, typing.Any]] = None
+    if args.baseline and not args.save_baseline:
+        try:
+            with open(args.baseline, encoding="utf-8") as f:
+                stored = json.load(f)
+        except FileNotFoundError:
+            print(f"No baseline at {args.baseline}, use --save_baseline to create it.")
+        else:
+            if stored["config"] != config:
+                print(f"Baseline was generated with {stored['config']}, comparing anyway.")
+            baseline = stored["results"]
+
+    results = []
+    for players in args.players:
+        games = [args.games[slot % len(args.games)] for slot in range(players)]
+        print(f"Generating {players} players.")
+        # a fresh process per size, so neither imports nor memory carry over
+        with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as executor:
+            results.append(executor.submit(_generate, games, args.seed, args.spoiler).result())
+
+    print()
+    _print_results(results, baseline)
+
+    report = {"config": config, "version": __version__, "python": sys.version.split()[0],
+              "results": {str(result["players"]): result for result in results}}
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Stored baseline at {args.baseline}.")
+    elif baseline:
+        regressions = [f"{result['players']} players: {regression}" for result in results
+                       if str(result["players"]) in baseline
+                       for regression in _compare(result, baseline[str(result["players"])],
+                                                  args.tolerance, args.min_seconds)]
+        if regressions:
+            print("\nSlower than baseline:\n" + "\n".join(regressions))
+            sys.exit(1)
+        print("\nNo regressions against baseline.")
+
+
+if __name__ == "__main__":
+    from path_change import change_home
+    change_home()
+    run_generation_benchmark()
@@ -0,0 +1,83 @@
+import concurrent.futures
+import os
+import tempfile
+import unittest
+from typing import Any
+from unittest import mock
+
+from worlds.AutoWorld import AutoWorldRegister, call_output_process, generate_output_from_data
+from . import TestWorld, generate_test_multiworld
+
+
+def write_output(cls, output_data: Any, output_directory: str) -> str:
+    with open(os.path.join(output_directory, f"{output_data}.txt"), "w") as f:
+        f.write(output_data)
+    return output_data
+
+
+class TestOutputProcess(unittest.TestCase):
+    def test_output_data_round_trip(self) -> None:
+        """Data from get_output_data is turned into files by generate_output_from_data, and its result finished."""
+        multiworld = generate_test_multiworld()
+        finished = []
+        with mock.patch.object(TestWorld, "get_output_data", lambda world: f"Player{world.player}"), \
+                mock.patch.object(TestWorld, "generate_output_from_data", classmethod(write_output)), \
+                mock.patch.object(TestWorld, "finish_output", lambda world, result: finished.append(result)), \
+                tempfile.TemporaryDirectory() as temp_dir, \
+                concurrent.futures.ThreadPoolExecutor(1) as pool:
+            call_output_process(multiworld, 1, temp_dir, pool)
+            self.assertEqual(os.listdir(temp_dir), ["Player1.txt"])
+        self.assertEqual(finished, ["Player1"])
+
+    def test_output_data_fallback(self) -> None:
+        """Worlds returning no output data have their generate_output called instead."""
+        multiworld = generate_test_multiworld()
+        with mock.patch.object(TestWorld, "generate_output") as generate_output, \
+                concurrent.futures.ThreadPoolExecutor(1) as pool:
+            call_output_process(multiworld, 1, "output", pool)
+        generate_output.assert_called_once_with("output")
+
+    def test_output_process_failure(self) -> None:
+        """A failing output process still calls finish_output, so threads waiting on the output can continue."""
+        multiworld = generate_test_multiworld()
+        finished = []
+
+        def fail(cls, output_data: Any, output_directory: str) -> None:
+            raise ValueError(output_data)
+
+        with mock.patch.object(TestWorld, "get_output_data", lambda world: "data"), \
+                mock.patch.object(TestWorld, "generate_output_from_data", classmethod(fail)), \
+                mock.patch.object(TestWorld, "finish_output", lambda world, result: finished.append(result)), \
+                concurrent.futures.ThreadPoolExecutor(1) as pool:
+            with self.assertRaises(ValueError):
+                call_output_process(multiworld, 1, "output", pool)
+        self.assertEqual(finished, [None])
+
+    def test_output_fallback_failure(self) -> None:
+        """A world that generates its output in the calling thread gets no finish_output when that output fails."""
+        multiworld = generate_test_multiworld()
+        finished = []
+
+        def fail(world, output_directory: str) -> None:
+            raise ValueError(output_directory)
+
+        with mock.patch.object(TestWorld, "generate_output", fail), \
+                mock.patch.object(TestWorld, "finish_output", lambda world, result: finished.append(result)), \
+                concurrent.futures.ThreadPoolExecutor(1) as pool:
+            with self.assertRaises(ValueError):
+                call_output_process(multiworld, 1, "output", pool)
+        self.assertEqual(finished, [])
+
+    def test_output_process_loads_world(self) -> None:
+        """Workers load the world of a game that was deferred by lazy world loading before generating its output."""
+        def load_worlds(games: Any) -> None:
+            for game in games:
+                AutoWorldRegister.world_types[game] = TestWorld
+
+        with mock.patch.object(TestWorld, "generate_output_from_data", classmethod(write_output)), \
+                mock.patch.dict(AutoWorldRegister.world_types), \
+                mock.patch("worlds.load_worlds", side_effect=load_worlds) as loader, \
+                tempfile.TemporaryDirectory() as temp_dir:
+            del AutoWorldRegister.world_types[TestWorld.game]
+            self.assertEqual(generate_output_from_data(TestWorld.game, "Player1", temp_dir), "Player1")
+        loader.assert_called_once_with((TestWorld.game,))
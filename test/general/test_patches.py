@@ -1,6 +1,6 @@
 ﻿import unittest
 from worlds.AutoWorld import AutoWorldRegister
-from worlds.Files import AutoPatchRegister
+from worlds.Files import AutoPatchRegister, APPatchExtension, APTokenMixin, APTokenTypes
 
 
 class TestPatches(unittest.TestCase):
@@ -9,3 +9,54 @@ class TestPatches(unittest.TestCase):
             with self.subTest(game=game_name):
                 self.assertIn(game_name, AutoWorldRegister.world_types.keys(),
                               f"Patch '{game_name}' does not match the name of any world.")
+
+    def test_patch_extension_registered_late(self) -> None:
+        """Extensions registered after a step was resolved, e.g. by lazily loaded worlds, are used from then on."""
+        from worlds.Files import AutoPatchExtensionRegister, get_patch_extension
+
+        self.assertIs(get_patch_extension("Late Game", "apply_bsdiff4"), APPatchExtension.apply_bsdiff4)
+        try:
+            class LateExtension(APPatchExtension):
+                game = "Late Game"
+
+                @staticmethod
+                def apply_bsdiff4(caller, rom: bytes, patch: str) -> bytes:
+                    return rom
+
+            self.assertIs(get_patch_extension("Late Game", "apply_bsdiff4"), LateExtension.apply_bsdiff4)
+        finally:
+            AutoPatchExtensionRegister.extension_types.pop("Late Game", None)
+
+
+class TestTokens(unittest.TestCase):
+    class TokenFile(APTokenMixin):
+        def __init__(self) -> None:
+            self.files = {}
+
+        def get_file(self, file: str) -> bytes:
+            return self.files[file]
+
+    def setUp(self) -> None:
+        self.tokens = self.TokenFile()
+        self.tokens.write_token(APTokenTypes.WRITE, 0, b"\x01\x02")
+        self.tokens.write_token(APTokenTypes.COPY, 4, (2, 0))
+        self.tokens.write_token(APTokenTypes.RLE, 6, (2, 0xAA))
+        self.tokens.write_token(APTokenTypes.OR_8, 8, 0x0F)
+        self.tokens.write_token(APTokenTypes.AND_8, 9, 0x0F)
+        self.tokens.write_token(APTokenTypes.XOR_8, 10, 0xFF)
+        self.tokens.files["tokens.bin"] = self.tokens.get_token_binary()
+        self.expected = bytes([1, 2, 0, 0, 1, 2, 0xAA, 0xAA, 0xFF, 0x00, 0x0F, 0xF0])
+
+    def test_apply_tokens_copies_bytes(self) -> None:
+        """Immutable source data must not be touched."""
+        source = bytes([0] * 8 + [0xF0] * 4)
+        result = APPatchExtension.apply_tokens(self.tokens, source, "tokens.bin")
+        self.assertEqual(bytes(result), self.expected)
+        self.assertEqual(source, bytes([0] * 8 + [0xF0] * 4))
+
+    def test_apply_tokens_in_place(self) -> None:
+        """A bytearray is patched without making a copy."""
+        source = bytearray([0] * 8 + [0xF0] * 4)
+        result = APPatchExtension.apply_tokens(self.tokens, source, "tokens.bin")
+        self.assertIs(result, source)
+        self.assertEqual(bytes(result), self.expected)
@@ -100,3 +100,25 @@ class TestWorldManifest(unittest.TestCase):
             self.manifest,
             f"archipelago.json for '{self.game}' must not define 'compatible_version', see apworld specification.md.",
         )
+
+
+class TestLazyWorldLoading(unittest.TestCase):
+    def test_load_worlds(self) -> None:
+        """Test that lazy world loading defers worlds with a manifest until they are requested."""
+        import os
+        import subprocess
+        import sys
+
+        game = next(filter(get_source_world_manifest_path, source_world_names))
+        code = (
+            "import json, sys, worlds\n"
+            "game = sys.argv[1]\n"
+            "deferred = game in worlds.lazy_world_sources and game not in worlds.AutoWorldRegister.world_types\n"
+            "worlds.load_worlds([game])\n"
+            "print(json.dumps([deferred, game in worlds.AutoWorldRegister.world_types,\n"
+            "                  game in worlds.network_data_package['games']]))\n"
+        )
+        env = dict(os.environ, AP_LAZY_WORLD_LOADING="1", SKIP_REQUIREMENTS_UPDATE="1")
+        result = subprocess.run([sys.executable, "-c", code, game], capture_output=True, text=True, env=env,
+                                cwd=local_path(), check=True)
+        self.assertEqual(json.loads(result.stdout.splitlines()[-1]), [True, True, True])
@@ -0,0 +1,313 @@
+# Load test for MultiServer, simulating a client for every slot of a large multiworld.
+# This spawns processes and may modify your local AP, so this is not run as part of unit testing.
+# Run with `python -m test.hosting.load --players 300`, or `--multidata <file>` to replay against an existing game.
+import argparse
+import asyncio
+import json
+import random
+import socket
+import subprocess
+import sys
+import time
+import zipfile
+import zlib
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Any, Dict, List, Optional, Tuple
+
+__all__ = [
+    "Latencies",
+    "LoadServer",
+    "ServerMonitor",
+    "SimulatedPlayer",
+    "run_load_test",
+]
+
+
+class Latencies:
+    """Response times of operations, in seconds, by operation name."""
+
+    def __init__(self) -> None:
+        self.samples: Dict[str, List[float]] = {}
+        self.failures: Dict[str, int] = {}
+
+    def add(self, operation: str, seconds: float) -> None:
+        self.samples.setdefault(operation, []).append(seconds)
+
+    def fail(self, operation: str) -> None:
+        self.failures[operation] = self.failures.get(operation, 0) + 1
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        result = {}
+        for operation, samples in self.samples.items():
+            samples = sorted(samples)
+            result[operation] = {
+                "count": len(samples),
+                "failed": self.failures.get(operation, 0),
+                **{f"p{p}": samples[min(len(samples) - 1, len(samples) * p // 100)] * 1000 for p in (50, 90, 99)},
+                "max": samples[-1] * 1000,
+            }
+        for operation, failed in self.failures.items():
+            result.setdefault(operation, {"count": 0, "failed": failed})
+        return result
+
+
+class LoadServer:
+    """MultiServer.py in its own process, as it is hosted."""
+    process: subprocess.Popen
+
+    def __init__(self, multidata: Path, port: int) -> None:
+        self.multidata = multidata
+        self.port = port
+        self.address = f"127.0.0.1:{port}"
+
+    def __enter__(self) -> "LoadServer":
+        self.process = subprocess.Popen(
+            [sys.executable, str(Path(__file__).parents[2] / "MultiServer.py"), str(self.multidata),
+             "--host", "127.0.0.1", "--port", str(self.port), "--disable_save", "--release_mode", "auto",
+             "--loglevel", "warning"],
+            stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, text=True)
+        deadline = time.monotonic() + 120
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise Exception(f"MultiServer exited with {self.process.returncode}")
+            try:
+                socket.create_connection(("127.0.0.1", self.port), timeout=1).close()
+                return self
+            except OSError:
+                time.sleep(.5)
+        self.__exit__(None, None, None)
+        raise TimeoutError("MultiServer did not start")
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:  # type: ignore
+        try:
+            self.process.communicate("/exit\n", timeout=30)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+            self.process.wait()
+
+
+class ServerMonitor:
+    """Samples CPU and memory use of the server process while the test runs."""
+
+    def __init__(self, pid: int, interval: float = 1) -> None:
+        import psutil
+        self.process = psutil.Process(pid)
+        self.interval = interval
+        self.samples: List[Tuple[float, str, float, float]] = []  # (time, phase, cpu %, rss MiB)
+        self.phase = "startup"
+        self.start = time.monotonic()
+
+    async def run(self) -> None:
+        self.process.cpu_percent()
+        while True:
+            await asyncio.sleep(self.interval)
+            self.samples.append((time.monotonic() - self.start, self.phase, self.process.cpu_percent(),
+                                 self.process.memory_info().rss / 1024 ** 2))
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        result: Dict[str, Dict[str, float]] = {}
+        for phase in dict.fromkeys(phase for _, phase, _, _ in self.samples):
+            cpu = [sample[2] for sample in self.samples if sample[1] == phase]
+            memory = [sample[3] for sample in self.samples if sample[1] == phase]
+            result[phase] = {"cpu_mean": sum(cpu) / len(cpu), "cpu_max": max(cpu), "rss_max": max(memory)}
+        return result
+
+
+class SimulatedPlayer:
+    """A game client of one slot, sending the traffic of a player and timing the server's responses."""
+
+    def __init__(self, address: str, name: str, game: str, latencies: Latencies, timeout: float) -> None:
+        from headless_client import HeadlessClient
+
+        self.client = HeadlessClient(address, name, game=game, tags=[], want_data_package=False)
+        self.latencies = latencies
+        self.timeout = timeout
+        self.waiting: Dict[Tuple[str, Any], asyncio.Future[None]] = {}
+        self.client.on("RoomUpdate", self._on_room_update)
+        self.client.on("LocationInfo", self._on_location_info)
+        self.client.on("SetReply", self._on_set_reply)
+
+    def _resolve(self, key: Tuple[str, Any]) -> None:
+        future = self.waiting.pop(key, None)
+        if future and not future.done():
+            future.set_result(None)
+
+    def _on_room_update(self, _: Any, args: Dict[str, Any]) -> None:
+        for location in args.get("checked_locations", ()):
+            self._resolve(("check", location))
+        if not self.client.missing_locations:
+            self._resolve(("release", None))
+
+    def _on_location_info(self, _: Any, args: Dict[str, Any]) -> None:
+        for item in args["locations"]:
+            self._resolve(("hint", item[1]))
+
+    def _on_set_reply(self, _: Any, args: Dict[str, Any]) -> None:
+        self._resolve(("set", args["key"]))
+
+    async def _timed(self, operation: str, keys: List[Tuple[str, Any]], send: Dict[str, Any]) -> None:
+        loop = asyncio.get_running_loop()
+        futures = [self.waiting.setdefault(key, loop.create_future()) for key in keys]
+        start = time.perf_counter()
+        try:
+            await self.client.send_msgs([send])
+            await asyncio.wait_for(asyncio.gather(*futures), self.timeout)
+            self.latencies.add(operation, time.perf_counter() - start)
+        except (asyncio.TimeoutError, ConnectionError):
+            self.latencies.fail(operation)
+        finally:
+            for key in keys:
+                self.waiting.pop(key, None)
+
+    async def connect(self) -> None:
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(self.client.connect(), self.timeout)
+            self.latencies.add("connect", time.perf_counter() - start)
+        except Exception:
+            self.latencies.fail("connect")
+
+    async def check_burst(self, fraction: float, burst: int) -> None:
+        """Checks a fraction of the missing locations, in messages of up to burst locations."""
+        missing = sorted(self.client.missing_locations)
+        random.shuffle(missing)
+        missing = missing[:int(len(missing) * fraction)]
+        for start in range(0, len(missing), burst):
+            locations = missing[start:start + burst]
+            await self._timed("check", [("check", location) for location in locations],
+                              {"cmd": "LocationChecks", "locations": locations})
+
+    async def hint(self, count: int) -> None:
+        locations = random.sample(sorted(self.client.missing_locations), min(count, len(self.client.missing_locations)))
+        for location in locations:
+            await self._timed("hint", [("hint", location)],
+                              {"cmd": "LocationScouts", "locations": [location], "create_as_hint": 2})
+
+    async def set_data(self, count: int) -> None:
+        key = f"load_test_{self.client.slot}"
+        for _ in range(count):
+            await self._timed("set", [("set", key)], {"cmd": "Set", "key": key, "default": 0, "want_reply": True,
+                                                      "operations": [{"operation": "add", "value": 1}]})
+
+    async def release(self) -> None:
+        """Goals, which releases the remaining locations of the slot."""
+        if self.client.missing_locations:
+            await self._timed("release", [("release", None)], {"cmd": "StatusUpdate", "status": 30})
+
+    async def close(self) -> None:
+        await self.client.close()
+
+
+def read_players(multidata: Path) -> List[Tuple[str, str]]:
+    """Returns name and game of every player slot of a multidata file or zip."""
+    from NetUtils import SlotType
+    from Utils import restricted_loads
+
+    if multidata.suffix == ".zip":
+        with zipfile.ZipFile(multidata) as zf:
+            data = zf.read(next(file for file in zf.namelist() if file.endswith(".archipelago")))
+    else:
+        data = multidata.read_bytes()
+    slot_info = restricted_loads(zlib.decompress(data[1:]))["slot_info"]
+    return [(info.name, info.game) for slot, info in sorted(slot_info.items()) if info.type == SlotType.player]
+
+
+async def _run_phase(name: str, monitor: Optional[ServerMonitor], players: List[SimulatedPlayer],
+                     action: Any, spread: float) -> float:
+    """Runs an action for all players, starting them at random times within spread seconds."""
+    async def start(player: SimulatedPlayer) -> None:
+        await asyncio.sleep(random.uniform(0, spread))
+        await action(player)
+
+    if monitor:
+        monitor.phase = name
+    start_time = time.perf_counter()
+    await asyncio.gather(*(start(player) for player in players))
+    duration = time.perf_counter() - start_time
+    print(f"{name}: {duration:.1f} s")
+    return duration
+
+
+async def run_load_test(address: str, players: List[Tuple[str, str]], args: argparse.Namespace,
+                        server_pid: Optional[int] = None) -> Dict[str, Any]:
+    latencies = Latencies()
+    monitor = ServerMonitor(server_pid) if server_pid else None
+    monitor_task = asyncio.create_task(monitor.run()) if monitor else None
+    simulated = [SimulatedPlayer(address, name, game, latencies, args.timeout) for name, game in players]
+    phases: Dict[str, float] = {}
+    try:
+        phases["connect"] = await _run_phase("connect", monitor, simulated, SimulatedPlayer.connect, args.spread)
+        connected = [player for player in simulated if player.client.slot is not None]
+        phases["checks"] = await _run_phase("checks", monitor, connected,
+                                            lambda player: player.check_burst(.5, args.burst), args.spread)
+        phases["hints"] = await _run_phase("hints", monitor, connected,
+                                           lambda player: player.hint(args.hints), args.spread)
+        phases["data storage"] = await _run_phase("data storage", monitor, connected,
+                                                  lambda player: player.set_data(args.sets), args.spread)
+        releasing = connected[:int(len(connected) * args.release_fraction)]
+        phases["releases"] = await _run_phase("releases", monitor, releasing, SimulatedPlayer.release, args.spread)
+    finally:
+        await asyncio.gather(*(player.close() for player in simulated), return_exceptions=True)
+        if monitor_task:
+            monitor_task.cancel()
+
+    return {
+        "players": len(players),
+        "phases": phases,
+        "latency_ms": latencies.summary(),
+        "server": monitor.summary() if monitor else {},
+        "server_samples": monitor.samples if monitor else [],
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"\n{report['players']} players")
+    print(f"{'operation':<14}{'count':>8}{'failed':>8}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for operation, stats in report["latency_ms"].items():
+        print(f"{operation:<14}{stats['count']:>8}{stats['failed']:>8}"
+              + "".join(f"{stats.get(key, 0):>10.1f}" for key in ("p50", "p90", "p99", "max")))
+    if report["server"]:
+        print(f"\n{'phase':<14}{'cpu mean %':>12}{'cpu max %':>12}{'rss max MiB':>14}")
+        for phase, stats in report["server"].items():
+            print(f"{phase:<14}{stats['cpu_mean']:>12.1f}{stats['cpu_max']:>12.1f}{stats['rss_max']:>14.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replays the traffic of many clients against MultiServer.")
+    parser.add_argument("--players", type=int, default=300, help="Slots to generate, if no multidata is given.")
+    parser.add_argument("--game", default="APQuest", help="Game of the generated slots.")
+    parser.add_argument("--multidata", type=Path, help="Existing multidata file or zip to host instead.")
+    parser.add_argument("--address", help="Connect to an already running server instead of starting one.")
+    parser.add_argument("--port", type=int, default=38290)
+    parser.add_argument("--spread", type=float, default=5, help="Seconds over which clients start each phase.")
+    parser.add_argument("--burst", type=int, default=10, help="Locations per LocationChecks.")
+    parser.add_argument("--hints", type=int, default=3, help="Hints per player.")
+    parser.add_argument("--sets", type=int, default=5, help="Data storage Sets per player.")
+    parser.add_argument("--release_fraction", type=float, default=.2, help="Fraction of players that goal.")
+    parser.add_argument("--timeout", type=float, default=60, help="Seconds before an operation counts as failed.")
+    parser.add_argument("--report", type=Path, help="Write the report, including all server samples, as JSON.")
+    args = parser.parse_args()
+
+    with TemporaryDirectory() as tempdir:
+        multidata = args.multidata
+        if not multidata and not args.address:
+            from test.hosting.generate import generate_local
+            print(f"Generating {args.players} slots of {args.game}")
+            multidata = generate_local([args.game] * args.players, tempdir)
+        players = read_players(multidata) if multidata else \
+            [(f"Player{n}", args.game) for n in range(1, args.players + 1)]
+
+        if args.address:
+            report = asyncio.run(run_load_test(args.address, players, args))
+        else:
+            with LoadServer(multidata, args.port) as server:
+                report = asyncio.run(run_load_test(server.address, players, args, server.process.pid))
+
+    print_report(report)
+    if args.report:
+        args.report.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import asyncio
+import base64
+import json
+import typing
+import unittest
+
+from worlds._bizhawk import BizHawkContext, RequestFailedError, WATCH_FRAME_MARKER, get_watched, ping, read, \
+    sync_watches, unwatch, watch
+
+
+class FakeConnector:
+    """Answers requests like the connector script and pushes updates of watched memory before each response."""
+
+    def __init__(self) -> None:
+        self.memory = bytearray(range(256))
+        self.watches: typing.Dict[int, typing.Tuple[int, int]] = {}
+        self.last: typing.Dict[int, bytes] = {}
+        self.binary = False
+        self.hold = 1
+        """Number of messages to collect before answering them, in reverse order"""
+        self.received = 0
+
+    def push_updates(self) -> bytes:
+        updates = {}
+        for watch_id, (address, size) in self.watches.items():
+            data = bytes(self.memory[address:address + size])
+            if self.last.get(watch_id) != data:
+                self.last[watch_id] = updates[watch_id] = data
+        if not updates:
+            return b""
+        if self.binary:
+            payload = b"".join(watch_id.to_bytes(2, "big") + len(data).to_bytes(4, "big") + data
+                               for watch_id, data in updates.items())
+            return WATCH_FRAME_MARKER + len(payload).to_bytes(4, "big") + payload
+        return json.dumps({"type": "WATCH_UPDATE", "updates": [
+            {"id": watch_id, "value": base64.b64encode(data).decode()} for watch_id, data in updates.items()
+        ]}).encode() + b"\n"
+
+    def handle(self, request: typing.Dict[str, typing.Any]) -> typing.Dict[str, typing.Any]:
+        if request["type"] == "WATCH":
+            self.watches[request["id"]] = (request["address"], request["size"])
+            self.last.pop(request["id"], None)
+        elif request["type"] == "UNWATCH":
+            for watch_id in request.get("ids", list(self.watches)):
+                self.watches.pop(watch_id, None)
+        elif request["type"] == "SET_WATCH_OPTIONS":
+            self.binary = request["binary"]
+        elif request["type"] == "READ":
+            data = bytes(self.memory[request["address"]:request["address"] + request["size"]])
+            return {"type": "READ_RESPONSE", "value": base64.b64encode(data).decode()}
+        return {"type": {"PING": "PONG"}.get(request["type"], request["type"] + "_RESPONSE")}
+
+    def answer(self, message: typing.Any) -> bytes:
+        if isinstance(message, dict):
+            response: typing.Any = {"id": message["id"], "responses": [self.handle(r) for r in message["requests"]]}
+        else:
+            response = [self.handle(request) for request in message]
+        return self.push_updates() + json.dumps(response).encode() + b"\n"
+
+    async def serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        held: typing.List[typing.Any] = []
+        while line := await reader.readline():
+            self.received += 1
+            held.append(json.loads(line))
+            if len(held) >= self.hold:
+                writer.write(b"".join(self.answer(message) for message in reversed(held)))
+                held.clear()
+                await writer.drain()
+        writer.close()
+
+
+class TestBizHawkWatches(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.connector = FakeConnector()
+        self.server = await asyncio.start_server(self.connector.serve, "127.0.0.1", 0)
+        self.ctx = BizHawkContext()
+        self.ctx.streams = await asyncio.open_connection(*self.server.sockets[0].getsockname()[:2])
+
+    async def asyncTearDown(self) -> None:
+        self.ctx.streams[1].close()
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def check_watches(self) -> None:
+        first, second = await watch(self.ctx, [(0x10, 4, "RAM"), (0x80, 2, "RAM")])
+        self.assertEqual(get_watched(self.ctx, [first, second]), [None, None])
+        await sync_watches(self.ctx)
+        await ping(self.ctx)
+        self.assertEqual(get_watched(self.ctx, [first, second]), [bytes(range(0x10, 0x14)), b"\x80\x81"])
+
+        self.connector.memory[0x81] = 0
+        await ping(self.ctx)
+        self.assertEqual(get_watched(self.ctx, [second]), [b"\x80\x00"])
+
+        third, = await watch(self.ctx, [(0, 1, "RAM")])
+        await ping(self.ctx)
+        self.assertEqual(get_watched(self.ctx, [third]), [b"\x00"])
+
+        await unwatch(self.ctx, [first])
+        self.assertNotIn(first, self.connector.watches)
+        self.assertEqual(get_watched(self.ctx, [first]), [None])
+
+    async def test_json_watches(self) -> None:
+        self.ctx.binary_watch_updates = False
+        await self.check_watches()
+
+    async def test_binary_watches(self) -> None:
+        await self.check_watches()
+        self.assertTrue(self.connector.binary)
+
+
+class TestBizHawkPipelining(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.connector = FakeConnector()
+        self.server = await asyncio.start_server(self.connector.serve, "127.0.0.1", 0)
+        self.ctx = BizHawkContext()
+        self.ctx.streams = await asyncio.open_connection(*self.server.sockets[0].getsockname()[:2])
+
+    async def asyncTearDown(self) -> None:
+        if self.ctx.streams:
+            self.ctx.streams[1].close()
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def test_out_of_order_responses(self) -> None:
+        """Batches sent before the first one is answered get their own responses."""
+        self.connector.hold = 4
+        results = await asyncio.gather(*(read(self.ctx, [(address, 2, "RAM")]) for address in range(0, 40, 10)))
+        self.assertEqual(results, [[bytes([address, address + 1])] for address in range(0, 40, 10)])
+        self.assertEqual(self.ctx._pending, {})
+
+    async def test_timeout(self) -> None:
+        """A request without response fails and closes the connection, instead of waiting forever."""
+        self.connector.hold = 2
+        self.ctx.request_timeout = 0.1
+        with self.assertRaises(RequestFailedError):
+            await ping(self.ctx)
+        self.assertIsNone(self.ctx.streams)
+
+    async def test_max_requests_in_flight(self) -> None:
+        """A limit set after creating the context applies to the requests of the connection."""
+        self.ctx.max_requests_in_flight = 2
+        self.connector.hold = 3
+        tasks = [asyncio.create_task(ping(self.ctx)) for _ in range(3)]
+        await asyncio.sleep(0.1)
+        self.assertEqual(self.connector.received, 2)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
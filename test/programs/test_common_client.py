@@ -1,7 +1,11 @@
+import asyncio
+import os
+import tempfile
 import unittest
 
 import NetUtils
 from CommonClient import CommonContext
+from datapackage_cache import load_packed, write_packed
 
 
 class TestCommonContext(unittest.IsolatedAsyncioTestCase):
@@ -93,3 +97,65 @@ class TestCommonContext(unittest.IsolatedAsyncioTestCase):
         assert self.ctx.item_names.lookup_in_slot(-1, 3) == "Nothing"
         assert self.ctx.item_names.lookup_in_game(-1, "__TestGame1") == "Nothing"
         assert self.ctx.item_names.lookup_in_game(-1, "__TestGame2") == "Nothing"
+
+    async def test_packed_data_package(self):
+        # mapped files stay open on Windows
+        with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as directory:
+            path = os.path.join(directory, "packed.bin")
+            write_packed(path, {"checksum": "packed", "location_name_to_id": {"Test Location 4": 2 ** 54 + 4},
+                                "item_name_to_id": {"Test Item 4": 2 ** 54 + 4}})
+            self.ctx.update_game(load_packed(path), "__TestGame3")
+            assert self.ctx.item_names["__TestGame3"][2 ** 54 + 4] == "Test Item 4"
+            assert self.ctx.item_names["__TestGame3"][2 ** 54 + 1] == f"Unknown item (ID: {2 ** 54 + 1})"
+            assert self.ctx.item_names["__TestGame3"][-1] == "Nothing"
+            assert self.ctx.location_names["__TestGame3"][2 ** 54 + 4] == "Test Location 4"
+            assert self.ctx.checksums["__TestGame3"] == "packed"
+
+
+class FakeSocket:
+    open = True
+    closed = False
+
+    def __init__(self) -> None:
+        self.sent: list[list[dict]] = []
+
+    async def send(self, data: str) -> None:
+        self.sent.append(NetUtils.decode(data))
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class TestOutbox(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.ctx = CommonContext()
+        self.ctx.outbox_delay = 0.01
+        self.socket = FakeSocket()
+        self.ctx.server = NetUtils.Endpoint(self.socket)
+        self.ctx.missing_locations = set(range(1, 100))
+        self.ctx.checked_locations = {100}
+
+    async def test_coalesced_checks(self):
+        """Checks and scouts sent shortly after each other go out in one message."""
+        for location in (1, 2, 2, 3):
+            await self.ctx.check_locations([location])
+        await self.ctx.send_msgs([{"cmd": "LocationChecks", "locations": [4, 100]}])
+        await self.ctx.send_msgs([{"cmd": "LocationScouts", "locations": [5], "create_as_hint": 0}])
+        await self.ctx.send_msgs([{"cmd": "LocationScouts", "locations": [6]}])
+        self.assertEqual(self.socket.sent, [])
+        await asyncio.sleep(0.05)
+        self.assertEqual(self.socket.sent, [[{"cmd": "LocationChecks", "locations": [1, 2, 3, 4]},
+                                             {"cmd": "LocationScouts", "locations": [5, 6], "create_as_hint": 0}]])
+
+    async def test_order_kept(self):
+        """Other messages send held back checks first."""
+        await self.ctx.check_locations([1])
+        await self.ctx.send_msgs([{"cmd": "StatusUpdate", "status": 30}])
+        self.assertEqual(self.socket.sent, [[{"cmd": "LocationChecks", "locations": [1]},
+                                             {"cmd": "StatusUpdate", "status": 30}]])
+
+    async def test_flush_on_disconnect(self):
+        await self.ctx.check_locations([7])
+        await self.ctx.disconnect()
+        self.assertEqual(self.socket.sent, [[{"cmd": "LocationChecks", "locations": [7]}]])
+        self.assertTrue(self.socket.closed)
@@ -72,6 +72,34 @@ class TestGenerateMain(unittest.TestCase):
 
         self.assertOutput(self.output_tempdir.name)
 
+    def test_generate_progress(self):
+        sys.argv = [sys.argv[0], '--seed', '0',
+                    '--player_files_path', str(self.abs_input_dir),
+                    '--outputpath', self.output_tempdir.name]
+        reports = []
+        Main.main(*Generate.main(), progress=lambda stage, done, total: reports.append((stage, done, total)))
+
+        stages = [stage for stage, done, total in reports]
+        self.assertLess(stages.index("create_regions"), stages.index("fill"))
+        self.assertLess(stages.index("fill"), stages.index("output"))
+        self.assertEqual(stages[-1], "archive")
+        done, total = [(done, total) for stage, done, total in reports if stage == "output"][-1]
+        self.assertEqual(done, total)
+        self.assertOutput(self.output_tempdir.name)
+
+    def test_generate_progress_abort(self):
+        sys.argv = [sys.argv[0], '--seed', '0',
+                    '--player_files_path', str(self.abs_input_dir),
+                    '--outputpath', self.output_tempdir.name]
+
+        def progress(stage: str, done: int, total: int) -> None:
+            if stage == "fill":
+                raise InterruptedError(stage)
+
+        with self.assertRaises(InterruptedError):
+            Main.main(*Generate.main(), progress=progress)
+        self.assertFalse(list(Path(self.output_tempdir.name).glob('*.zip')))
+
     def test_generate_yaml(self):
         # override host.yaml
         from settings import get_settings
@@ -137,3 +165,26 @@ class TestGenerateWeights(TestGenerateMain):
                     result, getattr(namespace, option_name)[player].value,
                     "Generated results from weights file did not match expected value."
                 )
+
+    def test_generate_parallel_roll(self):
+        """Rolling options in worker processes gives the same results regardless of the amount of processes."""
+        from settings import get_settings
+        from Utils import user_path, local_path
+        settings = get_settings()
+        settings.generator.player_files_path = settings.generator.PlayerFilesPath(self.yaml_input_dir)
+        settings.generator.players = 5
+        settings._filename = None
+        user_path_backup = user_path.cached_path
+        user_path.cached_path = local_path()
+        try:
+            results = []
+            for processes in ("2", "3"):
+                sys.argv = [sys.argv[0], "--seed", "1", "--roll_processes", processes]
+                namespace, seed = Generate.main()
+                results.append({player: (namespace.accessibility[player].value,
+                                         namespace.progression_balancing[player].value)
+                                for player in range(1, 6)})
+        finally:
+            user_path.cached_path = user_path_backup
+
+        self.assertEqual(results[0], results[1])
@@ -0,0 +1,106 @@
+import typing
+import unittest
+from unittest import mock
+
+import websockets
+
+import headless_client
+from NetUtils import NetworkItem, NetworkPlayer, NetworkSlot, SlotType, decode, encode
+from headless_client import ConnectionRefused, HeadlessClient
+
+
+class FakeServer:
+    """Answers the packets of a client like a room with two players would."""
+
+    def __init__(self) -> None:
+        self.received: typing.List[typing.Dict[str, typing.Any]] = []
+        self.packages: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+        """Data packages offered for download, by game"""
+
+    async def serve(self, socket: websockets.WebSocketServerProtocol) -> None:
+        checksums = {game: package["checksum"] for game, package in self.packages.items()}
+        await socket.send(encode([{"cmd": "RoomInfo", "games": ["__TestGame"], "datapackage_checksums": checksums,
+                                   "password": False, "seed_name": "seed"}]))
+        async for data in socket:
+            for msg in decode(data):
+                self.received.append(msg)
+                for response in self.answer(msg):
+                    await socket.send(encode([response]))
+
+    def answer(self, msg: typing.Dict[str, typing.Any]) -> typing.List[typing.Dict[str, typing.Any]]:
+        if msg["cmd"] == "Connect":
+            if msg["name"] != "Player1":
+                return [{"cmd": "ConnectionRefused", "errors": ["InvalidSlot"]}]
+            return [{"cmd": "Connected", "team": 0, "slot": 1, "missing_locations": [1, 2], "checked_locations": [3],
+                     "players": [NetworkPlayer(0, 1, "Alias", "Player1"), NetworkPlayer(0, 2, "Other", "Player2")],
+                     "slot_info": {"1": NetworkSlot("Player1", "__TestGame", SlotType.player)}, "hint_points": 5},
+                    {"cmd": "ReceivedItems", "index": 0, "items": [NetworkItem(10, 3, 2, 0)]}]
+        if msg["cmd"] == "LocationChecks":
+            return [{"cmd": "RoomUpdate", "checked_locations": msg["locations"]}]
+        if msg["cmd"] == "GetDataPackage":
+            return [{"cmd": "DataPackage", "data": {"games": {game: self.packages[game] for game in msg["games"]}}}]
+        if msg["cmd"] == "Get":
+            return [{**msg, "cmd": "Retrieved", "keys": {key: len(key) for key in msg["keys"]}}]
+        return []
+
+
+class TestHeadlessClient(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.server = FakeServer()
+        self.websocket_server = await websockets.serve(self.server.serve, "127.0.0.1", 0)
+        self.address = "127.0.0.1:%d" % self.websocket_server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self) -> None:
+        self.websocket_server.close()
+        await self.websocket_server.wait_closed()
+
+    async def test_session(self) -> None:
+        client = HeadlessClient(self.address, "Player1", want_data_package=False)
+        updates: typing.List[typing.Dict[str, typing.Any]] = []
+        client.on("RoomUpdate", lambda _, args: updates.append(args))
+        await client.connect()
+        self.assertEqual((client.team, client.slot, client.player_names[2]), (0, 1, "Other"))
+        self.assertEqual(client.missing_locations, {1, 2})
+
+        await client.check_locations([1])
+        self.assertEqual(await client.get(["key", "other key"]), {"key": 3, "other key": 9})
+        self.assertEqual(updates, [{"cmd": "RoomUpdate", "checked_locations": [1]}])
+        self.assertEqual((client.missing_locations, client.checked_locations), ({2}, {1, 3}))
+        self.assertEqual(client.items_received, [NetworkItem(10, 3, 2, 0)])
+        await client.close()
+        await client.run()
+
+    async def test_refused(self) -> None:
+        client = HeadlessClient(self.address, "Nobody", want_data_package=False)
+        with self.assertRaises(ConnectionRefused) as context:
+            await client.connect()
+        self.assertEqual(context.exception.errors, ["InvalidSlot"])
+
+    async def test_names(self) -> None:
+        headless_client._packages["__TestGame", ""] = {"item_name_to_id": {"Sword": 10},
+                                                      "location_name_to_id": {"Chest": 3}}
+        self.addCleanup(headless_client._packages.pop, ("__TestGame", ""))
+        client = HeadlessClient(self.address, "Player1", want_data_package=False)
+        await client.connect()
+        self.assertEqual(client.item_name(10), "Sword")
+        self.assertEqual(client.location_name(3, "__TestGame"), "Chest")
+        self.assertEqual(client.item_name(11), "Unknown item (ID: 11)")
+        await client.close()
+
+    async def test_downloaded_names(self) -> None:
+        """Names of downloaded data packages are looked up by id without reversing the package each time."""
+        self.server.packages["__TestGame"] = {"item_name_to_id": {"Sword": 10}, "location_name_to_id": {"Chest": 3},
+                                              "checksum": "downloaded"}
+        self.addCleanup(headless_client._packages.pop, ("__TestGame", "downloaded"), None)
+        with mock.patch("Utils.load_data_package_for_checksum", return_value={}), \
+                mock.patch("Utils.store_data_package_for_checksum"):
+            client = HeadlessClient(self.address, "Player1")
+            await client.connect()
+        self.assertEqual(self.server.received[0], {"cmd": "GetDataPackage", "games": ["__TestGame"]})
+        self.assertEqual(client.item_name(10), "Sword")
+        reversed_items = headless_client._packages["__TestGame", "downloaded"]["_item_name_to_id_reversed"]
+        self.assertEqual(client.item_name(11), "Unknown item (ID: 11)")
+        self.assertIs(headless_client._packages["__TestGame", "downloaded"]["_item_name_to_id_reversed"],
+                      reversed_items)
+        self.assertEqual(client.location_name(3), "Chest")
+        await client.close()
@@ -0,0 +1,78 @@
+import asyncio
+import json
+import typing
+import unittest
+
+from SNIClient import SNESState, SNIContext, SnesSnapshot, snes_read, snes_read_multi, snes_write
+
+
+class FakeSNI:
+    """Answers GetAddress requests from a memory image and applies PutAddress requests to it."""
+    open = True
+    closed = False
+
+    def __init__(self, ctx: SNIContext) -> None:
+        self.ctx = ctx
+        self.memory = bytearray(range(256)) * 4
+        self.requests: typing.List[typing.Dict[str, typing.Any]] = []
+        self.pending_write: typing.Optional[typing.Tuple[int, int]] = None
+
+    async def send(self, message: typing.Union[str, bytes]) -> None:
+        if isinstance(message, bytes):
+            address, size = typing.cast(typing.Tuple[int, int], self.pending_write)
+            self.memory[address:address + size] = message
+            return
+        request = json.loads(message)
+        self.requests.append(request)
+        operands = [int(operand, 16) for operand in request["Operands"]]
+        pairs = list(zip(operands[::2], operands[1::2]))
+        if request["Opcode"] == "GetAddress":
+            for address, size in pairs:
+                self.ctx.snes_recv_queue.put_nowait(bytes(self.memory[address:address + size]))
+        else:
+            self.pending_write = pairs[0]
+
+
+class TestSNIReads(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.ctx = SNIContext("localhost:23074", "", "")
+        self.sni = FakeSNI(self.ctx)
+        self.ctx.snes_socket = self.sni  # type: ignore[assignment]
+        self.ctx.snes_state = SNESState.SNES_ATTACHED
+
+    async def test_multi_read(self) -> None:
+        """Several regions are read with a single request."""
+        data = await snes_read_multi(self.ctx, [(0x10, 2), (0x200, 3), (0x20, 1)])
+        self.assertEqual(data, [bytes([0x10, 0x11]), bytes([0, 1, 2]), bytes([0x20])])
+        self.assertEqual(len(self.sni.requests), 1)
+        self.assertEqual(self.sni.requests[0]["Operands"], ["10", "2", "200", "3", "20", "1"])
+
+    async def test_snapshot(self) -> None:
+        """Cached reads of a tick are served from its snapshot until they are written to."""
+        self.ctx.snes_snapshot = snapshot = SnesSnapshot()
+        self.assertEqual(await snes_read(self.ctx, 0x10, 16, cached=True), bytes(range(0x10, 0x20)))
+        self.assertEqual(await snes_read(self.ctx, 0x14, 4, cached=True), bytes(range(0x14, 0x18)))
+        data = await snes_read_multi(self.ctx, [(0x18, 2), (0x40, 1)], cached=True)
+        self.assertEqual(data, [bytes([0x18, 0x19]), bytes([0x40])])
+        self.assertEqual(self.sni.requests[-1]["Operands"], ["40", "1"], "cached region was requested again")
+        self.assertEqual((snapshot.round_trips, snapshot.cache_hits), (2, 2))
+
+        await snes_write(self.ctx, [(0x12, b"\xff")])
+        self.assertEqual(await snes_read(self.ctx, 0x12, 1, cached=True), b"\xff")
+        self.assertEqual(snapshot.round_trips, 3)
+
+        self.ctx.snes_snapshot = None
+        await snes_read(self.ctx, 0x40, 1, cached=True)
+        self.assertEqual(len(self.sni.requests), 5, "read without snapshot was cached")
+
+    async def test_read_after_sleep(self) -> None:
+        """Reads of a tick that waits for memory to change, like deathlink does, see the changed memory."""
+        self.ctx.snes_snapshot = snapshot = SnesSnapshot()
+        self.assertEqual(await snes_read(self.ctx, 0x30, 1), b"\x30")
+
+        async def game() -> None:
+            self.sni.memory[0x30] = 0
+
+        await asyncio.gather(asyncio.sleep(0.01), game())
+        self.assertEqual(await snes_read(self.ctx, 0x30, 1), b"\x00")
+        self.assertEqual((snapshot.round_trips, snapshot.cache_hits), (2, 0))
@@ -0,0 +1,52 @@
+import os
+import tempfile
+import unittest
+
+from datapackage_cache import load_packed, write_packed
+
+
+class TestPackedDataPackage(unittest.TestCase):
+    package = {
+        "checksum": "0123abcd",
+        "item_name_to_id": {"Sword": 3, "Bow": 2 ** 53, "Poké Ball": 1, "Arrow": -5},
+        "location_name_to_id": {},
+    }
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory(ignore_cleanup_errors=True)  # mapped files stay open on Windows
+        self.path = os.path.join(self.directory.name, "0123abcd.bin")
+        write_packed(self.path, self.package)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_lookups(self) -> None:
+        loaded = load_packed(self.path)
+        assert loaded is not None
+        self.assertEqual(loaded["checksum"], "0123abcd")
+        items = loaded["item_name_to_id"]
+        self.assertEqual(dict(items), self.package["item_name_to_id"])
+        self.assertEqual(items["Poké Ball"], 1)
+        self.assertNotIn("Shield", items)
+        self.assertEqual(items.id_to_name[2 ** 53], "Bow")
+        self.assertEqual(items.id_to_name.get(4), None)
+        self.assertEqual(list(items.id_to_name), [-5, 1, 3, 2 ** 53])
+        self.assertEqual(len(loaded["location_name_to_id"]), 0)
+
+    def test_missing(self) -> None:
+        self.assertIsNone(load_packed(os.path.join(self.directory.name, "missing.bin")))
+
+    def test_store_keeps_json(self) -> None:
+        """Verify that stored data packages are still written as JSON for older versions sharing the cache."""
+        import json
+        from unittest import mock
+        import Utils
+
+        with mock.patch.object(Utils, "cache_path", lambda *path: os.path.join(self.directory.name, *path)):
+            Utils.store_data_package_for_checksum("Test Game", self.package)
+            game_folder = os.path.join(self.directory.name, "datapackage", "Test Game")
+            with open(os.path.join(game_folder, "0123abcd.json"), encoding="utf-8-sig") as f:
+                self.assertEqual(json.load(f), self.package)
+            self.assertTrue(os.path.exists(os.path.join(game_folder, "0123abcd.bin")))
+            loaded = Utils.load_data_package_for_checksum("Test Game", "0123abcd")
+            self.assertEqual(dict(loaded["item_name_to_id"]), self.package["item_name_to_id"])
@@ -1,10 +1,13 @@
 # Tests that yaml wrappers in Utils.py do what they should
 
+import os
 import unittest
+from tempfile import TemporaryDirectory
 from typing import cast, Any, ClassVar, Dict
 
+import Utils
 from Utils import dump, Dumper  # type: ignore[attr-defined]
-from Utils import parse_yaml, parse_yamls, unsafe_parse_yaml
+from Utils import parse_yaml, parse_yamls, parse_yamls_cached, unsafe_parse_yaml
 
 
 class AClass:
@@ -66,3 +69,44 @@ class TestYaml(unittest.TestCase):
             parse_yaml(s)
         with self.assertRaises(Exception):
             next(parse_yamls(s))
+
+    def test_cached_multi_parse(self) -> None:
+        s = "a: 1\n---\nb: [2]\n"
+        first = parse_yamls_cached(s)
+        self.assertEqual(tuple(parse_yamls(s)), first)
+        first[1]["b"].append(3)
+        self.assertEqual(({"a": 1}, {"b": [2]}), parse_yamls_cached(s), "cached documents were modified")
+        self.assertEqual(({"a": 1}, {"b": [2]}), parse_yamls_cached(s.encode()))
+        with self.assertRaises(Exception):
+            parse_yamls_cached(self.unsafe_str)
+        with self.assertRaises(Exception):
+            parse_yamls_cached("a: 1\na: 2\n")
+
+    def test_cache_size_bound(self) -> None:
+        """The least recently used parsed yamls are removed once the disk cache exceeds its size."""
+        with TemporaryDirectory(ignore_cleanup_errors=True) as directory:
+            for n in range(4):
+                path = os.path.join(directory, f"{n}.pickle")
+                with open(path, "wb") as f:
+                    f.write(bytes(100))
+                os.utime(path, (n, n))
+            old_size = Utils.yaml_cache_size
+            Utils.yaml_cache_size = 250
+            try:
+                Utils._prune_yaml_cache(directory)
+            finally:
+                Utils.yaml_cache_size = old_size
+            self.assertEqual(sorted(os.listdir(directory)), ["2.pickle", "3.pickle"])
+
+    def test_memory_cache_size_bound(self) -> None:
+        """The least recently used parsed yamls are removed once the memory cache exceeds its size."""
+        old_size = Utils.yaml_memory_cache_size
+        Utils.yaml_memory_cache_size = 0
+        try:
+            parse_yamls_cached("memory_cache_bound: 1\n")
+            self.assertFalse(Utils._yaml_memory_cache)
+            self.assertEqual(Utils._yaml_memory_cache_bytes, 0)
+        finally:
+            Utils.yaml_memory_cache_size = old_size
+        self.assertEqual(({"memory_cache_bound": 1},), parse_yamls_cached("memory_cache_bound: 1\n"))
+        self.assertLessEqual(Utils._yaml_memory_cache_bytes, Utils.yaml_memory_cache_size)
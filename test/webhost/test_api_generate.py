@@ -43,3 +43,137 @@ class TestAPIGenerate(TestBase):
         json_data = response.get_json()
         self.assertTrue(json_data["text"].startswith("Generation of seed "))
         self.assertTrue(json_data["text"].endswith(" started successfully."))
+
+    def test_generation_job(self) -> None:
+        from uuid import UUID
+        from pony.orm import db_session
+        from WebHostLib import to_url
+        from WebHostLib.models import Generation, STATE_ERROR, STATE_QUEUED
+
+        options = {
+            "Tester1": {"game": "Archipelago", "name": "Tester1", "Archipelago": {}},
+            "Tester2": {"game": "Archipelago", "name": "Tester2", "Archipelago": {}},
+        }
+        response = self.client.post(
+            "/api/generate",
+            data=json.dumps({"weights": options}),
+            content_type='application/json'
+        )
+        seed_id = UUID(response.get_json()["detail"])
+        with db_session:
+            generation = Generation.get(id=seed_id)
+            self.assertEqual(generation.state, STATE_QUEUED)
+            self.assertEqual(generation.job.cost, 3, "expected 2 players and 1 game")
+
+        response = self.client.get(f"/api/status/{to_url(seed_id)}")
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.get_json()["text"], "Generation queued")
+
+        response = self.client.post(f"/cancel/{to_url(seed_id)}")
+        self.assertEqual(response.status_code, 302)
+        with db_session:
+            generation = Generation.get(id=seed_id)
+            self.assertEqual(generation.state, STATE_ERROR)
+            self.assertIn("cancelled", generation.meta)
+        self.assertEqual(self.client.get(f"/api/status/{to_url(seed_id)}").status_code, 500)
+
+    def test_generation_progress(self) -> None:
+        """Progress reported by Main is shown by the status api, a cancelled job aborts at the next report."""
+        from uuid import UUID
+        from pony.orm import db_session
+        from WebHostLib import to_url
+        from WebHostLib.generate import GenerationCancelled, GenerationProgress
+        from WebHostLib.models import Generation, STATE_STARTED
+
+        options = {"Tester1": {"game": "Archipelago", "name": "Tester1", "Archipelago": {}}}
+        response = self.client.post("/api/generate", data=json.dumps({"weights": options}),
+                                    content_type='application/json')
+        seed_id = UUID(response.get_json()["detail"])
+        with db_session:
+            Generation.get(id=seed_id).state = STATE_STARTED
+        response = self.client.get(f"/api/status/{to_url(seed_id)}")
+        self.assertEqual(response.get_json(), {"text": "Generation running", "progress": None})
+
+        progress = GenerationProgress(seed_id)
+        progress("fill", 0, 20)
+        progress("fill", 10, 20)  # same stage within the update interval, not stored
+        self.assertEqual(self.client.get(f"/api/status/{to_url(seed_id)}").get_json()["progress"],
+                         {"stage": "fill", "done": 0, "total": 20})
+        progress("output", 3, 4)
+        self.assertEqual(self.client.get(f"/api/status/{to_url(seed_id)}").get_json()["progress"],
+                         {"stage": "output", "done": 3, "total": 4})
+
+        self.assertEqual(self.client.post(f"/cancel/{to_url(seed_id)}").status_code, 302)
+        with self.assertRaises(GenerationCancelled):
+            progress("archive", 0, 0)
+
+    def test_generation_job_order(self) -> None:
+        from datetime import datetime, timedelta
+        from types import SimpleNamespace
+        from WebHostLib.autolauncher import order_generation_jobs
+
+        now = datetime(2024, 1, 1)
+        small = SimpleNamespace(cost=3, queued=now)
+        large = SimpleNamespace(cost=50, queued=now)
+        self.assertEqual(order_generation_jobs([large, small], now), [small, large])
+        large.queued = now - timedelta(hours=1)
+        self.assertEqual(order_generation_jobs([small, large], now), [large, small], "large job did not age")
+
+    def test_queue_position(self) -> None:
+        """The reported queue position follows the order autogen starts jobs in, including their waiting time."""
+        from datetime import datetime, timedelta
+        from uuid import uuid4
+        from pony.orm import db_session
+        from WebHostLib.api.generate import get_queue_position
+        from WebHostLib.models import Generation, GenerationJob, STATE_QUEUED
+
+        with db_session:
+            small = Generation(options=b"", meta="{}", state=STATE_QUEUED, owner=uuid4())
+            GenerationJob(generation=small, cost=3)
+            large = Generation(options=b"", meta="{}", state=STATE_QUEUED, owner=uuid4())
+            GenerationJob(generation=large, cost=50)
+            # other tests may leave queued generations behind, so only their relative position is checked
+            self.assertLess(get_queue_position(small), get_queue_position(large))
+            large.job.queued = datetime.utcnow() - timedelta(hours=1)
+            self.assertLess(get_queue_position(large), get_queue_position(small), "waiting time of large job ignored")
+            small.delete()
+            large.delete()
+
+    def test_lost_generation(self) -> None:
+        """Generations whose worker died free their generator after a while and are marked as failed."""
+        from uuid import uuid4
+        from pony.orm import db_session
+        from WebHostLib.autolauncher import RunningGenerations, fail_lost_generation
+        from WebHostLib.models import Generation, STATE_ERROR, STATE_STARTED
+
+        running = RunningGenerations()
+        lost, finished, recent = uuid4(), uuid4(), uuid4()
+        running.add(lost, 50, 100)
+        running.add(finished, 3, 100)
+        running.add(recent, 3, 700)
+        running.finish(finished)
+        self.assertEqual(running.count_above(30), 1)
+        self.assertEqual(running.expire(600), [lost])
+        self.assertEqual(len(running), 1)
+
+        with db_session:
+            Generation(id=lost, options=b"", meta=json.dumps({"race": False}), state=STATE_STARTED, owner=uuid4())
+        with db_session:
+            fail_lost_generation(lost)
+        with db_session:
+            generation = Generation.get(id=lost)
+            self.assertEqual(generation.state, STATE_ERROR)
+            self.assertIn("stopped unexpectedly", json.loads(generation.meta)["error"])
+            generation.delete()
+
+    def test_lost_generation_without_job_time(self) -> None:
+        """Without a JOB_TIME, generations can run for any time and are never counted as lost."""
+        from uuid import uuid4
+        from WebHostLib.autolauncher import RunningGenerations, reap_lost_generations
+
+        running = RunningGenerations()
+        running.add(uuid4(), 3, 100)
+        reap_lost_generations(running, None, 100000)
+        self.assertEqual(len(running), 1)
+        reap_lost_generations(running, 600, 100000)
+        self.assertEqual(len(running), 0)
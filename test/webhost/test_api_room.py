@@ -0,0 +1,40 @@
+import io
+import zipfile
+from pathlib import Path
+from uuid import uuid4
+
+from flask import url_for
+
+from . import TestBase
+
+
+class TestAPIRoom(TestBase):
+    def test_room_status_downloads(self) -> None:
+        """Verify that the room status lists the patch files of an uploaded seed."""
+        from pony.orm import db_session
+        from WebHostLib.models import Room
+        from WebHostLib.upload import upload_zip_to_db
+
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as zfile:
+            zfile.write(Path(__file__).parent / "data" / "One_Archipelago.archipelago", "AP_1.archipelago")
+            zfile.writestr("AP_1_P1_Player.bin", b"patch file")
+
+        owner = uuid4()
+        with self.app.app_context(), self.app.test_request_context():
+            with db_session, zipfile.ZipFile(buffer) as zfile:
+                seed = upload_zip_to_db(zfile, owner)
+                room = Room(seed=seed, owner=owner, tracker=uuid4())
+                room_id, slot = room.id, next(iter(seed.slots))
+                self.assertIsNone(slot.data)
+                expected = [{"slot": 1, "download": url_for("download_slot_file", room_id=room_id, player_id=1)}]
+
+            response = self.client.get(url_for("api.room_info", room_id=room_id))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.get_json()["downloads"], expected)
+
+        with db_session:
+            room = Room.get(id=room_id)
+            seed = room.seed
+            room.delete()
+            seed.delete()
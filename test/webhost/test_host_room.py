@@ -191,3 +191,146 @@ class TestHostFakeRoom(TestBase):
         with db_session:
             commands = select(command for command in Command if command.room.id == self.room_id)  # type: ignore
             self.assertNotIn("/help", (command.commandtext for command in commands))
+
+    def test_room_launch_request(self) -> None:
+        """Verify that creating and revisiting a room queues it for autohost, on the least loaded hoster."""
+        import datetime
+        from pony.orm import db_session
+        from WebHostLib import app
+        from WebHostLib.autolauncher import MultiworldInstance, start_room
+        from WebHostLib.models import Room, RoomLaunch
+
+        with db_session:
+            seed_id = Room.get(id=self.room_id).seed.id
+            self.assertIsNone(RoomLaunch.get(room=self.room_id))
+        with self.app.app_context(), self.app.test_request_context():
+            response = self.client.get(url_for("new_room", seed=seed_id))
+            self.assertEqual(response.status_code, 302)
+        with db_session:
+            new_room = Room.select(lambda room: room.seed.id == seed_id and room.id != self.room_id).first()
+            self.assertIsNotNone(new_room.launch)
+            new_room_id = new_room.id
+            RoomLaunch.get(room=new_room).delete()
+            # a room that timed out is queued again when visited
+            Room.get(id=self.room_id).last_activity = datetime.datetime.utcnow() - datetime.timedelta(days=1)
+        with self.app.app_context(), self.app.test_request_context():
+            self.client.get(url_for("host_room", room=self.room_id))
+        with db_session:
+            self.assertIsNotNone(RoomLaunch.get(room=self.room_id))
+
+            hosters = [MultiworldInstance(app.config, x) for x in range(2)]
+            hosters[0].start_room(uuid4(), 3)
+            start_room(hosters, Room.get(id=self.room_id))
+            self.assertIn(self.room_id, hosters[1].room_loads)
+            start_room(hosters, Room.get(id=self.room_id))
+            self.assertNotIn(self.room_id, hosters[0].room_loads)
+            Room.get(id=new_room_id).delete()
+
+    def test_command_dispatch(self) -> None:
+        """Verify that commands of all hosted rooms are fetched together and handed to their room."""
+        from types import SimpleNamespace
+        from pony.orm import db_session
+        from WebHostLib.customserver import CommandDispatcher
+        from WebHostLib.models import Command, Room
+
+        received = []
+
+        class Loop:
+            @staticmethod
+            def call_soon_threadsafe(callback, *args):
+                callback(*args)
+
+        ctx = SimpleNamespace(main_loop=Loop, db_command_processor=received.append)
+        with db_session:
+            room = Room.get(id=self.room_id)
+            Command(room=room, commandtext="/save")
+            Command(room=room, commandtext="/exit")
+        CommandDispatcher.dispatch({self.room_id: ctx, uuid4(): ctx})  # type: ignore[dict-item]
+        self.assertEqual(received, ["/save", "/exit"])
+        with db_session:
+            self.assertFalse(Room.get(id=self.room_id).commands)
+
+    def test_load_lazy_world(self) -> None:
+        """Verify that a room of a game that is missing from the static server data loads its world on its own."""
+        import asyncio
+        import logging
+        from pathlib import Path
+        from unittest import mock
+        from pony.orm import db_session
+        import worlds
+        from WebHostLib.customserver import WebHostContext, get_static_server_data
+        from WebHostLib.models import Room
+
+        with db_session:
+            data = (Path(__file__).parent / "data" / "One_Archipelago.archipelago").read_bytes()
+            Room.get(id=self.room_id).seed.multidata = data
+        # as if the room's game was deferred by lazy world loading when the room hoster started
+        static_server_data = get_static_server_data()
+        for value in static_server_data.values():
+            del value["Archipelago"]
+        static_games = {key: set(value) for key, value in static_server_data.items()}
+
+        async def load() -> WebHostContext:
+            ctx = WebHostContext(static_server_data, logging.getLogger("test"))
+            ctx.load(self.room_id)
+            return ctx
+
+        with mock.patch.object(worlds, "load_worlds") as load_worlds:
+            ctx = asyncio.run(load())
+        load_worlds.assert_called_once_with({"Archipelago"})
+        world = worlds.AutoWorldRegister.world_types["Archipelago"]
+        self.assertIn("Archipelago", ctx.item_name_groups)
+        self.assertIs(ctx.non_hintable_names["Archipelago"], world.hint_blacklist)
+        self.assertNotIn("item_name_groups", ctx.gamespackage["Archipelago"])
+        self.assertEqual({key: set(value) for key, value in static_server_data.items()}, static_games,
+                         "shared static server data was modified")
+
+    def test_feed_published_off_loop(self) -> None:
+        """Verify that buffered tracker events are published outside the room's event loop thread."""
+        import asyncio
+        import logging
+        import threading
+        from unittest import mock
+        from WebHostLib.customserver import WebHostContext, get_static_server_data
+
+        published = []
+
+        def publish(room_id, events) -> int:
+            published.append((threading.current_thread(), events))
+            return 1
+
+        async def run() -> threading.Thread:
+            ctx = WebHostContext(get_static_server_data(), logging.getLogger("test"))
+            ctx.room_id = self.room_id
+            ctx.feed = mock.Mock(publish=mock.Mock(side_effect=publish))
+            ctx.feed_interval = 0
+            ctx.add_feed_event({"type": "status", "team": 0, "player": 1, "status": 10})
+            ctx.add_feed_event({"type": "status", "team": 0, "player": 1, "status": 20})
+            for _ in range(100):
+                if published:
+                    break
+                await asyncio.sleep(0.01)
+            return threading.current_thread()
+
+        loop_thread = asyncio.run(run())
+        self.assertEqual(len(published), 1)
+        thread, events = published[0]
+        self.assertIsNot(thread, loop_thread)
+        self.assertEqual(events, [{"type": "status", "team": 0, "player": 1, "status": 20}])
+
+    def test_room_launch_request_race(self) -> None:
+        """Verify that a room queued by a concurrent request in the meantime does not fail the launch request."""
+        import datetime
+        from pony.orm import db_session
+        from WebHostLib.autolauncher import request_room_launch
+        from WebHostLib.models import Room, RoomLaunch, db
+
+        with db_session:
+            room = Room.get(id=self.room_id)
+            self.assertIsNone(room.launch)
+            # queued by another request, which this session has not seen
+            db.insert("RoomLaunch", room=self.room_id.bytes, requested=datetime.datetime.utcnow())
+            request_room_launch(room)
+            self.assertIsNotNone(room.launch)
+        with db_session:
+            RoomLaunch.get(room=self.room_id).delete()
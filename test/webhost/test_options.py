@@ -0,0 +1,47 @@
+import os
+
+from worlds.AutoWorld import AutoWorldRegister
+from . import TestBase
+
+
+class TestOptionPages(TestBase):
+    def test_option_pages_cached(self) -> None:
+        """Option pages are rendered once and revalidated by their ETag."""
+        game = next(game for game, world in AutoWorldRegister.world_types.items()
+                    if not world.hidden and world.web.options_page is not False)
+        for url in (f"/games/{game}/player-options", f"/games/{game}/weighted-options",
+                    f"/games/{game}/option-presets"):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                etag = response.headers["ETag"]
+                body = response.data
+                response.close()
+
+                response = self.client.get(url)
+                self.assertEqual(response.data, body)
+                self.assertEqual(response.headers["ETag"], etag)
+                response.close()
+
+                response = self.client.get(url, headers={"If-None-Match": etag})
+                self.assertEqual(response.status_code, 304)
+                response.close()
+
+    def test_option_pages_unknown_game(self) -> None:
+        self.assertEqual(self.client.get("/games/Not a Game/player-options").status_code, 404)
+
+    def test_option_pages_kept(self) -> None:
+        """Pages of the current versions are not rendered again on startup, those of other versions are removed."""
+        from WebHostLib.options import create_option_pages, get_option_page, get_option_pages_folder
+
+        game = next(game for game, world in AutoWorldRegister.world_types.items()
+                    if not world.hidden and world.web.options_page is not False)
+        with self.app.test_request_context():
+            page = os.path.join(get_option_page(game, "player-options.html"), "player-options.html")
+        stale = os.path.join(os.path.dirname(get_option_pages_folder(game)), "0.0.0-stale")
+        os.makedirs(stale, exist_ok=True)
+        os.utime(page, (0, 0))
+
+        create_option_pages()
+        self.assertEqual(os.stat(page).st_mtime, 0, "current page was rendered again")
+        self.assertFalse(os.path.exists(stale))
@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from flask import url_for
+
+from . import TestBase
+
+
+class TestStats(TestBase):
+    def test_games_played_aggregate(self) -> None:
+        """Verify that rooms are added to the daily aggregate once and the stats page renders from it."""
+        from pony.orm import db_session
+        from WebHostLib.models import Aggregation, GamesPlayed, Room, Seed, Slot
+        from WebHostLib.stats import AGGREGATE_INTERVAL, get_db_data, update_games_played
+
+        owner = uuid4()
+        creation_time = datetime.utcnow() - timedelta(hours=1)
+        with db_session:
+            for state in Aggregation.select():
+                state.delete()
+            seed = Seed(multidata=b"", owner=owner)
+            Slot(seed=seed, player_id=1, player_name="Player1", game="Archipelago")
+            Slot(seed=seed, player_id=2, player_name="Player2", game="Archipelago")
+            Slot(seed=seed, player_id=3, player_name="Player3", game="Unknown Game")
+            Room(seed=seed, owner=owner, creation_time=creation_time)
+            seed_id = seed.id
+
+        try:
+            with db_session:
+                update_games_played()
+            with db_session:
+                update_games_played()  # nothing new yet, must not count the room again
+                self.assertEqual(2, GamesPlayed[creation_time.date(), "Archipelago"].count)
+                total_games, games_played = get_db_data({"Archipelago"})
+                self.assertEqual(2, total_games["Archipelago"])
+                self.assertEqual(1, total_games["Other"])
+                self.assertEqual(1, games_played[creation_time.date()]["Other"])
+
+            with db_session:
+                # a room created before the last update, but committed after it
+                Room(seed=Seed[seed_id], owner=owner, creation_time=creation_time)
+                Aggregation["games_played"].until -= AGGREGATE_INTERVAL
+            with db_session:
+                update_games_played()
+                self.assertEqual(4, GamesPlayed[creation_time.date(), "Archipelago"].count)
+
+            with self.app.test_request_context():
+                response = self.client.get(url_for("stats"))
+                self.assertEqual(response.status_code, 200)
+        finally:
+            with db_session:
+                seed = Seed[seed_id]
+                for room in seed.rooms:
+                    room.delete()
+                seed.slots.clear()
+                seed.delete()
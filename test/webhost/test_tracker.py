@@ -103,3 +103,104 @@ class TestTracker(TestBase):
                 self.assertEqual(response.status_code, 200)
             with self.client.open(url_for("api.tracker_slot_data", tracker=self.tracker_uuid)) as response:
                 self.assertEqual(response.status_code, 200)
+
+    def test_tracker_data_cache(self) -> None:
+        """Verify that decoded seeds are shared between requests and saves are decoded again once they change."""
+        from pony.orm import db_session
+        from WebHostLib.models import Room
+        from WebHostLib.tracker import TrackerData
+
+        with db_session:
+            room: Room = Room.get(id=self.room_id)
+            first = TrackerData(room)
+            second = TrackerData(room)
+            self.assertIs(first._multidata, second._multidata)
+            self.assertIs(first.item_id_to_name, second.item_id_to_name)
+            self.assertEqual(second.get_player_checked_locations(0, 1), set())
+
+            room.multisave = pickle.dumps({"location_checks": {(0, 1): {1}}})
+            third = TrackerData(room)
+            self.assertIs(first._multidata, third._multidata)
+            self.assertEqual(third.get_player_checked_locations(0, 1), {1})
+            self.assertIs(third._multisave, TrackerData(room)._multisave)
+
+    def test_compact_multisave(self) -> None:
+        """Verify that compact saves decode to the original save and trackers read them per slot."""
+        from pony.orm import db_session
+        from NetUtils import NetworkItem
+        from WebHostLib.models import Room
+        from WebHostLib.multisave import CompactSave, decode_save, encode_save
+        from WebHostLib.tracker import TrackerData
+
+        items = [NetworkItem(1, 2, 1, 0), NetworkItem(-5, 2 ** 40, 1, 1)]
+        save = {
+            "location_checks": {(0, 1): {1, 3, 2 ** 40}},
+            "received_items": {(0, 1, True): items, (0, 1, False): items[:1]},
+            "hints": {(0, 1): set()},
+            "feed_position": 7,
+        }
+        encoded = encode_save(save)
+        self.assertEqual(decode_save(encoded), save)
+        self.assertEqual(decode_save(pickle.dumps(save)), save)
+
+        with db_session:
+            room: Room = Room.get(id=self.room_id)
+            room.multisave = encoded
+            tracker_data = TrackerData(room)
+            self.assertIsInstance(tracker_data._multisave, CompactSave)
+            self.assertEqual(tracker_data.get_player_checked_locations(0, 1), {1, 3, 2 ** 40})
+            self.assertEqual(tracker_data.get_player_received_items(0, 1), items)
+            self.assertEqual(tracker_data.get_player_checked_locations(0, 2), set())
+            self.assertEqual(tracker_data._multisave.get("feed_position"), 7)
+
+        with self.app.test_request_context():
+            with self.client.open(url_for("api.tracker_data", tracker=self.tracker_uuid)) as response:
+                self.assertEqual(response.status_code, 200)
+
+    def test_tracker_feed(self) -> None:
+        """Verify that the tracker feed streams a snapshot and the events published after the room's save."""
+        import json
+        import tempfile
+        from pony.orm import db_session
+        from WebHostLib.feed import TrackerFeed
+        from WebHostLib.models import Room
+
+        with tempfile.TemporaryDirectory() as directory:
+            feed = TrackerFeed(os.path.join(directory, "feed.db3"))
+            old_config = {key: self.app.config[key]
+                          for key in ("TRACKER_FEED", "TRACKER_FEED_STREAM_TIME", "TRACKER_FEED_STREAMS")}
+            self.app.config.update(TRACKER_FEED=feed.path, TRACKER_FEED_STREAM_TIME=0)
+            try:
+                position = feed.publish(self.room_id, [{"type": "checks", "team": 0, "player": 1, "locations": [1]}])
+                with db_session:
+                    Room.get(id=self.room_id).multisave = pickle.dumps({"feed_position": position})
+                feed.publish(self.room_id, [{"type": "status", "team": 0, "player": 1, "status": 30}])
+                feed.publish(uuid4(), [{"type": "status", "team": 0, "player": 1, "status": 10}])
+
+                with self.app.test_request_context():
+                    response = self.client.get(url_for("api.tracker_feed", tracker=self.tracker_uuid))
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(response.mimetype, "text/event-stream")
+                    messages = response.get_data(as_text=True).split("\n\n")
+                self.assertTrue(messages[0].startswith("event: snapshot\ndata: "))
+                self.assertIn("player_checks_done", json.loads(messages[0].split("data: ", 1)[1]))
+                self.assertEqual(messages[1], 'event: update\ndata: [{"player":1,"status":30,"team":0,"type":"status"}]')
+                self.assertEqual(messages[2:], [""])
+                response.close()
+
+                # streams beyond the limit are asked to reconnect later instead of holding a web thread
+                self.app.config["TRACKER_FEED_STREAMS"] = 1
+                with self.app.test_request_context():
+                    first = self.client.get(url_for("api.tracker_feed", tracker=self.tracker_uuid), buffered=False)
+                    second = self.client.get(url_for("api.tracker_feed", tracker=self.tracker_uuid))
+                    self.assertEqual(second.get_data(as_text=True), "retry: 0\n\n")
+                    first.close()
+                    third = self.client.get(url_for("api.tracker_feed", tracker=self.tracker_uuid))
+                    self.assertTrue(third.get_data(as_text=True).startswith("event: snapshot"))
+                    third.close()
+
+                feed.prune(self.room_id, position + 1)
+                self.assertEqual(feed.read(self.room_id, 0), [])
+            finally:
+                self.app.config.update(old_config)
+                feed.close()
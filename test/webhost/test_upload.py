@@ -0,0 +1,92 @@
+import concurrent.futures
+import io
+import zipfile
+from pathlib import Path
+
+from . import TestBase
+
+
+class TestUpload(TestBase):
+    def test_process_multidata(self) -> None:
+        """Verify that multidata is stripped of its data package the same way, in-process or in an executor."""
+        from pony.orm import db_session, rollback
+        from MultiServer import Context
+        from WebHostLib.upload import process_multidata
+
+        with (Path(__file__).parent / "data" / "One_Archipelago.archipelago").open("rb") as f:
+            data = f.read()
+
+        with db_session:
+            slots, local = process_multidata(data)
+            self.assertEqual(len(slots), 1)
+            rollback()
+        with db_session, concurrent.futures.ThreadPoolExecutor(1) as executor:
+            _, pooled = process_multidata(data, executor=executor)
+            rollback()
+        self.assertEqual(Context.decompress(local), Context.decompress(pooled))
+        for game_data in Context.decompress(local)["datapackage"].values():
+            self.assertEqual({"version", "checksum"}, set(game_data))
+
+    def test_patch_deduplication(self) -> None:
+        """Verify that identical patch files of different slots are stored once."""
+        from pony.orm import db_session
+        from WebHostLib.models import PatchBlob, Slot
+        from WebHostLib.upload import process_multidata, spool_patch, store_patch_blob
+
+        with (Path(__file__).parent / "data" / "One_Archipelago.archipelago").open("rb") as f:
+            data = f.read()
+        patch = b"identical patch file"
+
+        slot_ids = []
+        for _ in range(2):
+            with db_session:
+                spool, checksum = spool_patch([patch])
+                with spool:
+                    store_patch_blob(spool, checksum)
+                slots, _ = process_multidata(data, {1: checksum})
+            slot_ids += [slot.id for slot in slots]
+        with db_session:
+            blobs = {Slot[slot_id].patch_link.blob for slot_id in slot_ids}
+            self.assertEqual(len(blobs), 1)
+            blob = blobs.pop()
+            self.assertEqual(len(blob.links), 2)
+            self.assertEqual(Slot[slot_ids[0]].patch_data, patch)
+            for slot_id in slot_ids:
+                Slot[slot_id].delete()
+            self.assertFalse(blob.links)
+            blob.delete()
+        with db_session:
+            self.assertFalse(PatchBlob.exists(checksum=blob.checksum))
+
+    def test_extracted_size_limit(self) -> None:
+        """Verify that reading from a zip stops once the extracted size exceeds the budget."""
+        from WebHostLib.upload import read_zip_member
+
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zfile:
+            zfile.writestr("AP_1_P1_Player.apbp", b"\0" * 3 * 1024 * 1024)
+        with zipfile.ZipFile(buffer) as zfile:
+            info = zfile.infolist()[0]
+            self.assertEqual(len(read_zip_member(zfile, info, [4 * 1024 * 1024])), 3 * 1024 * 1024)
+            with self.assertRaises(ValueError):
+                read_zip_member(zfile, info, [2 * 1024 * 1024])
+
+    def test_patch_chunks(self) -> None:
+        """Verify that patch files are stored in chunks and read back whole."""
+        from pony.orm import db_session
+        from WebHostLib.autolauncher import cleanup
+        from WebHostLib.models import PatchBlob
+        from WebHostLib.upload import PATCH_CHUNK_SIZE, spool_patch, store_patch_blob
+
+        patch = bytes(range(256)) * (PATCH_CHUNK_SIZE // 128 + 1)
+        with db_session:
+            spool, checksum = spool_patch([patch[:1000], patch[1000:]])
+            with spool:
+                store_patch_blob(spool, checksum)
+        with db_session:
+            blob = PatchBlob[checksum]
+            self.assertEqual(len(blob.chunks), 3)
+            self.assertEqual(blob.data, patch)
+        cleanup()  # deletes the blob, as no slot links it
+        with db_session:
+            self.assertFalse(PatchBlob.exists(checksum=checksum))
@@ -195,27 +195,32 @@ class SnesReader(Generic[_T_Enum]):
         returns `None` if reading fails,
         otherwise returns the data for the registered `Enum`
         """
-        from SNIClient import snes_read
+        from SNIClient import snes_read_multi
+
+        # Problems were reported with big reads,
+        # so big ranges are chunked into smaller pieces
+        # and the pieces are sent in batches of at most one chunk.
+        batches: list[list[tuple[int, int]]] = [[]]
+        batch_size = 0
+        for r in self._ranges:
+            for read_so_far in range(0, r.size, SNES_READ_CHUNK_SIZE):
+                chunk_size = min(SNES_READ_CHUNK_SIZE, r.size - read_so_far)
+                if batch_size + chunk_size > SNES_READ_CHUNK_SIZE:
+                    batches.append([])
+                    batch_size = 0
+                batches[-1].append((r.address + read_so_far, chunk_size))
+                batch_size += chunk_size
+
+        pieces: list[bytes] = []
+        for batch in batches:
+            response = await snes_read_multi(ctx, batch)
+            if response is None:
+                return None
+            pieces.extend(response)
 
         reads: list[tuple[Read, bytes]] = []
+        piece_iter = iter(pieces)
         for r in self._ranges:
-            if r.size < SNES_READ_CHUNK_SIZE:  # most common
-                response = await snes_read(ctx, r.address, r.size)
-                if response is None:
-                    return None
-                reads.append((r, response))
-            else:  # big read
-                # Problems were reported with big reads,
-                # so we chunk it into smaller pieces.
-                read_so_far = 0
-                collection: list[bytes] = []
-                while read_so_far < r.size:
-                    remaining_size = r.size - read_so_far
-                    chunk_size = min(SNES_READ_CHUNK_SIZE, remaining_size)
-                    response = await snes_read(ctx, r.address + read_so_far, chunk_size)
-                    if response is None:
-                        return None
-                    collection.append(response)
-                    read_so_far += chunk_size
-                reads.append((r, b"".join(collection)))
+            chunk_count = -(-r.size // SNES_READ_CHUNK_SIZE)
+            reads.append((r, b"".join(next(piece_iter) for _ in range(chunk_count))))
         return SnesData(reads)
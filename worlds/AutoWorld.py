@@ -15,6 +15,7 @@ from BaseClasses import CollectionState
 from Utils import Version
 
 if TYPE_CHECKING:
+    import concurrent.futures
     from BaseClasses import MultiWorld, Item, Location, Tutorial, Region, Entrance
     from NetUtils import GamesPackage, MultiData
     from settings import Group
@@ -208,6 +209,43 @@ def call_all(multiworld: "MultiWorld", method_name: str, *args: Any) -> None:
     call_stage(multiworld, method_name, *args)
 
 
+def generate_output_from_data(game: str, output_data: Any, output_directory: str) -> Any:
+    """Entry point for worker processes generating output, see World.get_output_data."""
+    if game not in AutoWorldRegister.world_types:
+        # spawned workers only import the worlds that are not loaded lazily
+        import worlds
+        worlds.load_worlds((game,))
+    world_type = AutoWorldRegister.world_types[game]
+    return _timed_call(world_type.generate_output_from_data, output_data, output_directory)
+
+
+def call_output_process(multiworld: "MultiWorld", player: int, output_directory: str,
+                        pool: "concurrent.futures.Executor") -> None:
+    """Generates output for a player in a process pool if their world supports it, otherwise in the calling thread."""
+    try:
+        output_data = call_single(multiworld, "get_output_data", player)
+        if output_data is not None:
+            game = multiworld.worlds[player].game
+            try:
+                result = pool.submit(generate_output_from_data, game, output_data, output_directory).result()
+            except Exception as e:
+                message = f"Exception in output process for player {player}, named {multiworld.player_name[player]}."
+                if sys.version_info >= (3, 11, 0):
+                    e.add_note(message)  # PEP 678
+                else:
+                    logging.error(message)
+                raise e
+    except BaseException:
+        # let threads waiting for the output continue, the original error is raised from here
+        call_single(multiworld, "finish_output", player, None)
+        raise
+    if output_data is None:
+        # the world generates its output itself and finishes it there
+        call_single(multiworld, "generate_output", player, output_directory)
+        return
+    call_single(multiworld, "finish_output", player, result)
+
+
 def call_stage(multiworld: "MultiWorld", method_name: str, *args: Any) -> None:
     world_types = {multiworld.worlds[player].__class__ for player in multiworld.player_ids}
     for world_type in sorted(world_types, key=lambda world: world.__name__):
@@ -431,6 +469,32 @@ class World(metaclass=AutoWorldRegister):
         """
         pass
 
+    def get_output_data(self) -> Any:
+        """
+        Opt-in for generating output in a worker process, which gets used instead of generate_output if the generator
+        is configured with output_processes. Gets called from a threadpool like generate_output.
+        Return the minimal picklable data generate_output_from_data needs for this slot, or None to fall back to
+        generate_output. A world opting in can implement generate_output as
+        `self.finish_output(self.generate_output_from_data(self.get_output_data(), output_directory))`.
+        """
+        return None
+
+    @classmethod
+    def generate_output_from_data(cls, output_data: Any, output_directory: str) -> Any:
+        """
+        Creates output files from the data returned by get_output_data. This gets called in a worker process, so
+        neither the MultiWorld nor this World instance are available.
+        The returned value has to be picklable and is passed to finish_output in the generating process.
+        """
+        raise NotImplementedError
+
+    def finish_output(self, result: Any) -> None:
+        """
+        Receives the result of generate_output_from_data, for example to store a rom name for modify_multidata.
+        Gets called with None if creating the output failed, so anything waiting for it can continue.
+        """
+        pass
+
     def fill_slot_data(self) -> Mapping[str, Any]:  # json of WebHostLib.models.Slot
         """
         What is returned from this function will be in the `slot_data` field
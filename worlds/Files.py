@@ -9,7 +9,7 @@ import threading
 from io import BytesIO
 
 from typing import (ClassVar, Dict, List, Literal, Tuple, Any, Optional, Union, BinaryIO, overload, Sequence,
-                    TYPE_CHECKING)
+                    Callable, Set, TYPE_CHECKING)
 
 import bsdiff4
 
@@ -65,6 +65,10 @@ class AutoPatchRegister(abc.ABCMeta):
         return AutoPatchRegister.file_endings.get(suffix, None)
 
 
+_patch_extensions: Dict[Tuple[Optional[str], str], Callable[..., Union[bytes, bytearray]]] = {}
+"""resolved patch extension functions by game and procedure step, see get_patch_extension"""
+
+
 class AutoPatchExtensionRegister(abc.ABCMeta):
     extension_types: ClassVar[Dict[str, AutoPatchExtensionRegister]] = {}
     required_extensions: Tuple[str, ...] = ()
@@ -74,6 +78,8 @@ class AutoPatchExtensionRegister(abc.ABCMeta):
         new_class = super().__new__(mcs, name, bases, dct)
         if "game" in dct:
             AutoPatchExtensionRegister.extension_types[dct["game"]] = new_class
+            # steps may have resolved to another handler before, e.g. the fallback if the world was loaded lazily
+            _patch_extensions.clear()
         return new_class
 
     @staticmethod
@@ -344,21 +350,36 @@ class APProcedurePatch(APAutoPatchInterface):
 
     def patch(self, target: str) -> None:
         self.read()
-        base_data = self.get_source_data_with_cache()
-        patch_extender = AutoPatchExtensionRegister.get_handler(self.game)
+        data: Union[bytes, bytearray] = self.get_source_data_with_cache()
         assert not isinstance(self.procedure, str), f"{type(self)} must define procedures"
         for step, args in self.procedure:
-            if isinstance(patch_extender, list):
-                extension = next((item for item in [getattr(extender, step, None) for extender in patch_extender]
-                                  if item is not None), None)
-            else:
-                extension = getattr(patch_extender, step, None)
-            if extension is not None:
-                base_data = extension(self, base_data, *args)
-            else:
-                raise NotImplementedError(f"Unknown procedure {step} for {self.game}.")
+            extension = get_patch_extension(self.game, step)
+            if isinstance(data, bytearray) and extension not in in_place_extensions:
+                # extensions outside of this module may rely on receiving immutable bytes
+                data = bytes(data)
+            data = extension(self, data, *args)
         with open(target, 'wb') as f:
-            f.write(base_data)
+            f.write(data)
+
+
+def get_patch_extension(game: Optional[str], step: str) -> Callable[..., Union[bytes, bytearray]]:
+    """Resolves a procedure step to its patch extension function, cached per game until another extension registers."""
+    extension = _patch_extensions.get((game, step))
+    if extension is None:
+        extension = _patch_extensions[game, step] = _resolve_patch_extension(game, step)
+    return extension
+
+
+def _resolve_patch_extension(game: Optional[str], step: str) -> Callable[..., Union[bytes, bytearray]]:
+    patch_extender = AutoPatchExtensionRegister.get_handler(game)
+    if isinstance(patch_extender, list):
+        extension = next((item for item in [getattr(extender, step, None) for extender in patch_extender]
+                          if item is not None), None)
+    else:
+        extension = getattr(patch_extender, step, None)
+    if extension is None:
+        raise NotImplementedError(f"Unknown procedure {step} for {game}.")
+    return extension
 
 
 class APDeltaPatch(APProcedurePatch):
@@ -468,6 +489,7 @@ class APPatchExtension(metaclass=AutoPatchExtensionRegister):
     Further arguments are passed in from the procedure as defined.
 
     Patch extension functions must return the changed bytes.
+    Functions listed in `in_place_extensions` may instead be handed, modify and return a bytearray.
     """
     game: str
     required_extensions: ClassVar[Tuple[str, ...]] = ()
@@ -478,14 +500,15 @@ class APPatchExtension(metaclass=AutoPatchExtensionRegister):
         return bsdiff4.patch(rom, caller.get_file(patch))
 
     @staticmethod
-    def apply_tokens(caller: APProcedurePatch, rom: bytes, token_file: str) -> bytes:
-        """Applies the given token file from the patch onto the current file."""
-        token_data = caller.get_file(token_file)
-        rom_data = bytearray(rom)
+    def apply_tokens(caller: APProcedurePatch, rom: Union[bytes, bytearray], token_file: str) -> bytearray:
+        """Applies the given token file from the patch onto the current file.
+        A bytearray is patched in place, bytes are copied once."""
+        token_data = memoryview(caller.get_file(token_file))
+        rom_data = rom if isinstance(rom, bytearray) else bytearray(rom)
         token_count = int.from_bytes(token_data[0:4], "little")
         bpr = 4
         for _ in range(token_count):
-            token_type = token_data[bpr:bpr + 1][0]
+            token_type = token_data[bpr]
             offset = int.from_bytes(token_data[bpr + 1:bpr + 5], "little")
             size = int.from_bytes(token_data[bpr + 5:bpr + 9], "little")
             data = token_data[bpr + 9:bpr + 9 + size]
@@ -503,19 +526,29 @@ class APPatchExtension(metaclass=AutoPatchExtensionRegister):
                 if token_type == APTokenTypes.COPY:
                     rom_data[offset: offset + length] = rom_data[value: value + length]
                 else:
-                    rom_data[offset: offset + length] = bytes([value] * length)
+                    rom_data[offset: offset + length] = bytes([value]) * length
             else:
                 rom_data[offset:offset + len(data)] = data
             bpr += 9 + size
-        return bytes(rom_data)
+        return rom_data
 
     @staticmethod
-    def calc_snes_crc(caller: APProcedurePatch, rom: bytes) -> bytes:
-        """Calculates and applies a valid CRC for the SNES rom header."""
-        rom_data = bytearray(rom)
+    def calc_snes_crc(caller: APProcedurePatch, rom: Union[bytes, bytearray]) -> bytearray:
+        """Calculates and applies a valid CRC for the SNES rom header.
+        A bytearray is patched in place, bytes are copied once."""
+        rom_data = rom if isinstance(rom, bytearray) else bytearray(rom)
         if len(rom) < 0x8000:
             raise Exception("Tried to calculate SNES CRC on file too small to be a SNES ROM.")
-        crc = (sum(rom_data[:0x7FDC] + rom_data[0x7FE0:]) + 0x01FE) & 0xFFFF
+        view = memoryview(rom_data)
+        crc = (sum(view[:0x7FDC]) + sum(view[0x7FE0:]) + 0x01FE) & 0xFFFF
+        view.release()
         inv = crc ^ 0xFFFF
         rom_data[0x7FDC:0x7FE0] = [inv & 0xFF, (inv >> 8) & 0xFF, crc & 0xFF, (crc >> 8) & 0xFF]
-        return bytes(rom_data)
+        return rom_data
+
+
+in_place_extensions: Set[Callable[..., Union[bytes, bytearray]]] = {
+    APPatchExtension.apply_tokens,
+    APPatchExtension.calc_snes_crc,
+}
+"""Patch extension functions that accept a bytearray and may modify it in place instead of copying it."""
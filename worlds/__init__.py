@@ -11,7 +11,7 @@ import dataclasses
 import json
 from pathlib import Path
 from types import ModuleType
-from typing import List, Sequence
+from typing import Dict, Iterable, List, Sequence
 
 from NetUtils import DataPackage
 from Utils import local_path, user_path, Version, version_tuple, tuplize_version
@@ -30,11 +30,16 @@ __all__ = {
     "local_folder",
     "user_folder",
     "failed_world_loads",
+    "lazy_world_sources",
+    "load_worlds",
 }
 
 
 failed_world_loads: List[str] = []
 
+lazy_world_loading = os.environ.get("AP_LAZY_WORLD_LOADING", "").lower() in ("1", "true", "yes")
+"""If set, worlds with a manifest naming their game are only imported once requested through load_worlds."""
+
 
 @dataclasses.dataclass(order=True)
 class WorldSource:
@@ -91,6 +96,19 @@ for folder in (folder for folder in (user_folder, local_folder) if folder):
             elif entry.is_file() and entry.name.endswith(".apworld"):
                 world_sources.append(WorldSource(file_name, is_zip=True, relative=relative))
 
+def find_manifest(world_source: WorldSource) -> dict:
+    """Returns the manifest of a world folder, or an empty dict if it has none."""
+    for dirpath, dirnames, filenames in os.walk(world_source.resolved_path):
+        for file in filenames:
+            if file.endswith("archipelago.json"):
+                with open(os.path.join(dirpath, file), mode="r", encoding="utf-8") as manifest_file:
+                    return json.load(manifest_file)
+    return {}
+
+
+# game name -> source of worlds that were found, but not yet imported, see lazy_world_loading
+lazy_world_sources: Dict[str, WorldSource] = {}
+
 # import all submodules to trigger AutoWorldRegister
 world_sources.sort()
 apworlds: list[WorldSource] = []
@@ -98,23 +116,23 @@ for world_source in world_sources:
     # load all loose files first:
     if world_source.is_zip:
         apworlds.append(world_source)
+    elif lazy_world_loading:
+        manifest = find_manifest(world_source)
+        world_source.version = tuplize_version(manifest.get("world_version", "0.0.0"))
+        game = manifest.get("game")
+        if game and game not in lazy_world_sources:
+            lazy_world_sources[game] = world_source
+        else:
+            world_source.load()
     else:
         world_source.load()
 
 from .AutoWorld import AutoWorldRegister
 
 for world_source in world_sources:
-    if not world_source.is_zip:
+    if not world_source.is_zip and world_source not in lazy_world_sources.values():
         # look for manifest
-        manifest = {}
-        for dirpath, dirnames, filenames in os.walk(world_source.resolved_path):
-            for file in filenames:
-                if file.endswith("archipelago.json"):
-                    with open(os.path.join(dirpath, file), mode="r", encoding="utf-8") as manifest_file:
-                        manifest = json.load(manifest_file)
-                    break
-            if manifest:
-                break
+        manifest = find_manifest(world_source)
         game = manifest.get("game")
         if game in AutoWorldRegister.world_types:
             AutoWorldRegister.world_types[game].world_version = tuplize_version(manifest.get("world_version", "0.0.0"))
@@ -173,7 +191,8 @@ if apworlds:
         sys.meta_path.insert(0, APWorldModuleFinder())
 
         for apworld_source, apworld in core_compatible:
-            if apworld.game and apworld.game in AutoWorldRegister.world_types:
+            if apworld.game and (apworld.game in AutoWorldRegister.world_types or
+                                 apworld.game in lazy_world_sources):
                 fail_world(apworld.game,
                            f"Did not load {apworld_source.path} "
                            f"as its game {apworld.game} is already loaded.",
@@ -185,6 +204,12 @@ if apworlds:
                 spec = importer.find_spec(f"worlds.{world_name}")
                 apworld_module_specs[f"worlds.{world_name}"] = spec
 
+                if lazy_world_loading and apworld.game:
+                    if apworld.world_version:
+                        apworld_source.version = apworld.world_version
+                    lazy_world_sources[apworld.game] = apworld_source
+                    continue
+
                 apworld_source.load()
                 if apworld.game in AutoWorldRegister.world_types:
                     # world could fail to load at this point
@@ -200,3 +225,20 @@ network_data_package: DataPackage = {
     "games": {world_name: world.get_data_package_data() for world_name, world in AutoWorldRegister.world_types.items()},
 }
 
+
+def load_worlds(games: Iterable[str]) -> None:
+    """
+    Imports the worlds of the given games that were deferred by lazy_world_loading and adds them to
+    network_data_package. Games that are already loaded or unknown are ignored.
+    """
+    loaded = False
+    for game in games:
+        world_source = lazy_world_sources.pop(game, None)
+        if world_source and world_source.load() and game in AutoWorldRegister.world_types:
+            world_type = AutoWorldRegister.world_types[game]
+            world_type.world_version = world_source.version
+            network_data_package["games"][game] = world_type.get_data_package_data()
+            loaded = True
+    if loaded:
+        import settings
+        settings._world_settings_name_cache_updated = False  # pick up settings of the newly loaded worlds
@@ -7,6 +7,7 @@ naively passed to BizHawk without validation or modification.
 
 import asyncio
 import base64
+import collections
 import enum
 import json
 import sys
@@ -16,6 +17,9 @@ from typing import Any, Sequence
 BIZHAWK_SOCKET_PORT_RANGE_START = 43055
 BIZHAWK_SOCKET_PORT_RANGE_SIZE = 5
 
+WATCH_FRAME_MARKER = b"\xff"
+"""First byte of a binary watch update frame, which can't start a JSON message"""
+
 
 class ConnectionStatus(enum.IntEnum):
     NOT_CONNECTED = 1
@@ -46,47 +50,170 @@ class SyncError(Exception):
 class BizHawkContext:
     streams: tuple[asyncio.StreamReader, asyncio.StreamWriter] | None
     connection_status: ConnectionStatus
+    watches: dict[int, tuple[int, int, str]]
+    """Watched memory by id as `(address, size, domain)`, registered with the connector on every connection"""
+    watched_data: dict[int, bytes]
+    """Latest data pushed by the connector for each watch"""
+    watch_interval: int
+    """Number of frames between the connector's checks for changes of watched memory"""
+    binary_watch_updates: bool
+    """Whether the connector pushes watch updates as binary frames instead of JSON with base64"""
+    max_requests_in_flight: int
+    """Number of requests that can wait for a response at the same time, further requests wait for a free slot.
+    Applies from the next connection on."""
+    request_timeout: float
+    """Seconds to wait for the response to a request before the connection is considered lost"""
+    _watches_synced: bool
     _lock: asyncio.Lock
+    _in_flight: asyncio.Semaphore | None
+    _pending: dict[int, "asyncio.Future[Any]"]
+    _unnumbered: "collections.deque[asyncio.Future[Any]]"
+    _next_request_id: int
+    _reader_task: "asyncio.Task[None] | None"
+    _reader_streams: tuple[asyncio.StreamReader, asyncio.StreamWriter] | None
     _port: int | None
 
     def __init__(self) -> None:
         self.streams = None
         self.connection_status = ConnectionStatus.NOT_CONNECTED
+        self.watches = {}
+        self.watched_data = {}
+        self.watch_interval = 1
+        self.binary_watch_updates = True
+        self.max_requests_in_flight = 8
+        self.request_timeout = 5
+        self._watches_synced = False
         self._lock = asyncio.Lock()
+        self._in_flight = None
+        self._pending = {}
+        self._unnumbered = collections.deque()
+        self._next_request_id = 0
+        self._reader_task = None
+        self._reader_streams = None
         self._port = None
 
-    async def _send_message(self, message: str):
-        async with self._lock:
-            if self.streams is None:
-                raise NotConnectedError("You tried to send a request before a connection to BizHawk was made")
-
-            try:
-                reader, writer = self.streams
-                writer.write(message.encode("utf-8") + b"\n")
-                await asyncio.wait_for(writer.drain(), timeout=5)
-
-                res = await asyncio.wait_for(reader.readline(), timeout=5)
-
-                if res == b"":
-                    writer.close()
-                    self.streams = None
-                    self.connection_status = ConnectionStatus.NOT_CONNECTED
-                    raise RequestFailedError("Connection closed")
+    async def _read_message(self, reader: asyncio.StreamReader) -> bytes:
+        """Reads a response line or a binary watch update frame. Returns b"" if the connection was closed."""
+        try:
+            first = await reader.readexactly(1)
+            if first == WATCH_FRAME_MARKER:
+                length = int.from_bytes(await reader.readexactly(4), "big")
+                return first + await reader.readexactly(length)
+            return first + await reader.readline()
+        except asyncio.IncompleteReadError:
+            return b""
+
+    def _handle_watch_update(self, message: bytes) -> bool:
+        """Stores the data of a binary watch update pushed by the connector. Returns False if the message is not one."""
+        if not message.startswith(WATCH_FRAME_MARKER):
+            return False
+        payload = memoryview(message)[1:]
+        while payload:
+            watch_id = int.from_bytes(payload[:2], "big")
+            size = int.from_bytes(payload[2:6], "big")
+            self._set_watched_data(watch_id, bytes(payload[6:6 + size]))
+            payload = payload[6 + size:]
+        return True
+
+    def _set_watched_data(self, watch_id: int, data: bytes) -> None:
+        # updates may still arrive for watches that were just removed
+        if watch_id in self.watches:
+            self.watched_data[watch_id] = data
+
+    async def _read_responses(self, streams: tuple[asyncio.StreamReader, asyncio.StreamWriter]) -> None:
+        """Receives everything the connector sends on a connection and hands responses to the requests waiting for
+        them. Requests with an id are matched by it, anything else is answered in the order it was sent."""
+        reason = "Connection closed"
+        try:
+            while True:
+                message = await self._read_message(streams[0])
+                if message == b"":
+                    break
+                if self._handle_watch_update(message):
+                    continue
 
                 if self.connection_status == ConnectionStatus.TENTATIVE:
                     self.connection_status = ConnectionStatus.CONNECTED
 
-                return res.decode("utf-8")
+                future: asyncio.Future[Any] | None = None
+                result: Any = message.decode("utf-8")
+                if message.startswith(b"{"):  # batches with an id and watch updates, other responses are lists
+                    result = json.loads(message)
+                    if result.get("type") == "WATCH_UPDATE":
+                        for item in result["updates"]:
+                            self._set_watched_data(item["id"], base64.b64decode(item["value"]))
+                        continue
+                    future = self._pending.pop(result["id"], None)
+                    result = result["responses"]
+                elif self._unnumbered:
+                    future = self._unnumbered.popleft()
+
+                if future is not None and not future.done():
+                    future.set_result(result)
+        except ConnectionResetError:
+            reason = "Connection reset"
+        finally:
+            self._close(streams, reason)
+
+    def _close(self, streams: tuple[asyncio.StreamReader, asyncio.StreamWriter], reason: str) -> None:
+        """Closes a connection and fails the requests still waiting for a response on it."""
+        streams[1].close()
+        if self.streams is streams:
+            self.streams = None
+            self.connection_status = ConnectionStatus.NOT_CONNECTED
+        if self._reader_streams is streams:
+            for future in (*self._pending.values(), *self._unnumbered):
+                if not future.done():
+                    future.set_exception(RequestFailedError(reason))
+            self._pending.clear()
+            self._unnumbered.clear()
+            self._reader_task = None
+            self._reader_streams = None
+
+    async def _request(self, message: str, request_id: int | None = None) -> Any:
+        """Sends a message and waits for its response, while other requests can be in flight at the same time."""
+        if self._in_flight is None:
+            # created with the first request of a connection, so changes of the limit apply to the next one
+            self._in_flight = asyncio.Semaphore(self.max_requests_in_flight)
+        async with self._in_flight:
+            streams = self.streams
+            if streams is None:
+                raise NotConnectedError("You tried to send a request before a connection to BizHawk was made")
+
+            if self._reader_streams is not streams:
+                self._reader_streams = streams
+                self._reader_task = asyncio.create_task(self._read_responses(streams), name="BizHawkReader")
+
+            future: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+            try:
+                async with self._lock:
+                    # registered while holding the write lock, so unnumbered responses are matched in sending order
+                    if request_id is None:
+                        self._unnumbered.append(future)
+                    else:
+                        self._pending[request_id] = future
+                    streams[1].write(message.encode("utf-8") + b"\n")
+                    await asyncio.wait_for(streams[1].drain(), timeout=self.request_timeout)
+
+                return await asyncio.wait_for(future, timeout=self.request_timeout)
             except asyncio.TimeoutError as exc:
-                writer.close()
-                self.streams = None
-                self.connection_status = ConnectionStatus.NOT_CONNECTED
+                self._close(streams, "Connection timed out")
                 raise RequestFailedError("Connection timed out") from exc
             except ConnectionResetError as exc:
-                writer.close()
-                self.streams = None
-                self.connection_status = ConnectionStatus.NOT_CONNECTED
+                self._close(streams, "Connection reset")
                 raise RequestFailedError("Connection reset") from exc
+            finally:
+                if request_id is not None:
+                    self._pending.pop(request_id, None)
+
+    async def _send_message(self, message: str) -> str:
+        """Sends a raw message, like "VERSION", and returns the raw response."""
+        return await self._request(message)
+
+    async def _send_batch(self, req_list: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Sends a list of requests with an id, and returns their responses."""
+        self._next_request_id = request_id = (self._next_request_id + 1) % (1 << 31)
+        return await self._request(json.dumps({"id": request_id, "requests": req_list}), request_id)
 
 
 async def connect(ctx: BizHawkContext) -> bool:
@@ -95,6 +222,11 @@ async def connect(ctx: BizHawkContext) -> bool:
     ports = [*range(BIZHAWK_SOCKET_PORT_RANGE_START, BIZHAWK_SOCKET_PORT_RANGE_START + BIZHAWK_SOCKET_PORT_RANGE_SIZE)]
     ports = ports[rotation_steps:] + ports[:rotation_steps]
 
+    # a new connection knows nothing of the watches of the previous one
+    ctx._watches_synced = False
+    ctx.watched_data.clear()
+    ctx._in_flight = None
+
     for port in ports:
         try:
             ctx.streams = await asyncio.open_connection("127.0.0.1", port)
@@ -113,8 +245,7 @@ async def connect(ctx: BizHawkContext) -> bool:
 def disconnect(ctx: BizHawkContext) -> None:
     """Closes the connection to the connector script."""
     if ctx.streams is not None:
-        ctx.streams[1].close()
-        ctx.streams = None
+        ctx._close(ctx.streams, "Disconnected")
     ctx.connection_status = ConnectionStatus.NOT_CONNECTED
 
 
@@ -126,7 +257,7 @@ async def send_requests(ctx: BizHawkContext, req_list: list[dict[str, Any]]) ->
     """Sends a list of requests to the BizHawk connector and returns their responses.
 
     It's likely you want to use the wrapper functions instead of this."""
-    responses = json.loads(await ctx._send_message(json.dumps(req_list)))
+    responses = await ctx._send_batch(req_list)
     errors: list[ConnectorError] = []
 
     for response in responses:
@@ -326,6 +457,59 @@ async def guarded_write(ctx: BizHawkContext, write_list: Sequence[tuple[int, Seq
     return True
 
 
+def _watch_request(ctx: BizHawkContext, watch_id: int) -> dict[str, Any]:
+    address, size, domain = ctx.watches[watch_id]
+    return {"type": "WATCH", "id": watch_id, "address": address, "size": size, "domain": domain}
+
+
+async def watch(ctx: BizHawkContext, watch_list: Sequence[tuple[int, int, str]]) -> list[int]:
+    """Starts watching memory at 1 or more addresses. Instead of being read on request, the connector pushes the data
+    of each range once, and then again whenever it changed. `get_watched` returns the latest pushed data.
+
+    Items in `watch_list` should be organized `(address, size, domain)` like for `read`.
+
+    Watches stay registered across reconnects until they are removed with `unwatch`. Returns the id of each watch in
+    the order they were given."""
+    ids: list[int] = []
+    for watch_item in watch_list:
+        watch_id = next(i for i in range(1, 1 << 16) if i not in ctx.watches)
+        ctx.watches[watch_id] = watch_item
+        ids.append(watch_id)
+
+    if ctx._watches_synced:
+        await send_requests(ctx, [_watch_request(ctx, watch_id) for watch_id in ids])
+
+    return ids
+
+
+async def unwatch(ctx: BizHawkContext, ids: Sequence[int] | None = None) -> None:
+    """Stops watching memory of the given watch ids, or of all watches if `ids` is None."""
+    for watch_id in ctx.watches.copy() if ids is None else ids:
+        ctx.watches.pop(watch_id, None)
+        ctx.watched_data.pop(watch_id, None)
+
+    if ctx._watches_synced:
+        await send_requests(ctx, [{"type": "UNWATCH"} if ids is None else {"type": "UNWATCH", "ids": list(ids)}])
+
+
+async def sync_watches(ctx: BizHawkContext) -> None:
+    """Registers all watches and watch options with a newly connected connector script."""
+    await send_requests(ctx, [
+        {"type": "SET_WATCH_OPTIONS", "interval": ctx.watch_interval, "binary": ctx.binary_watch_updates},
+        {"type": "UNWATCH"},
+        *(_watch_request(ctx, watch_id) for watch_id in ctx.watches)
+    ])
+    ctx._watches_synced = True
+
+
+def get_watched(ctx: BizHawkContext, ids: Sequence[int]) -> list[bytes | None]:
+    """Returns the latest data of watches, or None for watches the connector did not push data for yet.
+
+    Updates are received along with the responses to any request, so the data is as recent as the last request. The
+    client's game watcher pings the connector before each call to a handler's `game_watcher`."""
+    return [ctx.watched_data.get(watch_id) for watch_id in ids]
+
+
 async def write(ctx: BizHawkContext, write_list: Sequence[tuple[int, Sequence[int], str]]) -> None:
     """Writes data to 1 or more addresses.
 
@@ -15,11 +15,11 @@ import Patch
 import Utils
 
 from . import BizHawkContext, ConnectionStatus, NotConnectedError, RequestFailedError, connect, disconnect, get_hash, \
-    get_script_version, get_system, ping, display_message
+    get_script_version, get_system, ping, display_message, sync_watches, unwatch
 from .client import BizHawkClient, AutoBizHawkClientRegister
 
 
-EXPECTED_SCRIPT_VERSION = 1
+EXPECTED_SCRIPT_VERSION = 3
 
 
 class AuthStatus(enum.IntEnum):
@@ -252,6 +252,8 @@ async def _game_watcher(ctx: BizHawkClientContext):
                     disconnect(ctx.bizhawk_ctx)
                     continue
 
+                await sync_watches(ctx.bizhawk_ctx)
+
             showed_connecting_message = False
 
             await ping(ctx.bizhawk_ctx)
@@ -269,6 +271,7 @@ async def _game_watcher(ctx: BizHawkClientContext):
                 ctx.username = None
                 ctx.client_handler = None
                 ctx.finished_game = False
+                await unwatch(ctx.bizhawk_ctx)
                 await ctx.disconnect(False)
             ctx.rom_hash = rom_hash
 
@@ -214,27 +214,43 @@ class SMWWorld(World):
 
 
     def generate_output(self, output_directory: str):
-        rompath = ""  # if variable is not declared finally clause may fail
+        result = None
         try:
-            multiworld = self.multiworld
-            player = self.player
-
-            rom = LocalRom(get_base_rom_path())
-            patch_rom(self, rom, self.player, self.active_level_dict)
-
-            rompath = os.path.join(output_directory, f"{self.multiworld.get_out_file_name_base(self.player)}.sfc")
-            rom.write_to_file(rompath)
-            self.rom_name = rom.name
+            result = self.generate_output_from_data(self.get_output_data(), output_directory)
+        finally:
+            self.finish_output(result)  # make sure threading continues and errors are collected
+
+    def get_output_data(self) -> typing.Dict[str, typing.Any]:
+        # patching uses self.random, so it has to happen here, the delta patch is created in a worker process
+        rom = LocalRom(get_base_rom_path())
+        patch_rom(self, rom, self.player, self.active_level_dict)
+        return {
+            "rom": bytes(rom.buffer),
+            "rom_name": bytes(rom.name),
+            "player": self.player,
+            "player_name": self.multiworld.player_name[self.player],
+            "out_file_base": self.multiworld.get_out_file_name_base(self.player),
+        }
 
-            patch = SMWDeltaPatch(os.path.splitext(rompath)[0]+SMWDeltaPatch.patch_file_ending, player=player,
-                                  player_name=multiworld.player_name[player], patched_path=rompath)
+    @classmethod
+    def generate_output_from_data(cls, output_data: typing.Dict[str, typing.Any], output_directory: str) -> bytes:
+        rompath = os.path.join(output_directory, f"{output_data['out_file_base']}.sfc")
+        try:
+            with open(rompath, "wb") as outfile:
+                outfile.write(output_data["rom"])
+            patch = SMWDeltaPatch(os.path.splitext(rompath)[0]+SMWDeltaPatch.patch_file_ending,
+                                  player=output_data["player"], player_name=output_data["player_name"],
+                                  patched_path=rompath)
             patch.write()
-        except:
-            raise
         finally:
-            self.rom_name_available_event.set()  # make sure threading continues and errors are collected
             if os.path.exists(rompath):
                 os.unlink(rompath)
+        return output_data["rom_name"]
+
+    def finish_output(self, result: typing.Optional[bytes]) -> None:
+        if result:
+            self.rom_name = result
+        self.rom_name_available_event.set()
 
     def modify_multidata(self, multidata: dict):
         import base64